@@ -0,0 +1,191 @@
+"""Headless batch runner for the download engine.
+
+Downloads one or more videos or playlists without a display:
+
+    python batch_download.py URL [URL ...] --output ~/Videos --quality 1080p
+
+Playlist runs are journaled; `--resume` continues every run that was
+interrupted instead of downloading new URLs.
+"""
+import argparse
+import logging
+import sys
+import threading
+
+from concurrency import AdaptiveConcurrencyController
+from download_archive import DownloadArchive
+from download_engine import AUDIO_CODECS, DownloadEngine, DownloadJob, EngineListener
+from event_log import EventLog, DEFAULT_EVENT_LOG_PATH
+from job_journal import JobJournal
+from metadata_cache import MetadataCache
+from metrics import DownloadMetrics, MetricsServer
+from postprocess_pool import PostprocessPool
+from profiling import MODES as PROFILE_MODES, STAGES as PROFILE_STAGES, Profiler
+from renditions import parse_renditions
+from scheduler import DownloadScheduler, DEFAULT_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+class ConsoleListener(EngineListener):
+    """Prints engine events to the console"""
+    def status(self, message):
+        logger.info(message)
+
+    def job_state(self, job, message=None):
+        if job.status in ("completed", "error"):
+            logger.info(f"[{job.job_id}] {job.title}: {message or job.status}")
+
+    def playlist_progress(self, completed, failed, total):
+        logger.info(f"Playlist progress: {completed}/{total} done, {failed} failed")
+
+
+def log_stage_latency(metrics):
+    """Log p50/p95 of every stage that was observed"""
+    for stage in ('queue', 'extract', 'ttfb', 'transfer', 'postprocess', 'total'):
+        count = metrics.stage_seconds.count(stage=stage)
+        if count:
+            p50 = metrics.stage_seconds.quantile(0.5, stage=stage)
+            p95 = metrics.stage_seconds.quantile(0.95, stage=stage)
+            logger.info(f"Stage {stage}: p50 {p50:.2f}s, p95 {p95:.2f}s over {count} jobs")
+    logger.info(f"Downloaded {metrics.bytes.total() / 1048576:.1f} MiB, {metrics.retries.total()} retries")
+
+
+def renditions_arg(text):
+    try:
+        return parse_renditions(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Download YouTube videos and playlists without the UI")
+    parser.add_argument('urls', nargs='*', help="Video or playlist URLs")
+    parser.add_argument('--output', '-o', default=None, help="Save location (default: ~/Downloads)")
+    parser.add_argument('--quality', '-q', default="720p", choices=["360p", "720p", "1080p"])
+    parser.add_argument('--audio', action='store_true', help="Download audio only")
+    parser.add_argument('--audio-codec', choices=AUDIO_CODECS, default=None,
+                        help="Re-encode audio to this codec (implies --audio; default: keep the source audio)")
+    parser.add_argument('--renditions', type=renditions_arg, default=None, metavar='LIST',
+                        help="Download once and save several outputs, e.g. '1080p,mp3,480p' "
+                             "(replaces --quality, --audio and --audio-codec)")
+    parser.add_argument('--subs', action='store_true', help="Include English subtitles")
+    parser.add_argument('--playlist', action='store_true', help="Treat URLs as playlists")
+    parser.add_argument('--cookies', default=None, help="Cookies file for private videos")
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_CONCURRENCY,
+                        help="Downloads running at once, across all playlists")
+    parser.add_argument('--fixed', action='store_true',
+                        help="Keep --jobs fixed instead of adapting it to throughput and throttling")
+    parser.add_argument('--no-cache', action='store_true', help="Don't use or update the metadata cache")
+    parser.add_argument('--no-archive', action='store_true',
+                        help="Don't skip or record videos in the download archive")
+    parser.add_argument('--events', default=None, metavar='PATH',
+                        help="Write job events as JSON lines here (default: ~/.cache/youtube_downloader/events.jsonl)")
+    parser.add_argument('--no-events', action='store_true', help="Don't write the job event log")
+    parser.add_argument('--metrics-port', type=int, default=None, metavar='PORT',
+                        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--profile', choices=PROFILE_MODES, default=None,
+                        help="Profile jobs; profiles are written next to the downloads")
+    parser.add_argument('--profile-stage', action='append', choices=PROFILE_STAGES, default=[],
+                        help="Only profile this stage (repeatable)")
+    parser.add_argument('--profile-job', action='append', default=[], metavar='ID',
+                        help="Only profile this job ID, video ID or URL (repeatable)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Write tracemalloc reports for extract_info calls")
+    parser.add_argument('--postprocess-workers', type=int, default=None, metavar='N',
+                        help="FFmpeg jobs running at once (default: from the CPU count)")
+    parser.add_argument('--inline-postprocess', action='store_true',
+                        help="Merge and convert in the download workers instead of a process pool")
+    parser.add_argument('--resume', action='store_true', help="Resume interrupted playlist runs")
+    parser.add_argument('--no-journal', action='store_true',
+                        help="Don't journal playlist runs (they can't be resumed)")
+    args = parser.parse_args(argv)
+    if not args.urls and not args.resume:
+        parser.error("give at least one URL, or --resume")
+    if args.resume and args.no_journal:
+        parser.error("--resume needs the journal")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+
+    scheduler = DownloadScheduler(max_concurrency=args.jobs)
+    controller = None if args.fixed else AdaptiveConcurrencyController(scheduler, video_limit=args.jobs)
+    metadata_cache = None if args.no_cache else MetadataCache()
+    journal = None if args.no_journal else JobJournal()
+    archive = None if args.no_archive else DownloadArchive()
+    event_log = None if args.no_events else EventLog(args.events or DEFAULT_EVENT_LOG_PATH)
+    metrics = DownloadMetrics()
+    metrics.bind_scheduler(scheduler, controller)
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(metrics.registry, args.metrics_port).start()
+    # Also switchable while running, through the profiling control file
+    profiler = Profiler()
+    if args.profile or args.trace_memory:
+        profiler.configure(args.profile, args.profile_stage, args.profile_job, args.trace_memory)
+    postprocess_pool = None if args.inline_postprocess else PostprocessPool(args.postprocess_workers)
+    format_type = "audio" if args.audio or args.audio_codec else "video"
+    engines = []
+    failures = []
+
+    def run(url, run_id=None):
+        # One engine per URL keeps playlist counters separate; the shared
+        # scheduler keeps the total number of downloads bounded
+        engine = DownloadEngine(ConsoleListener(), scheduler=scheduler, controller=controller,
+                                metadata_cache=metadata_cache, journal=journal,
+                                archive=archive, event_log=event_log, metrics=metrics,
+                                profiler=profiler, postprocess_pool=postprocess_pool)
+        engines.append(engine)
+        job = DownloadJob(url, args.quality, format_type, args.subs, args.output, cookiefile=args.cookies,
+                          audio_codec=args.audio_codec, renditions=args.renditions)
+        try:
+            if run_id is not None:
+                results = engine.resume_playlist(run_id)
+                failures.extend(result for result in results if not result.success)
+            elif args.playlist:
+                results = engine.download_playlist(url, job)
+                failures.extend(result for result in results if not result.success)
+            else:
+                scheduler.submit(engine.download_video, job).result()
+        except Exception as e:
+            logger.error(f"Failed to download {url}: {str(e)}")
+            failures.append(url)
+
+    targets = [(url, None) for url in args.urls]
+    if args.resume:
+        runs = journal.unfinished_runs()
+        logger.info(f"Resuming {len(runs)} interrupted playlist runs")
+        targets += [(run['url'], run['run_id']) for run in runs]
+
+    threads = [threading.Thread(target=run, args=target, daemon=True) for target in targets]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            # Join with a timeout so Ctrl+C is still delivered on all platforms
+            while thread.is_alive():
+                thread.join(1.0)
+    except KeyboardInterrupt:
+        for engine in engines:
+            engine.cancel()
+        return 130
+    finally:
+        scheduler.shutdown(wait=False)
+        if postprocess_pool:
+            postprocess_pool.shutdown(wait=False)
+        if event_log:
+            event_log.close()
+        if metadata_cache:
+            logger.info(f"Metadata cache: {metadata_cache.stats()}")
+        log_stage_latency(metrics)
+        if metrics_server:
+            metrics_server.stop()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
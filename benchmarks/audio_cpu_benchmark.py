@@ -0,0 +1,111 @@
+"""CPU cost of audio post-processing: stream copy versus re-encoding.
+
+Generates the two kinds of audio-only streams YouTube serves (AAC in m4a
+and Opus in webm), then runs the engine's FFmpegExtractAudio step on each
+as audio mode configures it: once with the source codec kept, and once per
+requested codec. FFmpeg's CPU time is read from the child process usage
+and reported per hour of audio:
+
+    python benchmarks/audio_cpu_benchmark.py --minutes 10 --codec mp3
+
+Needs ffmpeg and ffprobe on PATH, and the resource module (not Windows).
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Source streams: name -> (extension, FFmpeg encoder arguments)
+SOURCES = {
+    'aac-m4a': ('m4a', ['-c:a', 'aac', '-b:a', '128k']),
+    'opus-webm': ('webm', ['-c:a', 'libopus', '-b:a', '160k']),
+}
+
+
+def make_source(directory, name, seconds):
+    """Encode `seconds` of a test signal into one of the SOURCES formats"""
+    ext, codec_args = SOURCES[name]
+    path = os.path.join(directory, f"{name}.{ext}")
+    # Noise mixed with a tone keeps the encoders from taking shortcuts on silence
+    subprocess.run(['ffmpeg', '-v', 'error', '-y',
+                    '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}',
+                    '-f', 'lavfi', '-i', f'anoisesrc=color=pink:amplitude=0.2:duration={seconds}',
+                    '-filter_complex', 'amix=inputs=2,aformat=channel_layouts=stereo',
+                    '-ar', '48000', *codec_args, path], check=True)
+    return path
+
+
+def child_cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_extract_audio(source, directory, audio_codec):
+    """Run audio mode's postprocessor on a copy of source; returns (output, cpu s, wall s)"""
+    import yt_dlp
+    from download_engine import DownloadEngine, DownloadJob
+
+    work = os.path.join(directory, f"{os.path.basename(source)}-{audio_codec or 'native'}")
+    os.makedirs(work)
+    path = shutil.copy(source, work)
+    ext = os.path.splitext(path)[1][1:]
+
+    job = DownloadJob(path, format_type="audio", output_dir=work, audio_codec=audio_codec)
+    opts = DownloadEngine().build_ydl_opts(job)
+    opts.update(quiet=True, verbose=False, progress_hooks=[])
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        info = {'id': 'bench', 'title': 'bench', 'ext': ext, 'filepath': path}
+        cpu, wall = child_cpu_seconds(), time.perf_counter()
+        for pp in ydl._pps['post_process']:
+            _, info = pp.run(info)
+        return info['filepath'], child_cpu_seconds() - cpu, time.perf_counter() - wall
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare CPU time of audio stream copy and re-encoding")
+    parser.add_argument('--minutes', type=float, default=10, help="Length of the test audio")
+    parser.add_argument('--codec', action='append', default=None,
+                        help="Codec to re-encode to (repeatable, default: mp3)")
+    parser.add_argument('--json', default=None, metavar='PATH', help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+    if not (shutil.which('ffmpeg') and shutil.which('ffprobe')):
+        print("ffmpeg and ffprobe are needed on PATH", file=sys.stderr)
+        return 1
+
+    seconds = args.minutes * 60
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ytdl-audio-bench-") as scratch:
+        for name in SOURCES:
+            print(f"Encoding {args.minutes:g} min {name} source...", file=sys.stderr)
+            source = make_source(scratch, name, seconds)
+            for codec in [None] + (args.codec or ['mp3']):
+                output, cpu, wall = run_extract_audio(source, scratch, codec)
+                results.append({'source': name, 'mode': codec or 'native', 'output': os.path.basename(output),
+                                'cpu_s': cpu, 'wall_s': wall, 'cpu_s_per_hour': cpu * 3600 / seconds})
+
+    print(f"{'Source':<10} {'Mode':<7} {'Output':<28} {'CPU s':>7} {'Wall s':>7} {'CPU s/hour':>11}")
+    for r in results:
+        print(f"{r['source']:<10} {r['mode']:<7} {r['output']:<28} {r['cpu_s']:7.2f} "
+              f"{r['wall_s']:7.2f} {r['cpu_s_per_hour']:11.1f}")
+    for name in SOURCES:
+        native = next(r for r in results if r['source'] == name and r['mode'] == 'native')
+        for r in results:
+            if r['source'] == name and r is not native:
+                saved = r['cpu_s_per_hour'] - native['cpu_s_per_hour']
+                print(f"{name}: stream copy saves {saved:.1f} CPU s per hour of audio over {r['mode']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
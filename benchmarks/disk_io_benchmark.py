@@ -0,0 +1,174 @@
+"""Disk I/O per video: separate FFmpeg passes versus the fused pass.
+
+Generates a video-only MP4, an audio-only m4a and an English WebVTT file
+per video, then finishes each video two ways:
+
+  separate  yt-dlp's merger, subtitle embedding and metadata
+            post-processors, one FFmpeg run each, then os.utime
+  fused     FusedMuxPP, which does all of it in one FFmpeg run
+
+For every FFmpeg run the input files it reads and the file it writes are
+added up, giving the bytes each approach moves through the disk. Block
+I/O counted by the kernel for the FFmpeg processes is shown as well; on a
+warm page cache it is mostly writes.
+
+    python benchmarks/disk_io_benchmark.py --videos 5 --seconds 60
+
+Needs ffmpeg on PATH, and the resource module (not Windows).
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+VTT = """WEBVTT
+
+00:00:01.000 --> 00:00:04.000
+Benchmark subtitle
+"""
+
+
+def make_sources(directory, seconds):
+    """Video-only mp4, audio-only m4a and subtitles, like a DASH download with --write-subs"""
+    video = os.path.join(directory, 'video.f137.mp4')
+    audio = os.path.join(directory, 'video.f140.m4a')
+    subtitles = os.path.join(directory, 'video.en.vtt')
+    subprocess.run(['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', f'testsrc2=size=1280x720:rate=30:duration={seconds}',
+                    '-c:v', 'libx264', '-preset', 'ultrafast', '-b:v', '2500k', video], check=True)
+    subprocess.run(['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}',
+                    '-c:a', 'aac', '-b:a', '128k', audio], check=True)
+    with open(subtitles, 'w', encoding='utf-8') as f:
+        f.write(VTT)
+    return video, audio, subtitles
+
+
+def make_info(directory, video, audio, subtitles):
+    return {
+        'id': 'bench', 'title': 'Benchmark video', 'uploader': 'bench', 'upload_date': '20240102',
+        'webpage_url': 'http://127.0.0.1/bench', 'description': 'Disk I/O benchmark',
+        'ext': 'mp4', 'vcodec': 'avc1.64001F', 'acodec': 'mp4a.40.2',
+        'filepath': os.path.join(directory, 'video.mp4'),
+        '__files_to_merge': [video, audio],
+        'requested_formats': [
+            {'format_id': '137', 'ext': 'mp4', 'vcodec': 'avc1.64001F', 'acodec': 'none', 'protocol': 'https',
+             'filepath': video},
+            {'format_id': '140', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'protocol': 'https',
+             'filepath': audio},
+        ],
+        'requested_subtitles': {'en': {'ext': 'vtt', 'filepath': subtitles, 'name': 'English'}},
+    }
+
+
+class IOCounter:
+    """Adds up the bytes of every FFmpeg run's input and output files"""
+    def __init__(self):
+        self.read = 0
+        self.written = 0
+        self.runs = 0
+
+    def install(self):
+        from yt_dlp.postprocessor.ffmpeg import FFmpegPostProcessor
+        original = FFmpegPostProcessor.real_run_ffmpeg
+        counter = self
+
+        def real_run_ffmpeg(pp, input_path_opts, output_path_opts, **kwargs):
+            counter.read += sum(os.path.getsize(path) for path, _ in input_path_opts if os.path.isfile(path))
+            result = original(pp, input_path_opts, output_path_opts, **kwargs)
+            counter.written += sum(os.path.getsize(path) for path, _ in output_path_opts if os.path.isfile(path))
+            counter.runs += 1
+            return result
+
+        FFmpegPostProcessor.real_run_ffmpeg = real_run_ffmpeg
+
+
+def child_blocks():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_inblock, usage.ru_oublock
+
+
+def finish_separate(ydl, info):
+    from yt_dlp.postprocessor.ffmpeg import FFmpegEmbedSubtitlePP, FFmpegMergerPP, FFmpegMetadataPP
+    from file_dates import apply_upload_date_timestamp
+
+    for pp in (FFmpegMergerPP(ydl), FFmpegEmbedSubtitlePP(ydl),
+               FFmpegMetadataPP(ydl, add_metadata=True, add_chapters=False, add_infojson=False)):
+        _, info = pp.run(info)
+    apply_upload_date_timestamp(info['filepath'], info)
+
+
+def finish_fused(ydl, info):
+    from fused_mux import FusedMuxPP
+    FusedMuxPP(ydl).run(info)
+
+
+def run(mode, sources, scratch, videos, counter):
+    import yt_dlp
+    finish = finish_fused if mode == 'fused' else finish_separate
+    read, written, runs = counter.read, counter.written, counter.runs
+    blocks_in, blocks_out = child_blocks()
+    elapsed = 0.0
+    with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
+        for i in range(videos):
+            directory = os.path.join(scratch, f"{mode}-{i}")
+            os.makedirs(directory)
+            copies = [shutil.copy(path, directory) for path in sources]
+            started = time.perf_counter()
+            finish(ydl, make_info(directory, *copies))
+            elapsed += time.perf_counter() - started
+    now_in, now_out = child_blocks()
+    return {
+        'mode': mode,
+        'ffmpeg_runs': (counter.runs - runs) / videos,
+        'read_mib': (counter.read - read) / videos / 1048576,
+        'written_mib': (counter.written - written) / videos / 1048576,
+        'block_in_mib': (now_in - blocks_in) * 512 / videos / 1048576,
+        'block_out_mib': (now_out - blocks_out) * 512 / videos / 1048576,
+        'seconds': elapsed / videos,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare disk I/O of separate and fused FFmpeg passes")
+    parser.add_argument('--videos', type=int, default=3)
+    parser.add_argument('--seconds', type=int, default=60, help="Length of each test video")
+    parser.add_argument('--json', default=None, metavar='PATH', help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+    if not (shutil.which('ffmpeg') and shutil.which('ffprobe')):
+        print("ffmpeg and ffprobe are needed on PATH", file=sys.stderr)
+        return 1
+
+    counter = IOCounter()
+    counter.install()
+    with tempfile.TemporaryDirectory(prefix="ytdl-io-bench-") as scratch:
+        print(f"Encoding a {args.seconds}s test video...", file=sys.stderr)
+        sources = make_sources(scratch, args.seconds)
+        size = sum(os.path.getsize(path) for path in sources) / 1048576
+        results = [run(mode, sources, scratch, args.videos, counter) for mode in ('separate', 'fused')]
+
+    print(f"Per video ({size:.1f} MiB of downloaded streams):")
+    print(f"{'Mode':<9} {'FFmpeg runs':>11} {'Read MiB':>9} {'Written MiB':>12} "
+          f"{'Block in MiB':>13} {'Block out MiB':>14} {'Seconds':>8}")
+    for r in results:
+        print(f"{r['mode']:<9} {r['ffmpeg_runs']:11.0f} {r['read_mib']:9.1f} {r['written_mib']:12.1f} "
+              f"{r['block_in_mib']:13.1f} {r['block_out_mib']:14.1f} {r['seconds']:8.2f}")
+    separate, fused = results
+    moved = separate['read_mib'] + separate['written_mib']
+    if moved:
+        saved = moved - fused['read_mib'] - fused['written_mib']
+        print(f"Fused pass moves {saved:.1f} MiB less per video ({saved / moved * 100:.0f}%)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
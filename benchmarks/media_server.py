@@ -0,0 +1,268 @@
+"""Local stand-in for a video site, for offline benchmarks.
+
+Serves a paged playlist API, per-video info and synthetic media in one of
+three shapes: progressive files (with Range support), DASH-style fragments
+and HLS playlists with TS segments. Bandwidth, latency and error injection
+are configurable, so throughput can be measured without touching YouTube:
+
+    python benchmarks/media_server.py --mode hls --videos 50 --bandwidth 2M --latency 0.05
+
+The extractor in yt_dlp_plugins/extractor/bench.py understands its URLs.
+"""
+import argparse
+import http.server
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+
+MODES = ("progressive", "dash", "hls")
+
+DEFAULT_VIDEO_SIZE = 2 * 1024 * 1024
+DEFAULT_SEGMENTS = 16
+DEFAULT_PAGE_SIZE = 100
+
+# Bytes written per socket write, and the unit bandwidth throttling works in
+_CHUNK_SIZE = 64 * 1024
+
+# Media content is this block repeated; it only has to have the right size
+_BLOCK = bytes(range(256)) * (_CHUNK_SIZE // 256)
+
+_RANGE = re.compile(r'bytes=(\d+)-(\d*)')
+
+
+def parse_size(text):
+    """'512K', '2M', '1.5G' or a plain number of bytes"""
+    text = str(text).strip().upper()
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(float(text))
+
+
+class BenchServer:
+    """Threaded HTTP server with the media layout of one benchmark scenario.
+
+    bandwidth is bytes per second per connection (None for unlimited),
+    latency is seconds added before every response, and error_rate is the
+    fraction of media requests answered with a 503. The error sequence is
+    seeded, so a scenario fails the same requests on every run.
+    """
+    def __init__(self, port=0, mode="progressive", videos=10, video_size=DEFAULT_VIDEO_SIZE,
+                 segments=DEFAULT_SEGMENTS, bandwidth=None, latency=0.0, error_rate=0.0,
+                 page_size=DEFAULT_PAGE_SIZE, seed=0):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        self.mode = mode
+        self.videos = videos
+        self.video_size = video_size
+        self.segments = max(1, segments)
+        self.bandwidth = bandwidth
+        self.latency = latency
+        self.error_rate = error_rate
+        self.page_size = page_size
+
+        self.requests = 0
+        self.errors = 0  # Injected 503s
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="bench-server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def playlist_url(self):
+        return f"{self.base_url}/bench/playlist/{self.mode}"
+
+    @property
+    def segment_size(self):
+        return self.video_size // self.segments
+
+    def video_id(self, position):
+        return f"{self.mode[:4]}{position:05d}"
+
+    def playlist_page(self, page):
+        first = page * self.page_size
+        last = min(self.videos, first + self.page_size)
+        return {
+            'id': f"bench-{self.mode}",
+            'title': f"Benchmark playlist ({self.mode}, {self.videos} videos)",
+            'count': self.videos,
+            'entries': [{'id': self.video_id(i), 'title': f"Benchmark video {i + 1}"}
+                        for i in range(first, last)],
+            'next_page': page + 1 if last < self.videos else None,
+        }
+
+    def video_info(self, video_id):
+        """Info dict for the extractor, with one format in the server's mode"""
+        if self.mode == "progressive":
+            fmt = {'url': f"{self.base_url}/media/{video_id}.mp4", 'filesize': self.video_size}
+        elif self.mode == "dash":
+            fmt = {
+                'url': f"{self.base_url}/dash/{video_id}/manifest.mpd",
+                'fragment_base_url': f"{self.base_url}/dash/{video_id}/",
+                'fragments': [{'path': f"seg{k}.m4s"} for k in range(self.segments)],
+                'protocol': 'http_dash_segments',
+                'filesize_approx': self.video_size,
+            }
+        else:
+            fmt = {'url': f"{self.base_url}/hls/{video_id}.m3u8", 'protocol': 'm3u8_native',
+                   'filesize_approx': self.video_size}
+        fmt.update({'format_id': self.mode, 'ext': 'mp4', 'height': 720, 'width': 1280,
+                    'vcodec': 'avc1.4d401f', 'acodec': 'mp4a.40.2'})
+        return {'id': video_id, 'title': f"Benchmark video {video_id}", 'duration': 60,
+                'upload_date': '20240101', 'formats': [fmt]}
+
+    def hls_playlist(self, video_id):
+        lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-TARGETDURATION:4", "#EXT-X-MEDIA-SEQUENCE:0"]
+        for k in range(self.segments):
+            lines += ["#EXTINF:4.0,", f"{video_id}/seg{k}.ts"]
+        lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+    def inject_error(self):
+        if not self.error_rate:
+            return False
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return failed
+
+    def count(self, requests=0, sent=0):
+        with self._lock:
+            self.requests += requests
+            self.bytes_sent += sent
+
+    def stats(self):
+        return {'requests': self.requests, 'injected_errors': self.errors, 'bytes_sent': self.bytes_sent}
+
+    def _handler_class(self):
+        bench = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                bench.count(requests=1)
+                if bench.latency:
+                    time.sleep(bench.latency)
+                path = urllib.parse.urlsplit(self.path)
+                query = urllib.parse.parse_qs(path.query)
+                parts = path.path.strip('/').split('/')
+                try:
+                    if parts[:2] == ['api', 'playlist']:
+                        self.send_json(bench.playlist_page(int(query.get('page', ['0'])[0])))
+                    elif parts[:2] == ['api', 'video'] and len(parts) == 3:
+                        self.send_json(bench.video_info(parts[2]))
+                    elif parts[0] == 'media' and len(parts) == 2:
+                        self.send_media(bench.video_size, ranged=True)
+                    elif parts[0] == 'dash' and len(parts) == 3:
+                        self.send_media(bench.segment_size)
+                    elif parts[0] == 'hls' and len(parts) == 2 and parts[1].endswith('.m3u8'):
+                        self.send_body(bench.hls_playlist(parts[1][:-5]).encode(),
+                                       'application/vnd.apple.mpegurl')
+                    elif parts[0] == 'hls' and len(parts) == 3:
+                        self.send_media(bench.segment_size)
+                    else:
+                        self.send_error(404)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up, e.g. a cancelled download
+                    pass
+
+            def send_json(self, data):
+                self.send_body(json.dumps(data).encode(), 'application/json')
+
+            def send_body(self, body, content_type):
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_media(self, size, ranged=False):
+                if bench.inject_error():
+                    self.send_error(503, "Injected error")
+                    return
+                start, end = 0, size - 1
+                match = _RANGE.match(self.headers.get('Range', '')) if ranged else None
+                if match:
+                    start = int(match.group(1))
+                    end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+                    if start >= size:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f"bytes */{size}")
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Type', 'video/mp4')
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Content-Length', str(end - start + 1))
+                self.end_headers()
+                self.write_throttled(end - start + 1)
+
+            def write_throttled(self, remaining):
+                began = time.monotonic()
+                sent = 0
+                while remaining > 0:
+                    chunk = _BLOCK[:min(remaining, _CHUNK_SIZE)]
+                    self.wfile.write(chunk)
+                    sent += len(chunk)
+                    remaining -= len(chunk)
+                    if bench.bandwidth:
+                        # Sleep until the bytes sent so far fit the allowed rate
+                        ahead = sent / bench.bandwidth - (time.monotonic() - began)
+                        if ahead > 0:
+                            time.sleep(ahead)
+                bench.count(sent=sent)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve synthetic media for offline benchmarks")
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--mode', choices=MODES, default="progressive")
+    parser.add_argument('--videos', type=int, default=10, help="Playlist length")
+    parser.add_argument('--size', default='2M', help="Bytes per video, e.g. 512K or 2M")
+    parser.add_argument('--segments', type=int, default=DEFAULT_SEGMENTS, help="Fragments per DASH/HLS video")
+    parser.add_argument('--bandwidth', default=None, help="Bytes per second per connection, e.g. 1M")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of media requests that fail")
+    args = parser.parse_args(argv)
+
+    server = BenchServer(args.port, args.mode, args.videos, parse_size(args.size), args.segments,
+                         parse_size(args.bandwidth) if args.bandwidth else None,
+                         args.latency, args.error_rate)
+    print(f"Playlist: {server.playlist_url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Offline download benchmarks against the local media server.
+
+Each scenario starts a BenchServer, drives the engine's download_playlist
+or fetch_playlist_info through the bench extractor, and reports videos
+per minute, bytes per second, p95 time to first byte and peak RSS.
+Scenarios run in separate processes so peak RSS is their own:
+
+    python benchmarks/run_benchmarks.py                  # every scenario
+    python benchmarks/run_benchmarks.py dash hls --jobs 6 --fixed
+    python benchmarks/run_benchmarks.py --json results.json
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from media_server import BenchServer, parse_size
+
+# name -> BenchServer settings, plus the engine call to drive
+SCENARIOS = {
+    'progressive': {'mode': 'progressive', 'videos': 20, 'size': '4M'},
+    'throttled': {'mode': 'progressive', 'videos': 20, 'size': '2M', 'bandwidth': '1M', 'latency': 0.05},
+    'dash': {'mode': 'dash', 'videos': 20, 'size': '4M', 'segments': 32},
+    'hls': {'mode': 'hls', 'videos': 20, 'size': '4M', 'segments': 32},
+    'flaky': {'mode': 'progressive', 'videos': 20, 'size': '2M', 'error_rate': 0.1},
+    'listing': {'mode': 'progressive', 'videos': 500, 'latency': 0.01, 'action': 'fetch'},
+}
+
+COLUMNS = (
+    ('scenario', "Scenario", "{}"),
+    ('videos_per_min', "Videos/min", "{:.1f}"),
+    ('mib_per_s', "MiB/s", "{:.2f}"),
+    ('ttfb_p95_s', "p95 TTFB s", "{:.3f}"),
+    ('first_entry_s', "First entry s", "{:.3f}"),
+    ('peak_rss_mib', "Peak RSS MiB", "{:.0f}"),
+    ('failed', "Failed", "{}"),
+)
+
+
+def peak_rss_mib():
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(values, q):
+    """Nearest-rank percentile; None for no values"""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(q * len(values) + 0.5)) - 1))]
+
+
+def run_scenario(name, jobs, fixed):
+    """Run one scenario in this process and return its figures"""
+    from concurrency import AdaptiveConcurrencyController
+    from download_engine import DownloadEngine, DownloadJob, EngineListener
+    from metrics import DownloadMetrics
+    from postprocess_pool import PostprocessPool
+    from scheduler import DownloadScheduler
+
+    settings = dict(SCENARIOS[name])
+    action = settings.pop('action', 'download')
+    server = BenchServer(mode=settings['mode'], videos=settings['videos'],
+                         video_size=parse_size(settings.get('size', '1M')),
+                         segments=settings.get('segments', 16),
+                         bandwidth=parse_size(settings['bandwidth']) if settings.get('bandwidth') else None,
+                         latency=settings.get('latency', 0.0),
+                         error_rate=settings.get('error_rate', 0.0)).start()
+
+    class Listener(EngineListener):
+        first_entry = None
+
+        def playlist_video(self, info, index):
+            if self.first_entry is None:
+                self.first_entry = time.monotonic()
+
+    listener = Listener()
+    scheduler = DownloadScheduler(max_concurrency=jobs)
+    controller = None if fixed else AdaptiveConcurrencyController(scheduler, video_limit=jobs)
+    metrics = DownloadMetrics()
+    postprocess_pool = PostprocessPool()
+    engine = DownloadEngine(listener, scheduler=scheduler, controller=controller, metrics=metrics,
+                            postprocess_pool=postprocess_pool)
+    output_dir = tempfile.mkdtemp(prefix="ytdl-bench-")
+
+    start = time.monotonic()
+    try:
+        if action == 'fetch':
+            info, videos, skipped = engine.fetch_playlist_info(server.playlist_url)
+            done, failed = len(videos), skipped
+            ttfbs = []
+        else:
+            job = DownloadJob(server.playlist_url, "720p", "video", False, output_dir)
+            results = engine.download_playlist(server.playlist_url, job)
+            done = sum(1 for result in results if result.success)
+            failed = len(results) - done
+            ttfbs = [result.job.timings['first_byte'] - result.job.timings['download_started']
+                     for result in results
+                     if 'first_byte' in result.job.timings and 'download_started' in result.job.timings]
+        elapsed = time.monotonic() - start
+    finally:
+        scheduler.shutdown(wait=False)
+        postprocess_pool.shutdown()
+        server.stop()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        'scenario': name,
+        'jobs': jobs,
+        'adaptive': not fixed,
+        'elapsed_s': round(elapsed, 3),
+        'videos': done,
+        'failed': failed,
+        'videos_per_min': done * 60 / elapsed if elapsed else None,
+        'mib_per_s': metrics.bytes.total() / elapsed / 1048576 if action != 'fetch' else None,
+        'ttfb_p95_s': percentile(ttfbs, 0.95),
+        'first_entry_s': listener.first_entry - start if listener.first_entry else None,
+        'peak_rss_mib': peak_rss_mib(),
+        'retries': metrics.retries.total(),
+        'server': server.stats(),
+    }
+
+
+def print_table(results):
+    rows = [[column[1] for column in COLUMNS]]
+    for result in results:
+        rows.append([fmt.format(result[key]) if result.get(key) is not None else "-"
+                     for key, _, fmt in COLUMNS])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(COLUMNS))]
+    for row in rows:
+        print("  ".join(cell.rjust(width) if i else cell.ljust(width)
+                        for i, (cell, width) in enumerate(zip(row, widths))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run offline download benchmarks")
+    parser.add_argument('scenarios', nargs='*',
+                        help=f"Scenarios to run (default: all): {', '.join(SCENARIOS)}")
+    parser.add_argument('--jobs', '-j', type=int, default=3, help="Concurrent downloads")
+    parser.add_argument('--fixed', action='store_true', help="Disable adaptive concurrency")
+    parser.add_argument('--json', default=None, metavar='PATH', help="Also write the results as JSON")
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    names = args.scenarios + ([args.child] if args.child else [])
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    if args.child:
+        logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+        print(json.dumps(run_scenario(args.child, args.jobs, args.fixed)))
+        return 0
+
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        command = [sys.executable, os.path.abspath(__file__), '--child', name, '--jobs', str(args.jobs)]
+        if args.fixed:
+            command.append('--fixed')
+        print(f"Running {name}...", file=sys.stderr)
+        process = subprocess.run(command, stdout=subprocess.PIPE, text=True)
+        if process.returncode != 0:
+            print(f"Scenario {name} failed with exit code {process.returncode}", file=sys.stderr)
+            continue
+        results.append(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
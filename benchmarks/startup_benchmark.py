@@ -0,0 +1,104 @@
+"""Cold start benchmark for the desktop app.
+
+Starts the app in fresh processes and reports, per run and as medians:
+how long importing the UI module takes, building DownloaderApp, time to
+first paint, and when the background warm-up (yt_dlp import and FFmpeg
+probe) finished. Whether yt_dlp was already imported at first paint is
+reported too, since that is what the warm-up is meant to avoid.
+
+    python benchmarks/startup_benchmark.py --runs 5
+
+Without a display only the import is measured.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Give up on a run that has not painted after this many seconds
+PAINT_TIMEOUT = 30
+
+FIELDS = (
+    ('import_ms', "Import ms"),
+    ('init_ms', "Init ms"),
+    ('first_paint_ms', "First paint ms"),
+    ('ready_ms', "Warm-up done ms"),
+)
+
+
+def measure():
+    """One cold start, in this process; every time is from process start"""
+    started = time.perf_counter()
+    sys.path.insert(0, REPO_DIR)
+    import youtube_downloader_ui as ui
+    result = {'import_ms': (time.perf_counter() - started) * 1000,
+              'yt_dlp_at_import': 'yt_dlp' in sys.modules}
+
+    try:
+        root = ui.tk.Tk()
+    except ui.tk.TclError as e:
+        result['error'] = f"no display: {e}"
+        return result
+
+    app = ui.DownloaderApp(root)
+    result['init_ms'] = (time.perf_counter() - started) * 1000
+    deadline = time.monotonic() + PAINT_TIMEOUT
+    while app.first_paint_ms is None and time.monotonic() < deadline:
+        root.update()
+    result['first_paint_ms'] = (time.perf_counter() - started) * 1000
+    result['yt_dlp_at_paint'] = 'yt_dlp' in sys.modules
+
+    while not app.warmed_up.is_set() and time.monotonic() < deadline:
+        root.update()
+        time.sleep(0.005)
+    result['ready_ms'] = (time.perf_counter() - started) * 1000
+    root.destroy()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the app's cold start")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', default=None, metavar='PATH', help="Also write the results as JSON")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure()))
+        return 0
+
+    runs = []
+    # Run from a scratch directory, since the app writes its log to the working directory
+    with tempfile.TemporaryDirectory() as scratch:
+        for i in range(args.runs):
+            process = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'],
+                                     cwd=scratch, stdout=subprocess.PIPE, text=True)
+            if process.returncode != 0:
+                print(f"Run {i + 1} failed with exit code {process.returncode}", file=sys.stderr)
+                continue
+            runs.append(json.loads(process.stdout.strip().splitlines()[-1]))
+    if not runs:
+        return 1
+
+    for i, run in enumerate(runs, 1):
+        cells = [f"{label} {run[key]:.0f}" for key, label in FIELDS if key in run]
+        print(f"Run {i}: " + ", ".join(cells) + (f" ({run['error']})" if 'error' in run else ""))
+    medians = {key: statistics.median(run[key] for run in runs) for key, _ in FIELDS if key in runs[0]}
+    print("Median: " + ", ".join(f"{label} {medians[key]:.0f}" for key, label in FIELDS if key in medians))
+    if 'yt_dlp_at_paint' in runs[0]:
+        print(f"yt_dlp imported before first paint: {any(run['yt_dlp_at_paint'] for run in runs)}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'runs': runs, 'median': medians}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
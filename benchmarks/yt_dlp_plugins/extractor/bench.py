@@ -0,0 +1,44 @@
+"""yt-dlp extractors for the benchmark media server (benchmarks/media_server.py).
+
+yt-dlp loads these as plugins when the benchmarks directory is on
+sys.path, which it is when a benchmark script is run directly.
+"""
+import itertools
+
+from yt_dlp.extractor.common import InfoExtractor
+
+_BASE = r'(?P<base>https?://(?:127\.0\.0\.1|localhost):\d+)/bench'
+
+
+class BenchVideoIE(InfoExtractor):
+    IE_NAME = 'bench'
+    _VALID_URL = _BASE + r'/watch/(?P<id>[\w-]+)'
+
+    def _real_extract(self, url):
+        base, video_id = self._match_valid_url(url).group('base', 'id')
+        return self._download_json(f"{base}/api/video/{video_id}", video_id)
+
+
+class BenchPlaylistIE(InfoExtractor):
+    IE_NAME = 'bench:playlist'
+    _VALID_URL = _BASE + r'/playlist/(?P<id>[\w-]+)'
+
+    def _entries(self, base, playlist_id, first_page):
+        page = first_page
+        for number in itertools.count(1):
+            for entry in page['entries']:
+                yield self.url_result(f"{base}/bench/watch/{entry['id']}", BenchVideoIE,
+                                      entry['id'], entry.get('title'))
+            if page.get('next_page') is None:
+                return
+            # Listing pages are fetched only as the entries are consumed
+            page = self._download_json(f"{base}/api/playlist/{playlist_id}", playlist_id,
+                                       note=f"Downloading page {number + 1}",
+                                       query={'page': page['next_page']})
+
+    def _real_extract(self, url):
+        base, playlist_id = self._match_valid_url(url).group('base', 'id')
+        first_page = self._download_json(f"{base}/api/playlist/{playlist_id}", playlist_id,
+                                         query={'page': 0})
+        return self.playlist_result(self._entries(base, playlist_id, first_page), first_page['id'],
+                                    first_page.get('title'), playlist_count=first_page.get('count'))
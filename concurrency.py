@@ -0,0 +1,197 @@
+import collections
+import logging
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Messages that mean the server is asking us to slow down
+THROTTLE_PATTERN = re.compile(r'HTTP Error 429|Too Many Requests|rate[- ]limit', re.IGNORECASE)
+
+ConcurrencyDecision = collections.namedtuple('ConcurrencyDecision', [
+    'time', 'action', 'reason', 'video_limit', 'fragment_limit',
+    'throughput', 'errors', 'throttles',
+])
+
+
+def is_throttle_message(message):
+    """True if an error or warning from yt-dlp looks like rate limiting"""
+    return bool(message) and THROTTLE_PATTERN.search(str(message)) is not None
+
+
+class AdaptiveConcurrencyController:
+    """AIMD controller for video-level and fragment-level parallelism.
+
+    Progress hooks feed it byte counts, errors and throttle responses.
+    Every `interval` seconds it compares aggregate throughput with the
+    previous window and either adds one video slot and a couple of
+    fragment slots (additive increase) or halves both when the server
+    throttles us (multiplicative decrease). If an increase did not pay
+    off, it steps back and holds for a few windows. Video limits are
+    pushed to the scheduler immediately; fragment limits apply to jobs
+    that start afterwards. Every decision is logged and kept in
+    `decisions` for auditing.
+    """
+    def __init__(self, scheduler=None, video_limit=3, fragment_limit=8,
+                 min_videos=1, max_videos=8, min_fragments=1, max_fragments=16,
+                 interval=5.0, gain_threshold=0.05, hold_windows=3, history=200):
+        self.scheduler = scheduler
+        self.video_limit = video_limit
+        self.fragment_limit = fragment_limit
+        # A starting limit above the default ceiling (--jobs 16) raises it, so
+        # the first increase can't lower concurrency
+        self.min_videos, self.max_videos = min_videos, max(max_videos, video_limit)
+        self.min_fragments, self.max_fragments = min_fragments, max(max_fragments, fragment_limit)
+        self.interval = interval
+        self.gain_threshold = gain_threshold  # Relative gain that justifies the last increase
+        self.hold_windows = hold_windows
+        self.decisions = collections.deque(maxlen=history)
+
+        self._lock = threading.Lock()
+        self._job_bytes = {}  # job_id -> last downloaded_bytes seen
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_errors = 0
+        self._window_throttles = 0
+        self._last_throughput = None
+        self._last_action = None
+        self._hold = 0
+
+        if self.scheduler:
+            self.scheduler.set_concurrency(self.video_limit)
+
+    def record_progress(self, job_id, d):
+        """Feed a yt-dlp progress dict. Called from download threads."""
+        downloaded = d.get('downloaded_bytes')
+        if downloaded is None:
+            return
+        with self._lock:
+            previous = self._job_bytes.get(job_id, 0)
+            # Counters restart per format (video then audio), so never go negative
+            self._window_bytes += downloaded - previous if downloaded >= previous else downloaded
+            if d.get('status') == 'finished':
+                self._job_bytes.pop(job_id, None)
+            else:
+                self._job_bytes[job_id] = downloaded
+        self._maybe_evaluate()
+
+    def record_error(self, message):
+        """Feed an error or warning; throttling responses are counted separately"""
+        with self._lock:
+            if is_throttle_message(message):
+                self._window_throttles += 1
+            else:
+                self._window_errors += 1
+        self._maybe_evaluate()
+
+    def job_done(self, job_id):
+        with self._lock:
+            self._job_bytes.pop(job_id, None)
+
+    def _maybe_evaluate(self):
+        now = time.monotonic()
+        if now - self._window_start < self.interval:
+            return
+        with self._lock:
+            # Another thread may have closed this window already
+            if now - self._window_start < self.interval:
+                return
+            decision = self._evaluate(now)
+        if decision:
+            self._apply(decision)
+
+    def _evaluate(self, now):
+        """Close the current window and decide on new limits. Lock is held."""
+        elapsed = now - self._window_start
+        throughput = self._window_bytes / elapsed if elapsed > 0 else 0.0
+        errors, throttles = self._window_errors, self._window_throttles
+        videos, fragments = self.video_limit, self.fragment_limit
+        previous = self._last_throughput
+
+        self._window_start = now
+        self._window_bytes = 0
+        self._window_errors = 0
+        self._window_throttles = 0
+
+        if throttles:
+            # Multiplicative decrease on any throttling response
+            action, reason = "decrease", f"{throttles} throttle responses"
+            videos = max(self.min_videos, videos // 2)
+            fragments = max(self.min_fragments, fragments // 2)
+            self._hold = self.hold_windows
+        elif errors > videos:
+            action, reason = "decrease", f"{errors} errors in window"
+            videos = max(self.min_videos, videos - 1)
+            fragments = max(self.min_fragments, fragments // 2)
+            self._hold = self.hold_windows
+        elif throughput == 0:
+            # Nothing downloading, nothing to learn from this window
+            return None
+        elif (self._last_action == "increase" and previous
+              and throughput < previous * (1 + self.gain_threshold)):
+            # The last increase did not help: the link is saturated
+            action, reason = "step back", "no gain from last increase"
+            videos = max(self.min_videos, videos - 1)
+            fragments = max(self.min_fragments, fragments - 2)
+            self._hold = self.hold_windows
+        elif self._hold > 0:
+            self._hold -= 1
+            action, reason = "hold", f"cooling down, {self._hold} windows left"
+        else:
+            action, reason = "increase", "no errors or throttling"
+            videos = min(self.max_videos, videos + 1)
+            fragments = min(self.max_fragments, fragments + 2)
+            if (videos, fragments) == (self.video_limit, self.fragment_limit):
+                action, reason = "hold", "at maximum"
+
+        self._last_throughput = throughput
+        self._last_action = action
+        self.video_limit, self.fragment_limit = videos, fragments
+        return ConcurrencyDecision(time.time(), action, reason, videos, fragments,
+                                   throughput, errors, throttles)
+
+    def _apply(self, decision):
+        self.decisions.append(decision)
+        logger.info(f"Concurrency {decision.action}: videos={decision.video_limit}, "
+                    f"fragments={decision.fragment_limit} ({decision.reason}; "
+                    f"{decision.throughput / 1048576:.2f} MiB/s, {decision.errors} errors, "
+                    f"{decision.throttles} throttles)")
+        if self.scheduler and decision.action != "hold":
+            self.scheduler.set_concurrency(decision.video_limit)
+
+
+class YtdlpLogger:
+    """Routes yt-dlp's own messages into logging and watches for throttling.
+
+    Retry warnings such as 'HTTP Error 429' never reach progress hooks,
+    so this is where the controller learns about them. With a
+    DownloadMetrics it also counts retries and the sleeps between them.
+    """
+    def __init__(self, controller=None, metrics=None):
+        self.controller = controller
+        self.metrics = metrics
+
+    def debug(self, msg):
+        # yt-dlp sends both debug and info output here, retry sleeps included
+        logger.debug(msg)
+        if self.metrics and 'Sleeping' in msg:
+            self.metrics.record_sleep(msg)
+
+    def info(self, msg):
+        logger.info(msg)
+        if self.metrics and 'Sleeping' in msg:
+            self.metrics.record_sleep(msg)
+
+    def warning(self, msg):
+        logger.warning(msg)
+        if self.metrics and 'Retrying' in msg:
+            self.metrics.record_retry()
+        if self.controller and is_throttle_message(msg):
+            self.controller.record_error(msg)
+
+    def error(self, msg):
+        logger.error(msg)
+        # Plain failures are reported by the engine when the job ends
+        if self.controller and is_throttle_message(msg):
+            self.controller.record_error(msg)
@@ -0,0 +1,44 @@
+import yt_dlp
+
+from fused_mux import fuse_postprocessors
+
+
+class DeferredPostprocessYoutubeDL(yt_dlp.YoutubeDL):
+    """YoutubeDL that queues post-processing instead of running it inline.
+
+    yt-dlp merges formats and runs FFmpeg post-processors at the end of
+    process_info, inside the download call. Here that work is recorded and
+    run later by run_deferred(), so a pipeline can do it in its own stage.
+    """
+    def __init__(self, params=None, auto_init=True):
+        super().__init__(params, auto_init)
+        self.deferred = []
+        self.fused = False  # A FusedMuxPP was queued; it also sets the file date
+
+    def post_process(self, filename, info, files_to_move=None):
+        # One FFmpeg pass instead of separate merge, remux and embedding passes
+        if fuse_postprocessors(self, info):
+            self.fused = True
+        # process_info strips keys from this dict afterwards, so keep a copy
+        self.deferred.append((filename, dict(info), files_to_move, info))
+        info['filepath'] = filename
+        return info
+
+    def run_deferred(self, pool=None):
+        """Run all queued post-processing, in a PostprocessPool if given.
+        Returns the final info dicts."""
+        results = []
+        while self.deferred:
+            filename, info, files_to_move, original = self.deferred.pop(0)
+            # Moving a finished file is not worth the trip to another process
+            offload = pool and (info.get('__postprocessors') or self._pps['post_process']
+                                or self._pps['after_move'])
+            filepath = pool.run(self.params, filename, info, files_to_move) if offload else None
+            if filepath is not None:
+                info['filepath'] = filepath
+            else:
+                info = yt_dlp.YoutubeDL.post_process(self, filename, info, files_to_move)
+            # Point the requested_downloads entry at the final file
+            original['filepath'] = info.get('filepath', filename)
+            results.append(info)
+        return results
@@ -0,0 +1,128 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from metadata_cache import video_key_for_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_PATH = Path.home() / ".cache" / "youtube_downloader" / "archive.sqlite3"
+
+
+def quality_height(quality):
+    """720 for "720p"; 0 when the quality has no height (audio, best...)"""
+    match = re.match(r'(\d+)', str(quality or ''))
+    return int(match.group(1)) if match else 0
+
+
+def archive_key(info=None, url=None):
+    """(extractor, video_id) for an info dict or URL, without network access.
+
+    Flat playlist entries carry 'ie_key', full results 'extractor_key'.
+    Returns None when the video can't be identified.
+    """
+    if info and info.get('id'):
+        extractor = info.get('extractor_key') or info.get('ie_key')
+        if extractor:
+            return extractor, str(info['id'])
+    if url:
+        key = video_key_for_url(url)
+        if key:
+            extractor, _, video_id = key.partition(':')
+            return extractor, video_id
+    return None
+
+
+def archive_format(format_type, audio_codec=None):
+    """What an archive entry is stored under: "video", or "audio/<codec>".
+
+    Audio is kept apart per codec, "native" for the source codec, so a
+    native m4a download doesn't stop a later MP3 one.
+    """
+    if format_type == "audio":
+        return f"audio/{audio_codec or 'native'}"
+    return format_type
+
+
+class DownloadArchive:
+    """Persistent index of downloaded videos, keyed by extractor and video ID.
+
+    Each entry records the format type (video/audio), audio codec and
+    quality it was downloaded at, so a 360p copy doesn't stop a later
+    1080p download and a native audio file doesn't stop a later MP3.
+    The whole index is held in memory as a dict, so checking a video is an
+    O(1) lookup that never touches the network or the disk; SQLite only
+    makes it outlive the process.
+    """
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        self.path = str(path)
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS archive (
+                    extractor TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    format_type TEXT NOT NULL,
+                    quality TEXT,
+                    title TEXT,
+                    filepath TEXT,
+                    downloaded_at REAL NOT NULL,
+                    PRIMARY KEY (extractor, video_id, format_type)
+                )""")
+            rows = self._db.execute("SELECT extractor, video_id, format_type, quality FROM archive")
+            # (extractor, video_id, format_type) -> quality height
+            self._index = {(extractor, video_id, format_type): quality_height(quality)
+                           for extractor, video_id, format_type, quality in rows}
+
+    def __len__(self):
+        return len(self._index)
+
+    def has(self, key, format_type, quality=None, audio_codec=None):
+        """True if key was downloaded as format_type at `quality` or better"""
+        if key is None:
+            return False
+        height = self._index.get((key[0], key[1], archive_format(format_type, audio_codec)))
+        if height is None:
+            return False
+        return format_type == "audio" or height >= quality_height(quality)
+
+    def add(self, key, format_type, quality=None, title=None, filepath=None, audio_codec=None):
+        """Record a finished download; a better quality replaces a worse one"""
+        if key is None:
+            return False
+        format_type = archive_format(format_type, audio_codec)
+        index_key = (key[0], key[1], format_type)
+        height = quality_height(quality)
+        with self._lock:
+            if self._index.get(index_key, -1) > height:
+                return False
+            self._index[index_key] = height
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO archive (extractor, video_id, format_type, quality, title, filepath, downloaded_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key[0], key[1], format_type, quality, title, filepath, time.time()))
+        return True
+
+    def recent(self, limit=5):
+        """Most recent downloads as dicts, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT title, filepath, format_type, downloaded_at FROM archive "
+                "ORDER BY downloaded_at DESC LIMIT ?", (limit,)).fetchall()
+        return [{'title': title, 'filepath': filepath, 'format_type': format_type.partition('/')[0],
+                 'downloaded_at': at}
+                for title, filepath, format_type, at in reversed(rows)]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,1180 @@
+import os
+import re
+import concurrent.futures
+import contextlib
+import logging
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from concurrency import YtdlpLogger
+from download_archive import archive_key
+from file_dates import apply_upload_date_timestamp
+from job_journal import journal_key
+from pipeline import DEFAULT_POSTPROCESS_WORKERS, DownloadPipeline
+from format_planner import FormatPlanner
+from postprocess_pool import ffmpeg_threads
+from renditions import Rendition, render, rendition_commands, source_settings
+from scheduler import DownloadScheduler
+
+logger = logging.getLogger(__name__)
+
+# Browser-like headers sent with every request
+DEFAULT_HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+# Parallel per-video metadata fetches and how long one may take
+DEFAULT_METADATA_WIDTH = 8
+DEFAULT_METADATA_TIMEOUT = 30
+
+# Info fields kept on a finished JobResult once it is compacted
+SUMMARY_FIELDS = {
+    'id', 'title', 'extractor', 'extractor_key', 'webpage_url', 'upload_date',
+    'duration', 'format_id', 'format_note', 'ext', 'filesize', 'filesize_approx',
+}
+
+# Durations added to stage events and stage metrics: (field, from stage, to stage)
+STAGE_DURATIONS = (
+    ('queue_s', 'queued', 'started'),
+    ('extract_s', 'started', 'extracted'),
+    ('ttfb_s', 'download_started', 'first_byte'),
+    ('transfer_s', 'download_started', 'downloaded'),
+    ('postprocess_s', 'downloaded', 'finished'),
+    ('total_s', 'queued', 'finished'),
+    ('total_s', 'queued', 'failed'),
+)
+
+# Marks a playlist entry that has no usable URL
+_NO_URL = object()
+
+# Audio codecs that can be requested explicitly; audio in any other codec is re-encoded
+AUDIO_CODECS = ("mp3", "m4a", "opus", "vorbis", "flac", "wav")
+
+# FFmpegExtractAudio mapping used when no codec is requested: Opus in webm is
+# copied into .opus, AAC in mp4 into .m4a, and m4a/opus/mp3 files are kept
+NATIVE_AUDIO = 'webm>opus/best'
+
+# Bitrate for re-encoded audio, in kbps
+AUDIO_QUALITY = '192'
+
+
+class DownloadCancelled(Exception):
+    """Raised from progress hooks when the engine has been cancelled"""
+    pass
+
+
+def resolve_entry_url(entry):
+    """Get a downloadable URL for a (possibly flat) playlist entry"""
+    if not entry:
+        return None
+    # Try different ways to get the video URL
+    if entry.get('url'):
+        return entry['url']
+    if entry.get('id'):
+        # Construct URL from ID
+        return f"https://www.youtube.com/watch?v={entry['id']}"
+    if entry.get('webpage_url'):
+        return entry['webpage_url']
+    return None
+
+
+def clean_error_message(error_msg):
+    """Strip terminal escape sequences and yt-dlp boilerplate from an error"""
+    error_msg = re.sub(r'\x1b\[[0-9;]*m', '', str(error_msg))
+    error_msg = re.sub(r'See\s+https?://[^\s]+', '', error_msg)
+    error_msg = re.sub(r'Also see\s+https?://[^\s]+', '', error_msg)
+    return error_msg.replace("ERROR:", "").strip()
+
+
+def _iter_lazy_entries(entries):
+    """Iterate playlist entries as returned by an extractor, page by page"""
+    from yt_dlp.utils import PagedList
+
+    if isinstance(entries, PagedList):
+        # Paged listings are fetched one page per getslice() call
+        page_size = getattr(entries, '_pagesize', None) or 50
+        start = 0
+        while True:
+            page = entries.getslice(start, start + page_size)
+            if not page:
+                return
+            yield from page
+            start += page_size
+    else:
+        yield from entries or []
+
+
+def new_ydl(params, deferred=False):
+    """Create a YoutubeDL, or a DeferredPostprocessYoutubeDL with deferred=True.
+
+    yt_dlp loads hundreds of extractor modules when imported, so it is
+    imported here on first use instead of with this module; the UI shows
+    its window first and imports it in the background.
+    """
+    if deferred:
+        from deferred_ydl import DeferredPostprocessYoutubeDL
+        return DeferredPostprocessYoutubeDL(params)
+    import yt_dlp
+    return yt_dlp.YoutubeDL(params)
+
+
+class DownloadJob:
+    """A single video download request and its live state"""
+    def __init__(self, url, quality="720p", format_type="video", include_subs=False,
+                 output_dir=None, index=None, info=None, cookiefile=None, job_id=None,
+                 run_id=None, audio_codec=None, renditions=None):
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.url = url
+        self.quality = quality
+        self.format_type = format_type
+        self.include_subs = include_subs
+        self.audio_codec = audio_codec  # Re-encode audio to this codec; None keeps the source codec
+        # Several outputs made from one download; the download itself is planned to serve them all
+        self.renditions = list(renditions or [])
+        if self.renditions:
+            self.format_type, self.quality = source_settings(self.renditions)
+            self.audio_codec = None
+        self.output_dir = str(output_dir or Path.home() / "Downloads")
+        self.index = index  # Position in the playlist, None for single videos
+        self.info = info  # Flat or full info dict if already known
+        self.cookiefile = cookiefile
+        self.run_id = run_id  # Journaled playlist run this job belongs to
+        self.item_key = journal_key(info, url)
+
+        # Live state, updated by the engine
+        self.status = "pending"  # pending, downloading, completed, error
+        self.progress = 0.0
+        self.attempts = 0
+        self.error = None
+        self.timings = {}  # Stage name -> time.monotonic() when the job reached it
+        self.bytes_seen = {}  # Downloaded bytes per file, for the byte counter
+        self.format_plan = None  # FormatPlan chosen at extraction
+        self.outputs = {}  # Rendition label -> file, for multi-output jobs
+
+    @property
+    def title(self):
+        if self.info and self.info.get('title'):
+            return self.info['title']
+        if self.index is not None:
+            return f"Video {self.index+1}"
+        return 'Unknown Video'
+
+    def with_entry(self, entry, index):
+        """Create a job for a playlist entry that shares this job's settings"""
+        return DownloadJob(resolve_entry_url(entry), self.quality, self.format_type,
+                           self.include_subs, self.output_dir, index=index,
+                           info=entry, cookiefile=self.cookiefile, run_id=self.run_id,
+                           audio_codec=self.audio_codec, renditions=self.renditions)
+
+
+class JobResult:
+    """Outcome of a finished DownloadJob"""
+    def __init__(self, job, success, filepath=None, info=None, error=None, skipped=False):
+        self.job = job
+        self.job_id = job.job_id
+        self.success = success
+        self.skipped = skipped  # Already downloaded, nothing was fetched
+        self.filepath = filepath
+        self.info = info
+        self.error = error
+
+    @property
+    def title(self):
+        if self.info and self.info.get('title'):
+            return self.info['title']
+        return self.job.title
+
+    def compact(self):
+        """Drop the full info dicts, keeping only what summaries need.
+
+        Info dicts carry every format and can be hundreds of KB, so a long
+        playlist run keeps only this small summary per finished video.
+        """
+        self.info = {k: v for k, v in (self.info or {}).items() if k in SUMMARY_FIELDS}
+        self.job.info = self.info
+
+    def __repr__(self):
+        state = "ok" if self.success else f"failed: {self.error}"
+        return f"<JobResult {self.job_id} {self.title!r} {state}>"
+
+
+class EngineListener:
+    """Receives engine events. Every method is called from worker threads.
+
+    Subclass and override only what you need; the defaults do nothing.
+    """
+    def status(self, message):
+        """A human readable status line"""
+        pass
+
+    def job_progress(self, job, d):
+        """Raw yt-dlp progress dict for a job that is downloading"""
+        pass
+
+    def job_state(self, job, message=None):
+        """A job changed status (pending/downloading/completed/error)"""
+        pass
+
+    def job_finished(self, result):
+        """A job finished, successfully or not"""
+        pass
+
+    def playlist_progress(self, completed, failed, total):
+        """Overall playlist counters after each item finishes"""
+        pass
+
+    def playlist_found(self, playlist_info, entries):
+        """A playlist was enumerated; entries are flat and not yet fetched"""
+        pass
+
+    def playlist_video(self, info, index):
+        """A playlist entry became available while fetching playlist info"""
+        pass
+
+
+class DownloadEngine:
+    """Headless download engine wrapping yt-dlp.
+
+    Knows nothing about Tk: all feedback goes through an EngineListener,
+    so the same engine drives the desktop UI and batch runs. Playlist items
+    run on a DownloadScheduler, which may be shared between engines so
+    several playlists stay under one concurrency bound. Playlists go
+    through a DownloadPipeline, one stage per kind of work. An optional
+    AdaptiveConcurrencyController tunes that bound and the fragment
+    parallelism from what the progress hooks observe, and an optional
+    MetadataCache lets repeat lookups skip the extractor round trip. With a
+    JobJournal, playlist runs survive crashes and can be resumed, and a
+    DownloadArchive skips videos that were downloaded before. An optional
+    EventLog receives a structured event for every stage a job reaches, and
+    DownloadMetrics gets stage durations, outcomes and transferred bytes.
+    A Profiler can profile chosen jobs and stages while the engine runs,
+    and a PostprocessPool moves merging and FFmpeg work to worker processes.
+    """
+    def __init__(self, listener=None, scheduler=None, controller=None, metadata_cache=None,
+                 pipeline_options=None, journal=None, archive=None, event_log=None,
+                 metrics=None, profiler=None, postprocess_pool=None):
+        self.listener = listener or EngineListener()
+        self.scheduler = scheduler
+        self.controller = controller
+        self.metadata_cache = metadata_cache
+        self.pipeline_options = pipeline_options or {}  # Stage worker counts and queue size
+        self.journal = journal
+        self.archive = archive
+        self.event_log = event_log
+        self.metrics = metrics
+        self.profiler = profiler
+        self.postprocess_pool = postprocess_pool
+        self.cancel_event = threading.Event()
+        self.progress_lock = threading.Lock()  # Guards playlist counters
+        self.completed_videos = 0
+        self.failed_videos = 0
+        self.skipped_videos = 0  # Archived, or finished by an earlier run of a resumed playlist
+        self.total_videos = 0
+
+    def cancel(self):
+        """Stop running jobs at their next progress callback and fail queued ones"""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    @property
+    def ffmpeg_threads(self):
+        """FFmpeg threads per job, dividing the cores between concurrent post-processing"""
+        if self.postprocess_pool:
+            return self.postprocess_pool.threads_per_job
+        return ffmpeg_threads(self.pipeline_options.get('postprocess_workers', DEFAULT_POSTPROCESS_WORKERS))
+
+    def build_ydl_opts(self, job):
+        """Configure yt-dlp options for a job with optimized settings"""
+        output_path = Path(job.output_dir)
+        ydl_opts = {
+            'format': FormatPlanner(job.quality, job.format_type, job.audio_codec,
+                                    on_plan=lambda plan: self._record_plan(job, plan)),
+            'outtmpl': str(output_path / '%(title)s.%(ext)s'),
+            'progress_hooks': [self._make_progress_hook(job)],
+            'writesubtitles': job.include_subs,
+            'writeautomaticsub': job.include_subs,
+            'subtitleslangs': ['en'],
+            'fragment_retries': 5,  # Increase retries
+            'retries': 5,  # Increase retries
+            'file_access_retries': 5,  # Increase retries
+            'continuedl': True,  # Resume .part files left by an interrupted run
+            'extractor_retries': 5,  # Increase retries
+            'socket_timeout': 20,  # Increase timeout
+            'buffersize': 1024 * 1024 * 4,  # Larger buffer size
+            'http_chunk_size': 1048576 * 4,  # Larger chunk size
+            'concurrent_fragment_downloads': self.controller.fragment_limit if self.controller else 8,
+            'verbose': True,
+            'http_headers': dict(DEFAULT_HTTP_HEADERS),
+            'postprocessor_args': {
+                'ffmpeg': ['-threads', str(self.ffmpeg_threads)]
+            }
+        }
+
+        # Add audio-only options if needed
+        if job.format_type == "audio" and not job.renditions:
+            # Stream copy unless a codec was asked for
+            ydl_opts['postprocessors'] = [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': job.audio_codec or NATIVE_AUDIO,
+                'preferredquality': AUDIO_QUALITY,
+            }]
+
+        # Let the controller see retry warnings such as HTTP 429, and count retries
+        if self.controller or self.metrics:
+            ydl_opts['logger'] = YtdlpLogger(self.controller, self.metrics)
+
+        # Make sure we include cookies for private videos if available
+        if job.cookiefile:
+            ydl_opts['cookiefile'] = str(job.cookiefile)
+
+        return ydl_opts
+
+    def extract_info(self, ydl, url, process=True, need_streams=True):
+        """ydl.extract_info(url, download=False) that goes through the metadata cache.
+
+        The cache holds unprocessed extractor results, so format selection
+        still runs locally with this ydl's options on every call.
+        need_streams=False accepts a cached result whose stream URLs have
+        expired, for callers that only display metadata.
+        """
+        if self.metadata_cache is None:
+            return ydl.extract_info(url, download=False, process=process)
+
+        ie_result = self.metadata_cache.get(url, need_streams=need_streams)
+        if ie_result is None:
+            ie_result = ydl.extract_info(url, download=False, process=False)
+            try:
+                self.metadata_cache.put(ie_result)
+            except Exception as e:
+                # The fresh result is still used, just not stored
+                logger.warning(f"Could not cache metadata for {url}: {str(e)}")
+        else:
+            logger.info(f"Using cached metadata for {url}")
+
+        if process and ie_result is not None:
+            return ydl.process_ie_result(ie_result, download=False)
+        return ie_result
+
+    @staticmethod
+    def download_info(ydl, info):
+        """Download a video from an already extracted info dict.
+
+        Unlike ydl.download([url]) this does not extract the page a second
+        time; format selection re-runs locally on the info's format list,
+        the same way yt-dlp's --load-info-json does. Returns the updated info
+        dict, which carries 'requested_downloads' with the output paths.
+        """
+        return ydl.process_ie_result(info, download=True)
+
+    def _make_progress_hook(self, job):
+        """Create a yt-dlp progress hook bound to one job"""
+        def progress_hook(d):
+            if self.cancelled:
+                raise DownloadCancelled("Download cancelled by user")
+
+            if self.controller:
+                self.controller.record_progress(job.job_id, d)
+
+            if d['status'] == 'downloading' and (self.event_log is not None or self.metrics):
+                if 'first_byte' not in job.timings and d.get('downloaded_bytes'):
+                    self._mark(job, 'first_byte')
+                if self.event_log is not None:
+                    self.event_log.progress(job.job_id, d)
+
+            if self.metrics and d.get('downloaded_bytes') is not None:
+                # Counters restart per file (video, then audio), so track each one
+                filename = d.get('filename')
+                downloaded = d['downloaded_bytes']
+                previous = job.bytes_seen.get(filename, 0)
+                self.metrics.add_bytes(downloaded - previous if downloaded >= previous else downloaded)
+                job.bytes_seen[filename] = downloaded
+
+            if d['status'] == 'downloading':
+                percent = d.get('_percent_str', '0%').strip()
+                if percent.endswith('%'):
+                    try:
+                        job.progress = float(percent[:-1])
+                    except ValueError:
+                        pass
+                self.listener.job_progress(job, d)
+            elif d['status'] == 'finished':
+                job.progress = 100.0
+                self.listener.job_progress(job, d)
+        return progress_hook
+
+    def _profile(self, job, stage):
+        """Context that profiles a job's stage when the profiler selects it"""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.profile(stage, job.job_id, job.output_dir, self._profile_aliases(job))
+
+    def _trace_extract(self, job):
+        """Context that traces allocations of a job's extraction when selected"""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.trace_memory('extract', job.job_id, job.output_dir, self._profile_aliases(job))
+
+    @staticmethod
+    def _profile_aliases(job):
+        return (job.url, job.item_key, (job.info or {}).get('id'))
+
+    def _set_state(self, job, status, message=None):
+        job.status = status
+        # Final states are journaled by _finish_item, together with the file path
+        if status not in ("completed", "error"):
+            self._journal_state(job)
+        self.listener.job_state(job, message)
+
+    def _mark(self, job, stage, **fields):
+        """Record that a job reached a stage, and emit it as an event.
+
+        Durations since the previous stages are added to the event so
+        per-stage latency can be read straight from the event log, and
+        observed in the stage histogram of the metrics.
+        """
+        now = time.monotonic()
+        job.timings[stage] = now
+        if self.event_log is None and not self.metrics:
+            return
+        timings = job.timings
+        for name, start, end in STAGE_DURATIONS:
+            if end == stage and start in timings:
+                fields[name] = round(now - timings[start], 3)
+                if self.metrics:
+                    self.metrics.observe_stage(name[:-2], now - timings[start])
+        if self.event_log is not None:
+            self.event_log.emit(stage, job.job_id, index=job.index, **fields)
+
+    def _record_plan(self, job, plan):
+        """Keep the format plan chosen for a job, and why it was chosen"""
+        job.format_plan = plan
+        # Planning happens during extraction, possibly before the title is known
+        logger.info(f"Format plan for {job.title if job.info else job.url}: {plan.describe()}")
+        if self.event_log is not None:
+            self.event_log.emit('format_planned', job.job_id, index=job.index, format=plan.spec,
+                                output_ext=plan.output_ext, reasons=plan.reasons)
+
+    def _finish_event(self, result):
+        job = result.job
+        if result.skipped:
+            self._mark(job, 'skipped')
+        elif result.success:
+            self._mark(job, 'finished', filesize=(result.info or {}).get('filesize'))
+        else:
+            self._mark(job, 'failed', error=clean_error_message(result.error or '')[:200],
+                       cancelled=self.cancelled)
+        if self.event_log is not None:
+            self.event_log.job_done(job.job_id)
+        if self.metrics:
+            self.metrics.job_finished("skipped" if result.skipped else "success" if result.success else "failed")
+        job.bytes_seen = {}
+
+    def _journal_state(self, job, filepath=None):
+        if self.journal is None or job.run_id is None:
+            return
+        try:
+            self.journal.record(job, filepath)
+        except Exception as e:
+            # The job goes on; it just can't be resumed from this state
+            logger.warning(f"Could not journal state of {job.title}: {str(e)}")
+
+    def is_archived(self, job):
+        """True if the archive has this job's video at its format and quality.
+
+        Uses only the URL and any flat info already on the job, so it runs
+        before any network call.
+        """
+        if self.archive is None:
+            return False
+        key = archive_key(job.info, job.url)
+        if job.renditions:
+            return all(self.archive.has(key, rendition.format_type, rendition.quality,
+                                        audio_codec=rendition.audio_codec)
+                       for rendition in job.renditions)
+        return self.archive.has(key, job.format_type, job.quality, audio_codec=job.audio_codec)
+
+    def _archive_result(self, result):
+        if self.archive is None or not result.success or result.skipped:
+            return
+        job = result.job
+        try:
+            key = archive_key(result.info, job.url)
+            for rendition in job.renditions:
+                self.archive.add(key, rendition.format_type, rendition.quality, title=result.title,
+                                 filepath=job.outputs.get(rendition.label), audio_codec=rendition.audio_codec)
+            if not job.renditions:
+                self.archive.add(key, job.format_type, job.quality, title=result.title, filepath=result.filepath,
+                                 audio_codec=job.audio_codec)
+        except Exception as e:
+            logger.warning(f"Could not archive {result.title}: {str(e)}")
+
+    def _private_video_message(self, job):
+        if job.cookiefile:
+            return "This is a private video. The provided authentication cookies don't have access to this video."
+        return "This is a private video that requires authentication. Enable the 'Use Authentication Cookies' option to download private videos."
+
+    def _render_renditions(self, job, source, info):
+        """Make every rendition of a multi-output job from its one download.
+
+        The FFmpeg runs go to the post-processing pool, or to threads
+        without one, all at once. Returns the main output: the downloaded
+        file, or the first rendition if the download is not one of them.
+        """
+        if not job.renditions or not source:
+            return source
+        commands, source_kept = rendition_commands(job.renditions, source, info, self.ffmpeg_threads)
+        pending = [(rendition, command) for rendition, command, _ in commands if command]
+        if pending:
+            self._set_state(job, "processing", f"⚙️ Making {len(pending)} renditions...")
+        started = time.monotonic()
+
+        errors = []
+        with contextlib.ExitStack() as stack:
+            executor = self.postprocess_pool
+            if executor is None and pending:
+                executor = stack.enter_context(concurrent.futures.ThreadPoolExecutor(
+                    max_workers=len(pending), thread_name_prefix="rendition"))
+            futures = [(rendition, executor.submit(render, command)) for rendition, command in pending]
+            for rendition, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(f"{rendition.label}: {str(e)}")
+        if errors:
+            raise Exception(f"Could not make renditions: {'; '.join(errors)}")
+
+        job.outputs = {rendition.label: output for rendition, _, output in commands}
+        for output in set(job.outputs.values()) - {source}:
+            try:
+                apply_upload_date_timestamp(output, info)
+            except Exception as e:
+                logger.warning(f"Failed to set timestamp of {output}: {str(e)}")
+        if pending:
+            logger.info(f"Made {len(pending)} renditions of {job.title} in {time.monotonic() - started:.1f}s")
+        if self.event_log is not None:
+            self.event_log.emit('rendered', job.job_id, index=job.index, outputs=job.outputs,
+                                rendered=len(pending), render_s=round(time.monotonic() - started, 3))
+        if source_kept:
+            return source
+        # The download only served as the source for the renditions
+        try:
+            os.remove(source)
+        except OSError as e:
+            logger.warning(f"Could not remove {source}: {str(e)}")
+        return job.outputs[job.renditions[0].label]
+
+    @staticmethod
+    def _downloaded_filepath(ydl, info):
+        """Best guess at the final file yt-dlp wrote for a download"""
+        requested = (info or {}).get('requested_downloads') or []
+        if requested and requested[0].get('filepath'):
+            return requested[0]['filepath']
+        # Older yt-dlp versions only keep this on the YoutubeDL object
+        requested = getattr(ydl, 'requested_downloads', None) or []
+        if requested:
+            return requested[0].get('filepath')
+        return None
+
+    def download_video(self, job):
+        """Download a single video. Errors are reported and re-raised."""
+        if self.is_archived(job):
+            logger.info(f"Skipping {job.url}: already in the download archive")
+            self.listener.status(f"✅ Already downloaded: {job.title}")
+            self._set_state(job, "completed")
+            result = JobResult(job, True, info=job.info, skipped=True)
+            self._finish_event(result)
+            return result
+
+        ydl_opts = self.build_ydl_opts(job)
+        self._mark(job, 'queued', url=job.url)
+        try:
+            self.listener.status("🔍 Fetching video information...")
+            self._set_state(job, "downloading")
+            self._mark(job, 'started')
+            with new_ydl(ydl_opts, deferred=True) as ydl:
+                with self._profile(job, 'extract'), self._trace_extract(job):
+                    info = self.extract_info(ydl, job.url)
+                job.info = info
+                self._mark(job, 'extracted', video_id=info.get('id'), extractor=info.get('extractor_key'))
+
+                # Show video info in log
+                video_info = f"📽️ Video: {job.title}\n"
+                video_info += f"Duration: {info.get('duration_string', '--')}\n"
+                video_info += f"Quality: {info.get('format_note', '--')}\n"
+                video_info += "Starting download..."
+                self.listener.status(video_info)
+                logger.info(f"Downloading: {job.title}")
+
+                # Download from the info we already have instead of extracting again
+                self._mark(job, 'download_started')
+                with self._profile(job, 'download'):
+                    info = self.download_info(ydl, info)
+                self._mark(job, 'downloaded')
+
+                # Merging and conversion, queued by the download
+                with self._profile(job, 'postprocess'):
+                    ydl.run_deferred(self.postprocess_pool)
+                    source = self._downloaded_filepath(ydl, info)
+                    outfile = self._render_renditions(job, source, info)
+
+            # Set file's timestamp to match the video upload date, unless the
+            # fused FFmpeg pass or the rendering already did
+            try:
+                dated = ydl.fused or outfile != source
+                applied = None if dated else apply_upload_date_timestamp(outfile, info)
+                if applied:
+                    year, month, day = applied
+                    logger.info(f"Set file timestamp to video upload date: {year}-{month}-{day}")
+                    self.listener.status(f"✅ Download complete! Set file date to original upload date: {year}-{month}-{day}")
+            except Exception as e:
+                logger.error(f"Failed to set file timestamp: {str(e)}")
+
+            self._set_state(job, "completed")
+            result = JobResult(job, True, filepath=outfile, info=info)
+            self._archive_result(result)
+            self._finish_event(result)
+            self.listener.job_finished(result)
+            return result
+        except Exception as e:
+            error_msg = str(e)
+            # Check for private video error and provide a more user-friendly message
+            if "Private video" in error_msg:
+                error_msg = f"❌ Error: {self._private_video_message(job)}"
+            else:
+                error_msg = f"❌ Error downloading video:\n{clean_error_message(error_msg)}"
+
+            job.error = str(e)
+            self._set_state(job, "error")
+            self.listener.status(error_msg)
+            result = JobResult(job, False, info=job.info, error=str(e))
+            self._finish_event(result)
+            self.listener.job_finished(result)
+            logger.error(f"Error downloading video: {str(e)}")
+            raise
+
+    def _count_playlist_result(self, success):
+        """Update playlist counters and notify the listener"""
+        with self.progress_lock:
+            if not success:
+                self.failed_videos += 1
+            self.completed_videos += 1
+            completed, failed, total = self.completed_videos, self.failed_videos, self.total_videos
+        self.listener.playlist_progress(completed, failed, total)
+
+    def _finish_item(self, job, result):
+        """Report a finished playlist item and return its result"""
+        self._journal_state(job, result.filepath)
+        self._archive_result(result)
+        self._finish_event(result)
+        if self.controller:
+            self.controller.job_done(job.job_id)
+            if not result.success and not self.cancelled:
+                self.controller.record_error(result.error)
+
+        # Always update progress counters even if the download failed
+        self._count_playlist_result(result.success)
+        self.listener.job_finished(result)
+        result.compact()
+        return result
+
+    def fail_item(self, job, error, ydl=None):
+        """Record a failed playlist item. Never raises."""
+        index = job.index if job.index is not None else 0
+        error_msg = str(error)
+
+        # Clean up error message and handle private videos gracefully
+        if isinstance(error, DownloadCancelled) or self.cancelled:
+            message = "⛔ Cancelled"
+        elif "Private video" in error_msg:
+            clean_msg = "Private video"
+            if job.cookiefile:
+                clean_msg = "Private video (no access with current cookies)"
+            message = f"⛔ {clean_msg}"
+        else:
+            # Format other errors
+            clean_error = clean_error_message(error_msg)
+            if len(clean_error) > 50:
+                clean_error = clean_error[:47] + "..."
+            message = f"❌ {clean_error}"
+
+        logger.error(f"Error downloading video {index+1}: {error_msg}")
+        job.error = error_msg
+        self._set_state(job, "error", message)
+        if ydl is not None:
+            ydl.close()
+
+        # Don't raise the exception - this allows other downloads to continue
+        return self._finish_item(job, JobResult(job, False, info=job.info, error=error_msg))
+
+    def extract_item(self, job):
+        """Pipeline stage: extract a playlist item's info.
+
+        Returns (ydl, info) for the download stage, or a failed JobResult.
+        """
+        index = job.index if job.index is not None else 0
+
+        # Ensure we have a valid URL
+        if not job.url:
+            logger.error(f"No valid URL for video {index+1}")
+            job.error = "Missing URL"
+            self._set_state(job, "error", "❌ Missing URL")
+            return self._finish_item(job, JobResult(job, False, error=job.error))
+        if self.cancelled:
+            return self.fail_item(job, DownloadCancelled("Download cancelled by user"))
+
+        logger.info(f"Fetching info for video {index+1}: {job.url}")
+        self._mark(job, 'started')
+        ydl = new_ydl(self.build_ydl_opts(job), deferred=True)
+        try:
+            # Check if the video information can be accessed first
+            with self._profile(job, 'extract'), self._trace_extract(job):
+                info = self.extract_info(ydl, job.url)
+            if not info:
+                # Could not get video info
+                raise Exception("Could not extract video information")
+        except Exception as e:
+            return self.fail_item(job, e, ydl)
+
+        job.info = info
+        self._mark(job, 'extracted', video_id=info.get('id'), extractor=info.get('extractor_key'))
+        return ydl, info
+
+    def download_item(self, job, ydl, info):
+        """Pipeline stage: download the selected formats.
+
+        Merging and conversion are only queued on the ydl, so the download
+        slot is free as soon as the bytes are on disk.
+        Returns (ydl, info) for the postprocess stage, or a failed JobResult.
+        """
+        if self.cancelled:
+            return self.fail_item(job, DownloadCancelled("Download cancelled by user"), ydl)
+
+        logger.info(f"Downloading video: {job.title}")
+        self._set_state(job, "downloading", "⬇️ Downloading...")
+        self._mark(job, 'download_started')
+        try:
+            # Reuse the extracted info instead of extracting the page again
+            with self._profile(job, 'download'):
+                info = self.download_info(ydl, info)
+        except Exception as e:
+            return self.fail_item(job, e, ydl)
+
+        job.info = info
+        self._mark(job, 'downloaded')
+        return ydl, info
+
+    def postprocess_item(self, job, ydl, info):
+        """Pipeline stage: run the deferred FFmpeg work and finish the job"""
+        index = job.index if job.index is not None else 0
+        if self.cancelled:
+            return self.fail_item(job, DownloadCancelled("Download cancelled by user"), ydl)
+        try:
+            if ydl.deferred:
+                self._set_state(job, "processing", "⚙️ Processing...")
+            with self._profile(job, 'postprocess'):
+                ydl.run_deferred(self.postprocess_pool)
+                outfile = self._render_renditions(job, self._downloaded_filepath(ydl, info), info)
+        except Exception as e:
+            return self.fail_item(job, e, ydl)
+        ydl.close()
+
+        # Update UI for completion
+        logger.info(f"Video {index+1} download completed")
+        self._set_state(job, "completed")
+        return self._finish_item(job, JobResult(job, True, filepath=outfile, info=info))
+
+    def download_playlist_item(self, job):
+        """Run every stage for one playlist entry in the calling thread. Never raises."""
+        item = self.extract_item(job)
+        if isinstance(item, JobResult):
+            return item
+        item = self.download_item(job, *item)
+        if isinstance(item, JobResult):
+            return item
+        return self.postprocess_item(job, *item)
+
+    def iter_playlist(self, url, cookiefile=None):
+        """Enumerate a playlist lazily.
+
+        Returns (playlist_info, entries) where entries is a generator that
+        fetches listing pages only as it is consumed, so a channel with
+        thousands of uploads never has to be listed in full up front.
+        playlist_info has no 'entries'; 'playlist_count' is set when the
+        site reports it.
+        """
+        extract_opts = {
+            'extract_flat': 'in_playlist',
+            'lazy_playlist': True,
+            'quiet': True,
+            'no_warnings': True,
+            'skip_download': True,
+        }
+        if cookiefile:
+            extract_opts['cookiefile'] = str(cookiefile)
+
+        ydl = new_ydl(extract_opts)
+        try:
+            # process=False leaves the extractor's lazy entries untouched
+            info = ydl.extract_info(url, download=False, process=False)
+            # Follow redirects such as a watch URL pointing at its playlist
+            for _ in range(5):
+                if info.get('_type') not in ('url', 'url_transparent'):
+                    break
+                info = ydl.extract_info(info['url'], download=False, process=False,
+                                        ie_key=info.get('ie_key'))
+        except Exception:
+            ydl.close()
+            raise
+
+        if info.get('_type', 'video') == 'video':
+            # A single video in playlist mode is a one-entry playlist
+            entries = [info]
+            info = {'title': info.get('title'), 'playlist_count': 1}
+        else:
+            entries = info.pop('entries', None)
+
+        def iter_entries():
+            try:
+                for entry in _iter_lazy_entries(entries):
+                    # Skip None entries (deleted or unavailable videos)
+                    if entry is not None:
+                        yield entry
+            finally:
+                ydl.close()
+
+        return info, iter_entries()
+
+    def fetch_video_info(self, url, cookiefile=None):
+        """Fetch full video (or flat playlist) information without downloading"""
+        extract_opts = {
+            'extract_flat': False,  # Get detailed info for single videos
+            'skip_download': True,
+            'quiet': True,
+            'no_warnings': True,
+        }
+        if cookiefile:
+            extract_opts['cookiefile'] = str(cookiefile)
+
+        with new_ydl(extract_opts) as ydl:
+            return self.extract_info(ydl, url)
+
+    @contextlib.contextmanager
+    def _profile_metadata(self, entry, video_url):
+        """Profile and trace one metadata fetch when the profiler selects it"""
+        if self.profiler is None:
+            yield
+            return
+        name = entry.get('id') or video_url
+        with self.profiler.profile('metadata', name, aliases=(video_url,)), \
+                self.profiler.trace_memory('metadata', name, aliases=(video_url,)):
+            yield
+
+    def fetch_entry_info(self, entry, timeout=None):
+        """Fetch basic (unprocessed) info for one flat playlist entry.
+
+        Returns the info dict, or None if the video is private.
+        Falls back to the flat entry for any other error.
+        """
+        video_url = resolve_entry_url(entry)
+        if not video_url:
+            raise ValueError("Could not find URL for video")
+
+        # Only extract some basic info to avoid too many API calls
+        extract_opts = {'skip_download': True, 'quiet': True}
+        if timeout:
+            extract_opts['socket_timeout'] = timeout
+        with new_ydl(extract_opts) as video_ydl:
+            try:
+                with self._profile_metadata(entry, video_url):
+                    video_info = self.extract_info(video_ydl, video_url, process=False, need_streams=False)
+            except Exception as e:
+                if "Private video" in str(e):
+                    logger.info(f"Skipped private video: {video_url}")
+                    return None
+                # For other errors, still use the video with basic info
+                entry['url'] = video_url
+                logger.warning(f"Could not get detailed info for {video_url}: {str(e)}")
+                return entry
+
+        if not video_info:
+            return None
+        # Ensure the video has a URL so we can download it later
+        if not video_info.get('url') and not video_info.get('webpage_url'):
+            video_info['url'] = video_url
+        return video_info
+
+    def fetch_playlist_info(self, url, cookiefile=None, width=DEFAULT_METADATA_WIDTH,
+                            item_timeout=DEFAULT_METADATA_TIMEOUT):
+        """Fetch playlist information and per-video details without downloading.
+
+        The playlist is listed lazily and entries are fetched as their
+        listing page arrives, up to `width` at a time. An entry that takes
+        longer than `item_timeout` seconds falls back to its flat info so it
+        can't stall the rest. listener.playlist_video() is called as results
+        arrive, in playlist order.
+        Returns (playlist_info, available_videos, skipped_count).
+        """
+        info, entries = self.iter_playlist(url, cookiefile)
+        playlist_title = info.get('title', 'Unknown Playlist')
+        self.listener.playlist_found(info, None)
+
+        flat_entries = []  # Every listed entry, in playlist order
+        available_videos = []
+        skipped_count = 0
+        results = {}  # Playlist position -> fetched info, None (private) or _NO_URL
+        next_position = 0  # Next position to hand to the listener
+        started = {}  # Playlist position -> time its fetch started
+        listing_done = False
+
+        def fetch(position, entry):
+            started[position] = time.monotonic()
+            logger.info(f"Fetching info for video {position+1}: {resolve_entry_url(entry)}")
+            return self.fetch_entry_info(entry, timeout=item_timeout)
+
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, width), thread_name_prefix="metadata")
+        futures = {}
+        pending = set()
+        try:
+            while not self.cancelled:
+                # Keep the pool busy without reading the listing far ahead of it
+                while not listing_done and len(pending) < width * 2:
+                    entry = next(entries, None)
+                    if entry is None:
+                        listing_done = True
+                        break
+                    future = pool.submit(fetch, len(flat_entries), entry)
+                    futures[future] = len(flat_entries)
+                    flat_entries.append(entry)
+                    pending.add(future)
+                if not pending:
+                    break
+
+                # Sleep until something finishes or the oldest running fetch expires
+                now = time.monotonic()
+                deadlines = [started[futures[f]] + item_timeout for f in pending if futures[f] in started]
+                timeout = max(0.0, min(deadlines) - now) if deadlines else item_timeout
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for future in done:
+                    position = futures.pop(future)
+                    try:
+                        results[position] = future.result()
+                    except Exception as e:
+                        logger.warning(f"Could not find URL for video {position+1} in playlist: {str(e)}")
+                        results[position] = _NO_URL
+
+                # Give up on fetches that ran past their timeout and use the flat entry
+                now = time.monotonic()
+                for future in list(pending):
+                    position = futures[future]
+                    if position in started and now - started[position] >= item_timeout:
+                        pending.discard(future)
+                        del futures[future]
+                        entry = flat_entries[position]
+                        entry['url'] = resolve_entry_url(entry)
+                        logger.warning(f"Timed out fetching info for video {position+1} after {item_timeout}s, using basic info")
+                        results[position] = entry
+
+                # Hand over results in playlist order as soon as the prefix is complete
+                while next_position in results:
+                    video_info = results.pop(next_position)
+                    next_position += 1
+                    if video_info is _NO_URL:
+                        continue
+                    if video_info is None:
+                        skipped_count += 1
+                        continue
+                    available_videos.append(video_info)
+                    self.listener.playlist_video(video_info, len(available_videos)-1)
+        finally:
+            # Timed out fetches keep running in the background; don't wait for them
+            pool.shutdown(wait=False, cancel_futures=True)
+            entries.close()
+
+        info['entries'] = flat_entries
+        if flat_entries:
+            self.listener.status(f"🔍 Found {len(flat_entries)} videos in playlist: {playlist_title}")
+        return info, available_videos, skipped_count
+
+    def download_playlist(self, url, job_template, videos=None, playlist_info=None):
+        """Download every video of a playlist in parallel.
+
+        job_template carries the shared settings (quality, format, ...).
+        videos may be a previously fetched entry list; otherwise the
+        playlist is enumerated lazily and each entry starts through the
+        pipeline as soon as its listing page arrives. With a journal, a
+        job_template whose run_id is set continues that run and skips its
+        completed items. Returns a list of JobResults.
+        """
+        streaming = videos is None
+        if streaming:
+            self.listener.status("Fetching playlist information...")
+            playlist_info, videos = self.iter_playlist(url, job_template.cookiefile)
+            self.listener.playlist_found(playlist_info, None)
+            expected = playlist_info.get('playlist_count')
+        else:
+            if not videos:
+                raise Exception("No available videos found in playlist")
+            expected = len(videos)
+
+        playlist_title = (playlist_info or {}).get('title', 'Unknown Playlist')
+
+        # Track completed downloads to update progress
+        with self.progress_lock:
+            self.completed_videos = 0
+            self.failed_videos = 0
+            self.skipped_videos = 0
+            self.total_videos = expected or 0
+
+        done_keys = set()
+        resuming = False
+        if self.journal is not None:
+            if job_template.run_id is None:
+                job_template.run_id = self.journal.start_run(url, job_template, playlist_title)
+            else:
+                resuming = True
+                done_keys = self.journal.completed_keys(job_template.run_id)
+                self.journal.set_run_status(job_template.run_id, 'running')
+
+        if expected:
+            logger.info(f"Found {expected} videos in playlist: {playlist_title}")
+            self.listener.status(f"Starting parallel download of {expected} videos...")
+        else:
+            self.listener.status(f"Starting parallel download of {playlist_title} while it is listed...")
+        jobs = self._playlist_jobs(videos, job_template, announce=streaming or resuming,
+                                   skip_keys=done_keys)
+
+        # Without a shared scheduler, use a private one for this playlist
+        scheduler = self.scheduler or DownloadScheduler()
+        options = dict(self.pipeline_options)
+        if self.postprocess_pool:
+            # One postprocess stage worker per pool slot keeps the pool busy
+            options.setdefault('postprocess_workers', self.postprocess_pool.workers)
+        pipeline = DownloadPipeline(self, scheduler, **options)
+        try:
+            results = pipeline.run(jobs)
+        finally:
+            if scheduler is not self.scheduler:
+                scheduler.shutdown()
+            if job_template.run_id is not None:
+                self._close_run(job_template.run_id, pipeline)
+
+        if not results and not self.skipped_videos and not self.cancelled:
+            raise Exception("No available videos found in playlist")
+        if streaming:
+            # Unavailable entries may make the listing shorter than reported
+            with self.progress_lock:
+                self.total_videos = self.completed_videos
+
+        self._report_playlist_summary()
+        return results
+
+    def resume_playlist(self, run_id):
+        """Continue a journaled playlist run that was interrupted.
+
+        If the run had listed the whole playlist, the remaining items come
+        straight from the journal; otherwise the playlist is listed again.
+        Either way completed items are skipped, and yt-dlp picks up the
+        .part files of items that were cut off mid-download.
+        """
+        run = self.journal.get_run(run_id) if self.journal is not None else None
+        if run is None:
+            raise Exception(f"No resumable playlist run {run_id}")
+
+        settings = run['settings']
+        job_template = DownloadJob(run['url'], settings['quality'], settings['format_type'],
+                                   settings['include_subs'], settings['output_dir'],
+                                   cookiefile=settings.get('cookiefile'), run_id=run_id,
+                                   audio_codec=settings.get('audio_codec'),
+                                   renditions=[Rendition.parse(label) for label in settings.get('renditions') or ()])
+        self.listener.status(f"Resuming playlist: {run['title'] or run['url']}")
+
+        videos = None
+        playlist_info = {'title': run['title']}
+        if run['listing_complete']:
+            videos = [item['entry'] for item in self.journal.items(run_id)]
+            self.listener.playlist_found(playlist_info, videos)
+        return self.download_playlist(run['url'], job_template, videos=videos, playlist_info=playlist_info)
+
+    def _close_run(self, run_id, pipeline):
+        """Mark a journaled run finished, or interrupted so it can be resumed"""
+        finished = pipeline.listing_complete and not self.cancelled
+        try:
+            self.journal.set_run_status(run_id, 'finished' if finished else 'interrupted',
+                                        listing_complete=pipeline.listing_complete or None)
+        except Exception as e:
+            logger.warning(f"Could not update playlist run {run_id}: {str(e)}")
+
+    def _playlist_jobs(self, videos, job_template, announce=False, skip_keys=None):
+        """Turn playlist entries into jobs one at a time as they are consumed.
+
+        Entries whose key is in skip_keys were finished by an earlier run,
+        and archived entries were downloaded before; both are reported as
+        completed without going through the pipeline.
+        """
+        for i, video in enumerate(videos):
+            job = job_template.with_entry(video, i)
+            with self.progress_lock:
+                # The real length is only known once a lazy listing is exhausted
+                self.total_videos = max(self.total_videos, i + 1)
+            if announce:
+                self.listener.playlist_video(video, i)
+            if skip_keys and job.item_key in skip_keys:
+                self._skip_job(job, "✅ Downloaded earlier")
+                continue
+            if self.is_archived(job):
+                logger.info(f"Skipping video {i+1}: already in the download archive")
+                self._skip_job(job, "✅ Already downloaded")
+                continue
+            if self.journal is not None and job.run_id is not None:
+                try:
+                    self.journal.add_item(job)
+                except Exception as e:
+                    logger.warning(f"Could not journal {job.title}: {str(e)}")
+            logger.info(f"Using URL for video {i+1}: {job.url}")
+            self._set_state(job, "pending")
+            self._mark(job, 'queued', url=job.url)
+            yield job
+
+    def _skip_job(self, job, message):
+        """Count a playlist item that needs no work as completed"""
+        with self.progress_lock:
+            self.skipped_videos += 1
+        job.progress = 100.0
+        self._set_state(job, "completed", message)
+        self._mark(job, 'skipped', url=job.url)
+        self._count_playlist_result(True)
+
+    def _report_playlist_summary(self):
+        """Log and report final playlist statistics"""
+        if self.cancelled:
+            self.listener.status("Downloads cancelled")
+            return
+
+        successful = self.completed_videos - self.failed_videos
+        total = self.total_videos
+
+        # Calculate success rate
+        success_rate = (successful / total) * 100 if total > 0 else 0
+
+        if self.skipped_videos:
+            logger.info(f"Skipped {self.skipped_videos} videos that were already downloaded")
+
+        if self.failed_videos > 0:
+            self.listener.status(f"Playlist download complete: {successful}/{total} videos downloaded successfully ({success_rate:.1f}% success rate)")
+            self.listener.status(f"Failed downloads: {self.failed_videos} videos")
+        else:
+            self.listener.status(f"✅ Playlist download complete: All {total} videos downloaded successfully")
+
+        # Log final statistics
+        logger.info(f"Playlist download completed. Success rate: {success_rate:.1f}%")
+        logger.info(f"Successful downloads: {successful}")
+        logger.info(f"Failed downloads: {self.failed_videos}")
@@ -0,0 +1,131 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+
+DEFAULT_EVENT_LOG_PATH = Path.home() / ".cache" / "youtube_downloader" / "events.jsonl"
+
+# Rotate after this many bytes, keeping this many old files (events.jsonl.1 ...)
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+# Seconds between 'bytes' events for a job that is downloading
+DEFAULT_BYTES_INTERVAL = 5.0
+
+# Events written per batch
+_BATCH_SIZE = 500
+
+_STOP = object()
+
+
+class EventLog:
+    """Structured job events written as rotating JSON lines.
+
+    Each line is one event: {"ts", "session", "event", "job_id", ...}.
+    Events are job lifecycle steps (queued, started, extracted, first_byte,
+    downloaded, finished, failed, skipped) plus periodic 'bytes' counters,
+    so per-stage latency can be computed offline across many runs.
+
+    emit() only puts a tuple on a queue; serializing, writing and rotating
+    happen on a background thread, in batches.
+    """
+    def __init__(self, path=DEFAULT_EVENT_LOG_PATH, max_bytes=DEFAULT_MAX_BYTES,
+                 backup_count=DEFAULT_BACKUP_COUNT, bytes_interval=DEFAULT_BYTES_INTERVAL):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.bytes_interval = bytes_interval
+        self.session = uuid.uuid4().hex[:12]  # Tells apart runs sharing one file
+        self.dropped = 0  # Events lost to write errors
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._queue = queue.SimpleQueue()
+        self._last_bytes = {}  # job_id -> time of its last 'bytes' event
+        self._stream = None
+        self._size = 0
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def emit(self, event, job_id=None, **fields):
+        """Record an event. Cheap enough to call from progress hooks."""
+        self._queue.put((time.time(), event, job_id, fields))
+
+    def progress(self, job_id, d):
+        """Emit a 'bytes' event for a progress dict, at most once per interval per job"""
+        now = time.monotonic()
+        if now - self._last_bytes.get(job_id, 0) < self.bytes_interval:
+            return
+        self._last_bytes[job_id] = now
+        self.emit('bytes', job_id, downloaded=d.get('downloaded_bytes'),
+                  total=d.get('total_bytes') or d.get('total_bytes_estimate'),
+                  speed=d.get('speed'), fragment=d.get('fragment_index'))
+
+    def job_done(self, job_id):
+        self._last_bytes.pop(job_id, None)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < _BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            stop = False
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                ts, event, job_id, fields = item
+                record = {'ts': round(ts, 3), 'session': self.session, 'event': event, 'job_id': job_id}
+                record.update(fields)
+                lines.append(json.dumps(record, default=str, ensure_ascii=False))
+            if lines:
+                self._write("\n".join(lines) + "\n", len(lines))
+            if stop:
+                self._close_stream()
+                return
+
+    def _write(self, text, count):
+        try:
+            if self._stream is None:
+                self._stream = open(self.path, 'a', encoding='utf-8')
+                self._size = self._stream.tell()
+            self._stream.write(text)
+            self._stream.flush()
+            self._size += len(text.encode('utf-8'))
+            if self._size >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            # Count what was lost and keep going; emit() callers never see the error
+            self.dropped += count
+
+    def _rotate(self):
+        """Shift events.jsonl -> .1 -> .2 ..., dropping the oldest"""
+        self._close_stream()
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _close_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def close(self):
+        """Write everything still queued and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
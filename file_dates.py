@@ -0,0 +1,25 @@
+import datetime
+import os
+
+
+def apply_upload_date_timestamp(filepath, info):
+    """Set a file's access/modification time to the video's upload date.
+
+    Returns the upload date as a (year, month, day) tuple, or None if it
+    could not be applied.
+    """
+    upload_date = info.get('upload_date') if info else None
+    if not filepath or not os.path.exists(filepath):
+        return None
+    if not upload_date or len(upload_date) != 8:
+        return None
+
+    # Parse the upload date (YYYYMMDD format)
+    year = int(upload_date[0:4])
+    month = int(upload_date[4:6])
+    day = int(upload_date[6:8])
+
+    # Noon avoids the date shifting when viewed in another timezone
+    timestamp = datetime.datetime(year, month, day, 12, 0, 0).timestamp()
+    os.utime(filepath, (timestamp, timestamp))
+    return (year, month, day)
@@ -0,0 +1,284 @@
+import functools
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Costs are in "bytes downloaded": a plan's size plus the extra work it
+# causes, as a fraction of its size. Merging reads and writes both streams
+# once more on local disk, which is cheap next to the network.
+MERGE_COST = 0.2
+# Output that is not MP4/H.264/AAC plays in fewer places (mkv, webm, VP9, AV1);
+# such a plan has to be about a third smaller to win
+COMPATIBILITY_COST = 0.5
+# Copying audio into another container without re-encoding
+REMUX_COST = 0.05
+# Decoding and re-encoding audio; CPU time dwarfs the transfer
+TRANSCODE_COST = 2.0
+
+# Audio streams within this fraction of the best bitrate meet the quality target
+AUDIO_QUALITY_FLOOR = 0.75
+# Audio-only formats costed, taken from the top of yt-dlp's own ranking
+AUDIO_CANDIDATES = 4
+
+# Audio containers kept as they are; webm (Opus) and mp4 (AAC) are remuxed
+NATIVE_AUDIO_EXTS = ('m4a', 'opus', 'mp3', 'ogg')
+
+# Source codec prefixes that a requested audio codec can be copied from
+AUDIO_CODEC_PREFIXES = {'m4a': ('mp4a', 'aac'), 'opus': ('opus',), 'mp3': ('mp3',),
+                        'vorbis': ('vorbis',), 'flac': ('flac',)}
+
+_COMPATIBLE_VCODECS = ('avc1', 'h264')
+_COMPATIBLE_ACODECS = ('mp4a', 'aac')
+
+
+def _codec(fmt, kind):
+    """A format's video or audio codec; None if unknown, 'none' if absent"""
+    codec = fmt.get(kind)
+    return codec.lower() if isinstance(codec, str) else None
+
+
+def _has_video(fmt):
+    return _codec(fmt, 'vcodec') != 'none'
+
+
+def _has_audio(fmt):
+    return _codec(fmt, 'acodec') != 'none'
+
+
+def _bitrate(fmt):
+    return fmt.get('tbr') or (fmt.get('vbr') or 0) + (fmt.get('abr') or 0) or None
+
+
+def _is_drc(fmt):
+    """Dynamic range compressed audio, which YouTube lists next to the normal stream"""
+    return str(fmt.get('format_id', '')).endswith('-drc') or 'DRC' in (fmt.get('format_note') or '')
+
+
+def _language_preference(fmt):
+    # yt-dlp ranks a missing language_preference as -1
+    preference = fmt.get('language_preference')
+    return -1 if preference is None else preference
+
+
+def _usable(formats):
+    """The formats yt-dlp itself would pick from.
+
+    Drops damaged and other de-prioritized formats (negative preference),
+    DRC, DRM and untested formats, and keeps only the audio tracks in the
+    most preferred language, the original rather than a dub. Falls back to
+    every format when nothing would be left.
+    """
+    usable = [fmt for fmt in formats
+              if (fmt.get('preference') or 0) >= 0 and not _is_drc(fmt)
+              and not fmt.get('has_drm') and not fmt.get('__needs_testing')] or formats
+    languages = [_language_preference(fmt) for fmt in usable if _has_audio(fmt)]
+    if languages:
+        language = max(languages)
+        usable = [fmt for fmt in usable if not _has_audio(fmt) or _language_preference(fmt) == language]
+    return usable
+
+
+def _mib(size):
+    return f"~{size / 1048576:.1f} MiB"
+
+
+class FormatPlan:
+    """One way to satisfy a job: which streams to fetch and what that costs"""
+    def __init__(self, formats, quality, output_ext, merge=False, remux=False, transcode=False,
+                 compatible=True):
+        self.formats = formats
+        self.spec = '+'.join(fmt['format_id'] for fmt in formats)
+        self.quality = quality  # Height for video, bitrate for audio
+        self.output_ext = output_ext
+        self.merge = merge
+        self.remux = remux
+        self.transcode = transcode
+        self.compatible = compatible
+        self.size = None  # Bytes, or bitrate when sizes are unknown; set by the planner
+        self.size_is_bytes = False
+        self.cost = None
+        self.reasons = []
+
+    def score(self):
+        size = self.size or 0
+        cost = size
+        if self.merge:
+            cost += size * MERGE_COST
+        if self.remux:
+            cost += size * REMUX_COST
+        if self.transcode:
+            cost += size * TRANSCODE_COST
+        if not self.compatible:
+            cost += size * COMPATIBILITY_COST
+        self.cost = cost
+
+        kinds = [fmt.get('ext') or '?' for fmt in self.formats]
+        if self.merge:
+            self.reasons = [f"merge {' + '.join(kinds)} into {self.output_ext}"]
+        else:
+            self.reasons = [f"single {kinds[0]} stream"]
+        if self.size:
+            self.reasons.append(_mib(size) if self.size_is_bytes else f"{size:.0f} kbps")
+        if self.transcode:
+            self.reasons.append(f"re-encode to {self.output_ext}")
+        elif self.remux:
+            self.reasons.append(f"stream copy into {self.output_ext}")
+        if not self.compatible:
+            self.reasons.append("less compatible output")
+
+    def describe(self):
+        return f"{self.spec} ({', '.join(self.reasons)})"
+
+
+class FormatPlanner:
+    """Chooses formats by cost instead of a fixed format string.
+
+    Passed to yt-dlp as the 'format' option, so it sees every format the
+    extractor found, sorted by yt-dlp's own ranking. Formats yt-dlp would
+    pass over (dubbed audio tracks, DRC, damaged or untested streams) are
+    left out, and only its best few audio streams are costed. Plans that
+    meet the quality target (the best height up to the requested one, or
+    audio close to the best bitrate) are scored on estimated bytes plus
+    merge, remux, transcode and container compatibility costs, and the
+    cheapest one is downloaded. A progressive stream therefore wins over
+    video+audio plus a merge when it is there.
+
+    The chosen plan, with the reasons for it and the runner-up, is kept in
+    `chosen` and passed to on_plan.
+    """
+    def __init__(self, quality="720p", format_type="video", audio_codec=None, on_plan=None):
+        self.max_height = int(str(quality).rstrip('p')) if quality else None
+        self.format_type = format_type
+        self.audio_codec = audio_codec
+        self.on_plan = on_plan
+        self.chosen = None
+
+    def __call__(self, ctx):
+        formats = _usable([fmt for fmt in ctx['formats']
+                           if fmt.get('format_id') and (_has_video(fmt) or _has_audio(fmt))])
+        plans = self.audio_plans(formats) if self.format_type == "audio" else self.video_plans(formats)
+        if not plans:
+            # Nothing to compare; let yt-dlp decide as it would by default
+            logger.info("No format plan; using yt-dlp's default selection")
+            return list(_selector('bestaudio/best' if self.format_type == "audio" else 'bv*+ba/b')(ctx))
+
+        self._size(plans)
+        # yt-dlp lists formats worst first; among equal costs prefer the later ones
+        position = {id(fmt): i for i, fmt in enumerate(formats)}
+        for plan in plans:
+            plan.score()
+        plans.sort(key=lambda plan: (plan.cost, -max(position[id(fmt)] for fmt in plan.formats)))
+        best = plans[0]
+        if len(plans) > 1:
+            runner_up = plans[1]
+            extra = (runner_up.cost / best.cost - 1) * 100 if best.cost else 0
+            best.reasons.append(f"cheapest of {len(plans)} plans; next {runner_up.spec} costs {extra:.0f}% more")
+
+        # Format selection runs at extraction and again at download
+        if self.chosen is None or self.chosen.spec != best.spec:
+            self.chosen = best
+            if self.on_plan:
+                self.on_plan(best)
+        return list(_selector(best.spec)(ctx))
+
+    def video_plans(self, formats):
+        videos = [fmt for fmt in formats if _has_video(fmt)]
+        if self.max_height:
+            allowed = [fmt for fmt in videos if (fmt.get('height') or 0) <= self.max_height]
+            # Nothing at or below the target: take what there is, like the old 'best' fallback
+            videos = allowed or videos
+        if not videos:
+            return []
+        target = max(fmt.get('height') or 0 for fmt in videos)
+        audios = self._good_audio([fmt for fmt in formats if not _has_video(fmt)])
+
+        plans = []
+        for video in videos:
+            if (video.get('height') or 0) != target:
+                continue
+            if _has_audio(video):
+                plans.append(FormatPlan([video], target, video.get('ext'),
+                                        compatible=self._compatible(video.get('ext'), [video], [video])))
+                continue
+            for audio in audios:
+                ext = _merged_ext(video, audio)
+                plans.append(FormatPlan([video, audio], target, ext, merge=True,
+                                        compatible=self._compatible(ext, [video], [audio])))
+        return plans
+
+    def audio_plans(self, formats):
+        audios = self._good_audio([fmt for fmt in formats if not _has_video(fmt)])
+        if not audios:
+            # Only muxed streams: the audio has to come out of a video
+            audios = [fmt for fmt in formats if _has_audio(fmt)]
+        plans = []
+        for audio in audios:
+            ext = audio.get('ext')
+            if self.audio_codec:
+                prefixes = AUDIO_CODEC_PREFIXES.get(self.audio_codec, (self.audio_codec,))
+                copyable = (ext == self.audio_codec
+                            or (_codec(audio, 'acodec') or '').startswith(prefixes))
+                output = self.audio_codec
+                plans.append(FormatPlan([audio], _bitrate(audio), output, remux=copyable and ext != output,
+                                        transcode=not copyable))
+            else:
+                keep = ext in NATIVE_AUDIO_EXTS
+                output = ext if keep else ('opus' if ext == 'webm' else 'm4a')
+                plans.append(FormatPlan([audio], _bitrate(audio), output, remux=not keep,
+                                        compatible=output in ('m4a', 'mp3')))
+        return plans
+
+    @staticmethod
+    def _good_audio(audios):
+        """yt-dlp's best few audio-only formats that are close enough to the best bitrate"""
+        audios = audios[-AUDIO_CANDIDATES:]
+        rates = [fmt.get('abr') or fmt.get('tbr') for fmt in audios]
+        best = max((rate for rate in rates if rate), default=None)
+        if best is None:
+            return audios
+        return [fmt for fmt, rate in zip(audios, rates) if not rate or rate >= best * AUDIO_QUALITY_FLOOR]
+
+    @staticmethod
+    def _compatible(ext, videos, audios):
+        return (ext == 'mp4'
+                and all((_codec(fmt, 'vcodec') or 'avc1').startswith(_COMPATIBLE_VCODECS) for fmt in videos)
+                and all((_codec(fmt, 'acodec') or 'mp4a').startswith(_COMPATIBLE_ACODECS) for fmt in audios))
+
+    @staticmethod
+    def _size(plans):
+        """Estimate sizes: bytes when every plan has them, else bitrates.
+
+        All plans cover the same video, so bitrate ranks them the same way
+        bytes would when the extractor gave no sizes.
+        """
+        sizes = [sum(fmt.get('filesize') or fmt.get('filesize_approx') or 0 for fmt in plan.formats)
+                 if all(fmt.get('filesize') or fmt.get('filesize_approx') for fmt in plan.formats) else None
+                 for plan in plans]
+        if all(sizes):
+            for plan, size in zip(plans, sizes):
+                plan.size, plan.size_is_bytes = size, True
+            return
+        for plan in plans:
+            plan.size = sum(_bitrate(fmt) or 0 for fmt in plan.formats) or None
+
+
+def _merged_ext(video, audio):
+    from yt_dlp.utils import get_compatible_ext
+    return get_compatible_ext(vcodecs=[video.get('vcodec')], acodecs=[audio.get('acodec')],
+                              vexts=[video['ext']], aexts=[audio['ext']])
+
+
+_parser_lock = threading.Lock()
+_parser = None
+
+
+@functools.lru_cache(maxsize=256)
+def _selector(spec):
+    """yt-dlp's own selector for a format spec, which builds merged formats correctly"""
+    global _parser
+    with _parser_lock:
+        if _parser is None:
+            import yt_dlp
+            _parser = yt_dlp.YoutubeDL({'quiet': True})
+        return _parser.build_format_selector(spec)
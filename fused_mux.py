@@ -0,0 +1,123 @@
+import os
+
+from yt_dlp.postprocessor.ffmpeg import (FFmpegFixupM3u8PP, FFmpegFixupM4aPP, FFmpegMergerPP,
+                                         FFmpegPostProcessor)
+from yt_dlp.utils import ISO639Utils, prepend_extension
+
+from file_dates import apply_upload_date_timestamp
+
+# Containers that can hold embedded subtitles
+SUBTITLE_EXTS = ('mp4', 'mov', 'm4a', 'webm', 'mkv', 'mka')
+
+# Fixups that only remux the file, which the fused pass does anyway
+_REMUX_FIXUPS = (FFmpegFixupM4aPP, FFmpegFixupM3u8PP)
+
+
+class FusedMuxPP(FFmpegPostProcessor):
+    """Merge, subtitle embedding, metadata and file date in one FFmpeg pass.
+
+    Replaces yt-dlp's merger, and the remux fixups of a single file, so
+    the media is read and written once instead of once per step. The
+    subtitle files written by writesubtitles are embedded and removed.
+    """
+    @classmethod
+    def pp_key(cls):
+        return 'FusedMux'
+
+    def _subtitles(self, info):
+        ext = info['ext']
+        if ext not in SUBTITLE_EXTS:
+            return []
+        subtitles = []
+        for lang, sub in (info.get('requested_subtitles') or {}).items():
+            path = sub.get('filepath')
+            if not path or not os.path.exists(path) or sub.get('ext') == 'json':
+                continue
+            if ext == 'webm' and sub.get('ext') != 'vtt':
+                self.report_warning(f"Only WebVTT subtitles can be embedded in webm; keeping {lang} as a file")
+                continue
+            subtitles.append((lang, sub.get('name'), path))
+        return subtitles
+
+    @staticmethod
+    def _metadata(info):
+        fields = {
+            'title': info.get('title'),
+            'artist': info.get('uploader') or info.get('channel'),
+            'date': info.get('upload_date'),
+            'description': info.get('description'),
+            'comment': info.get('webpage_url'),
+        }
+        args = []
+        for name, value in fields.items():
+            if value:
+                args.extend(['-metadata', f'{name}={value}'])
+        return args
+
+    @FFmpegPostProcessor._restrict_to(images=False)
+    def run(self, info):
+        filename = info['filepath']
+        ext = info['ext']
+        if info.get('__files_to_merge'):
+            inputs = list(info['__files_to_merge'])
+            formats = info['requested_formats']
+        else:
+            inputs = [filename]
+            formats = [info]
+        subtitles = self._subtitles(info)
+
+        args = []
+        audio_streams = 0
+        for i, fmt in enumerate(formats):
+            # An unknown codec (None) may mean no such stream; its map is optional
+            if fmt.get('vcodec') != 'none':
+                args.extend(['-map', f'{i}:v:0' if fmt.get('vcodec') else f'{i}:v:0?'])
+            if fmt.get('acodec') != 'none':
+                args.extend(['-map', f'{i}:a:0' if fmt.get('acodec') else f'{i}:a:0?'])
+                # ADTS AAC from HLS (or a DASH m4a) needs this to be valid in MP4
+                if ext in ('mp4', 'm4a', 'mov') and (fmt.get('acodec') or '').startswith('mp4a'):
+                    args.extend([f'-bsf:a:{audio_streams}', 'aac_adtstoasc'])
+                audio_streams += 1
+        args.extend(['-dn', '-ignore_unknown', '-c', 'copy'])
+        for i, (lang, name, path) in enumerate(subtitles):
+            args.extend(['-map', f'{len(inputs) + i}:0',
+                         f'-metadata:s:s:{i}', f'language={ISO639Utils.short2long(lang) or lang}'])
+            if name:
+                args.extend([f'-metadata:s:s:{i}', f'title={name}'])
+        if subtitles and ext in ('mp4', 'mov', 'm4a'):
+            args.extend(['-c:s', 'mov_text'])
+        args.extend(self._metadata(info))
+        if ext in ('mp4', 'mov', 'm4a'):
+            args.extend(['-movflags', '+faststart'])
+
+        temp_filename = prepend_extension(filename, 'temp')
+        self.to_screen(f'Writing "{filename}" in one pass ({len(inputs)} streams, {len(subtitles)} subtitles)')
+        self.run_ffmpeg_multiple_files(inputs + [path for _, _, path in subtitles], temp_filename, args)
+        os.replace(temp_filename, filename)
+
+        apply_upload_date_timestamp(filename, info)
+
+        # The merged inputs and the now embedded subtitle files
+        to_delete = [path for path in inputs if path != filename] + [path for _, _, path in subtitles]
+        return to_delete, info
+
+
+def fuse_postprocessors(ydl, info):
+    """Swap the merger and remux fixups queued for a download for one FusedMuxPP.
+
+    Single files are only rewritten when there are subtitles to embed;
+    otherwise they are left alone, and audio-only downloads always are.
+    Returns True if a FusedMuxPP was queued.
+    """
+    queued = info.get('__postprocessors') or []
+    merge = any(isinstance(pp, FFmpegMergerPP) for pp in queued)
+    has_video = info.get('vcodec') != 'none' or merge
+    has_subtitles = any(sub.get('filepath') for sub in (info.get('requested_subtitles') or {}).values())
+    if not has_video or not (merge or has_subtitles and info.get('ext') in SUBTITLE_EXTS):
+        return False
+    fused = FusedMuxPP(ydl)
+    if not fused.available:
+        return False
+    info['__postprocessors'] = [fused] + [pp for pp in queued
+                                          if not isinstance(pp, (FFmpegMergerPP,) + _REMUX_FIXUPS)]
+    return True
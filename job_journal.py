@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = Path.home() / ".cache" / "youtube_downloader" / "jobs.sqlite3"
+
+# Runs that can be picked up again after a crash, close or cancel
+RESUMABLE_STATUSES = ('running', 'interrupted')
+
+# Flat entry fields needed to rebuild a job without listing the playlist again
+ENTRY_FIELDS = ('id', 'title', 'url', 'webpage_url', 'ie_key', 'duration')
+
+
+def journal_key(entry, url=None):
+    """Stable key for a playlist item across runs.
+
+    Positions shift when a playlist changes, so items are keyed by video ID
+    and fall back to the URL.
+    """
+    if entry and entry.get('id'):
+        return str(entry['id'])
+    return url
+
+
+class JobJournal:
+    """Crash-safe SQLite (WAL) journal of playlist runs and their items.
+
+    Every state transition of every item is written as it happens, so
+    after a crash or a closed window the run can be resumed: completed
+    items are skipped and interrupted ones start again, picking up their
+    .part files where yt-dlp left them. Transitions are also appended to
+    an events table for auditing.
+    """
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = str(path)
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # NORMAL is durable against application crashes in WAL mode
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    title TEXT,
+                    settings TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    listing_complete INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )""")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS items (
+                    run_id TEXT NOT NULL,
+                    item_key TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    entry TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    filepath TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (run_id, item_key)
+                )""")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    run_id TEXT NOT NULL,
+                    item_key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    at REAL NOT NULL
+                )""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS runs_status ON runs (status)")
+
+    def start_run(self, url, job_template, title=None):
+        """Record a new playlist run. Returns its run_id."""
+        run_id = uuid.uuid4().hex[:12]
+        settings = {
+            'quality': job_template.quality,
+            'format_type': job_template.format_type,
+            'include_subs': job_template.include_subs,
+            'audio_codec': job_template.audio_codec,
+            'renditions': [rendition.label for rendition in job_template.renditions],
+            'output_dir': job_template.output_dir,
+            'cookiefile': str(job_template.cookiefile) if job_template.cookiefile else None,
+        }
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO runs (run_id, url, title, settings, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'running', ?, ?)",
+                (run_id, url, title, json.dumps(settings), now, now))
+        return run_id
+
+    def set_run_status(self, run_id, status, title=None, listing_complete=None):
+        """Update a run's status (running, interrupted, finished or abandoned)"""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE runs SET status = ?, title = COALESCE(?, title), "
+                "listing_complete = COALESCE(?, listing_complete), updated_at = ? WHERE run_id = ?",
+                (status, title, None if listing_complete is None else int(listing_complete),
+                 time.time(), run_id))
+
+    def add_item(self, job):
+        """Record a listed playlist item. Items from an earlier attempt keep their state."""
+        entry = {k: job.info.get(k) for k in ENTRY_FIELDS if job.info and job.info.get(k) is not None}
+        entry.setdefault('url', job.url)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO items (run_id, item_key, position, entry, status, updated_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?)",
+                (job.run_id, job.item_key, job.index or 0, json.dumps(entry), time.time()))
+
+    def record(self, job, filepath=None):
+        """Write a job's current status as a transition of its item"""
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE items SET status = ?, attempts = attempts + ?, error = ?, "
+                "filepath = COALESCE(?, filepath), updated_at = ? WHERE run_id = ? AND item_key = ?",
+                (job.status, 1 if job.status == "downloading" else 0, job.error, filepath, now,
+                 job.run_id, job.item_key))
+            self._db.execute(
+                "INSERT INTO events (run_id, item_key, status, at) VALUES (?, ?, ?, ?)",
+                (job.run_id, job.item_key, job.status, now))
+
+    def get_run(self, run_id):
+        """A run as a dict with its settings decoded, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT run_id, url, title, settings, status, listing_complete, created_at "
+                "FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return self._run_dict(row) if row else None
+
+    def unfinished_runs(self):
+        """Runs that stopped before finishing, newest first, with item counts"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT run_id, url, title, settings, status, listing_complete, created_at "
+                "FROM runs WHERE status IN (?, ?) ORDER BY created_at DESC",
+                RESUMABLE_STATUSES).fetchall()
+            runs = [self._run_dict(row) for row in rows]
+            for run in runs:
+                run['total'], run['completed'] = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(status = 'completed'), 0) FROM items WHERE run_id = ?",
+                    (run['run_id'],)).fetchone()
+        return runs
+
+    def items(self, run_id):
+        """All items of a run in playlist order"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT item_key, position, entry, status, attempts, error, filepath "
+                "FROM items WHERE run_id = ? ORDER BY position", (run_id,)).fetchall()
+        return [{'item_key': key, 'position': position, 'entry': json.loads(entry), 'status': status,
+                 'attempts': attempts, 'error': error, 'filepath': filepath}
+                for key, position, entry, status, attempts, error, filepath in rows]
+
+    def completed_keys(self, run_id):
+        """Keys of the items of a run that finished successfully"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT item_key FROM items WHERE run_id = ? AND status = 'completed'", (run_id,))
+            return {row[0] for row in rows}
+
+    @staticmethod
+    def _run_dict(row):
+        run_id, url, title, settings, status, listing_complete, created_at = row
+        return {
+            'run_id': run_id,
+            'url': url,
+            'title': title,
+            'settings': json.loads(settings),
+            'status': status,
+            'listing_complete': bool(listing_complete),
+            'created_at': created_at,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,130 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import re
+
+# Records waiting for the listener; beyond this, new records are dropped
+# rather than blocking a download thread
+DEFAULT_QUEUE_SIZE = 10000
+
+# Records handled before the handlers are flushed
+DEFAULT_BATCH_SIZE = 200
+
+_ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+
+# Emoji that render badly in log files and some Tk fonts
+EMOJI_TAGS = {
+    "🔍": "[Search] ",
+    "⬇️": "[Download] ",
+    "✅": "[Success] ",
+    "❌": "[Error] ",
+    "⏱️": "[Time] ",
+    "📊": "[Stats] ",
+    "📁": "[File] ",
+    "📂": "[Folder] ",
+    "⚡": "[Speed] ",
+}
+_EMOJI = re.compile('|'.join(re.escape(emoji) for emoji in EMOJI_TAGS))
+
+
+def sanitize(text):
+    """Strip terminal escape sequences and replace emoji with text tags, in one pass each"""
+    return _EMOJI.sub(lambda match: EMOJI_TAGS[match.group(0)], _ANSI_ESCAPE.sub('', text))
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of failing when the queue is full"""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler that leaves flushing to its caller.
+
+    The batching listener flushes once per batch, so a burst of records
+    becomes one write instead of one per record.
+    """
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that handles records in batches and flushes after each"""
+    def __init__(self, log_queue, *handlers, batch_size=DEFAULT_BATCH_SIZE):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def add_handler(self, handler):
+        # The tuple is swapped whole, so the listener thread never sees it half-built
+        self.handlers = self.handlers + (handler,)
+
+    def stop(self):
+        # Also registered with atexit, so a second call must be harmless
+        if self._thread is not None:
+            super().stop()
+
+    def _monitor(self):
+        log_queue = self.queue
+        has_task_done = hasattr(log_queue, 'task_done')
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+                if has_task_done:
+                    log_queue.task_done()
+
+            for handler in self.handlers:
+                handler.flush()
+            if stop:
+                return
+
+
+def start_logging(formatter, path=None, level=logging.INFO, queue_size=DEFAULT_QUEUE_SIZE):
+    """Send root logger records through a queue to a background listener.
+
+    Logging calls on download threads only enqueue; formatting, sanitizing
+    and file writes happen on the listener thread. Returns the listener;
+    more handlers can be added with listener.add_handler().
+    """
+    handlers = []
+    if path:
+        try:
+            file_handler = BufferedFileHandler(path, encoding='utf-8')
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+        except Exception:
+            # If file handler fails, continue without it
+            pass
+
+    log_queue = queue.Queue(queue_size)
+    listener = BatchingQueueListener(log_queue, *handlers)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(DroppingQueueHandler(log_queue))
+    listener.start()
+    # Flush whatever is still queued when the app exits
+    atexit.register(listener.stop)
+    return listener
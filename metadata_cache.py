@@ -0,0 +1,263 @@
+import functools
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "youtube_downloader" / "metadata.sqlite3"
+
+# Fields that describe the video itself and practically never change
+STATIC_FIELDS = {
+    'id', 'title', 'fulltitle', 'alt_title', 'description', 'duration', 'duration_string',
+    'channel', 'channel_id', 'channel_url', 'uploader', 'uploader_id', 'uploader_url',
+    'upload_date', 'release_date', 'timestamp', 'release_timestamp', 'thumbnail',
+    'thumbnails', 'tags', 'categories', 'chapters', 'age_limit', 'language',
+    'webpage_url', 'webpage_url_basename', 'webpage_url_domain', 'original_url',
+    'extractor', 'extractor_key', '_type',
+}
+
+# Fields that change over time but are fine to show slightly out of date
+VOLATILE_FIELDS = {
+    'view_count', 'like_count', 'dislike_count', 'repost_count', 'comment_count',
+    'average_rating', 'channel_follower_count', 'concurrent_view_count',
+    'live_status', 'is_live', 'was_live', 'availability', 'playable_in_embed',
+}
+
+# Everything else (formats, signed stream URLs, headers, subtitles...) is a
+# "stream" field and expires with the stream URLs
+FIELD_CLASSES = ('static', 'volatile', 'stream')
+
+DEFAULT_TTLS = {
+    'static': 30 * 24 * 3600,
+    'volatile': 24 * 3600,
+    'stream': 3600,  # Used when the stream URLs don't say when they expire
+}
+
+# Stop using signed URLs this long before the server says they expire
+STREAM_EXPIRY_MARGIN = 10 * 60
+
+# YouTube (googlevideo) URLs carry their expiry time as a query parameter
+_EXPIRE_PATTERN = re.compile(r'[?&/]expire[=/](\d{9,11})')
+
+
+def field_class(key):
+    """Which TTL class an info dict key belongs to"""
+    if key in STATIC_FIELDS:
+        return 'static'
+    if key in VOLATILE_FIELDS:
+        return 'volatile'
+    return 'stream'
+
+
+def _jsonable(obj, dropped=None):
+    """Copy of an info dict without values that can't round-trip through JSON.
+
+    Each value left out is appended to the dropped list, if one is given.
+    """
+    if isinstance(obj, dict):
+        result = {}
+        for key, value in obj.items():
+            value = _jsonable(value, dropped)
+            if value is not _SKIP:
+                result[key] = value
+        return result
+    if isinstance(obj, (list, tuple)):
+        return [item for item in (_jsonable(item, dropped) for item in obj) if item is not _SKIP]
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    # Callables, generators and extractor helper objects can't be cached
+    if dropped is not None:
+        dropped.append(obj)
+    return _SKIP
+
+
+_SKIP = object()
+
+
+@functools.lru_cache(maxsize=4096)
+def video_key_for_url(url):
+    """Cache key ("Extractor:id") for a URL, without any network access.
+
+    Returns None when no specific extractor claims the URL.
+    """
+    from yt_dlp.extractor import gen_extractor_classes
+    from yt_dlp.extractor.youtube import YoutubeIE
+
+    # Nearly every URL we see is YouTube, so try that before scanning everything
+    candidates = [YoutubeIE]
+    if not YoutubeIE.suitable(url):
+        candidates = gen_extractor_classes()
+
+    for ie in candidates:
+        if ie.ie_key() == 'Generic':
+            break
+        if ie.suitable(url):
+            video_id = ie.get_temp_id(url)
+            return f"{ie.ie_key()}:{video_id}" if video_id else None
+    return None
+
+
+def video_key_for_info(info):
+    """Cache key for an extractor result"""
+    if not info or not info.get('id') or not info.get('extractor_key'):
+        return None
+    return f"{info['extractor_key']}:{info['id']}"
+
+
+class MetadataCache:
+    """SQLite cache of unprocessed extractor results, keyed by video ID.
+
+    Each result is split into static, volatile and stream field classes,
+    stored with their own expiry time. Lookups that need stream data (to
+    download or select formats) only hit while the signed stream URLs are
+    still valid; lookups for display only need the static fields. The
+    least recently used videos are evicted beyond max_entries.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=5000, ttls=None):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # Misses caused by an expired field class
+        self.evictions = 0
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS metadata (
+                    video_key TEXT NOT NULL,
+                    field_class TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (video_key, field_class)
+                )""")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    video_key TEXT PRIMARY KEY,
+                    last_access REAL NOT NULL
+                )""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS videos_lru ON videos (last_access)")
+
+    def _stream_ttl(self, stream_fields):
+        """Seconds until the signed stream URLs expire"""
+        now = time.time()
+        expiries = []
+        for fmt in stream_fields.get('formats') or []:
+            match = _EXPIRE_PATTERN.search(fmt.get('url') or '')
+            if match:
+                expiries.append(int(match.group(1)))
+        if expiries:
+            return max(0, min(expiries) - now - STREAM_EXPIRY_MARGIN)
+        return self.ttls['stream']
+
+    def get(self, url, need_streams=True):
+        """Return a cached extractor result for url, or None on a miss.
+
+        With need_streams=False, a result whose stream fields have expired
+        is still returned, minus those fields.
+        """
+        key = video_key_for_url(url)
+        if key is None:
+            return None
+
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT field_class, data, expires_at FROM metadata WHERE video_key = ?",
+                (key,)).fetchall()
+
+            info = {}
+            fresh = set()
+            for cls, data, expires_at in rows:
+                if expires_at > now:
+                    info.update(json.loads(data))
+                    fresh.add(cls)
+
+            required = {'static', 'stream'} if need_streams else {'static'}
+            if not required <= fresh:
+                self.misses += 1
+                if rows:
+                    self.stale += 1
+                return None
+
+            self.hits += 1
+            with self._db:
+                self._db.execute("UPDATE videos SET last_access = ? WHERE video_key = ?", (now, key))
+        return info
+
+    def put(self, info):
+        """Store an unprocessed single-video extractor result"""
+        key = video_key_for_info(info)
+        # Playlists and redirects are not cached; their entries are lazy
+        if key is None or info.get('_type', 'video') != 'video':
+            return False
+
+        classes = {cls: {} for cls in FIELD_CLASSES}
+        dropped = []
+        for field, value in _jsonable(info, dropped).items():
+            classes[field_class(field)][field] = value
+        if dropped:
+            # Fragment generators and the like can't be cached; a result without
+            # them can't be downloaded, so only its listing fields are kept
+            logger.debug(f"Not caching stream fields of {key}: {len(dropped)} values can't be stored")
+            del classes['stream']
+
+        now = time.time()
+        ttls = dict(self.ttls, stream=self._stream_ttl(classes.get('stream', {})))
+        with self._lock, self._db:
+            if dropped:
+                self._db.execute("DELETE FROM metadata WHERE video_key = ? AND field_class = 'stream'", (key,))
+            self._db.executemany(
+                "INSERT OR REPLACE INTO metadata (video_key, field_class, data, expires_at) VALUES (?, ?, ?, ?)",
+                [(key, cls, json.dumps(fields), now + ttls[cls]) for cls, fields in classes.items()])
+            self._db.execute("INSERT OR REPLACE INTO videos (video_key, last_access) VALUES (?, ?)", (key, now))
+            self._evict()
+        return True
+
+    def _evict(self):
+        """Drop least recently used videos beyond max_entries. Lock is held."""
+        (count,) = self._db.execute("SELECT COUNT(*) FROM videos").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        keys = [row[0] for row in self._db.execute(
+            "SELECT video_key FROM videos ORDER BY last_access LIMIT ?", (excess,))]
+        self._db.executemany("DELETE FROM metadata WHERE video_key = ?", [(k,) for k in keys])
+        self._db.executemany("DELETE FROM videos WHERE video_key = ?", [(k,) for k in keys])
+        self.evictions += len(keys)
+
+    def purge_expired(self):
+        """Delete expired rows and videos with nothing left"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM metadata WHERE expires_at <= ?", (time.time(),))
+            self._db.execute("DELETE FROM videos WHERE video_key NOT IN (SELECT video_key FROM metadata)")
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM videos").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'evictions': self.evictions,
+            'entries': entries,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
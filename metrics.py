@@ -0,0 +1,278 @@
+import bisect
+import http.server
+import logging
+import math
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_PORT = 9464
+
+# Latency buckets in seconds, from a quick TTFB to a long FFmpeg run
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# yt-dlp logs this before sleeping between retries
+_SLEEP_PATTERN = re.compile(r'Sleeping (\d+(?:\.\d+)?) seconds')
+
+
+def _label_text(labelnames, values):
+    if not labelnames:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in zip(labelnames, values))
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base for metrics with optional labels; one value per label combination"""
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # Label values tuple -> value
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self):
+        """(suffix, label text, value) for the Prometheus exposition"""
+        with self._lock:
+            items = list(self._values.items())
+        return [('', _label_text(self.labelnames, key), value) for key, value in items]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """A value that only goes up"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def total(self):
+        """Sum over all label combinations"""
+        with self._lock:
+            return sum(self._values.values())
+
+
+class Gauge(Metric):
+    """A value that goes up and down, or is read from a function when scraped"""
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels):
+        if self.function is not None:
+            return self.function()
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if self.function is not None:
+            return [('', '', self.function())]
+        return super().samples()
+
+
+class Histogram(Metric):
+    """Counts of observations in cumulative buckets, plus their sum"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (not cumulative), sum, count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def quantile(self, q, **labels):
+        """Estimate a quantile by interpolating inside its bucket; None without data"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            if not state or not state[2]:
+                return None
+            counts, total = list(state[0]), state[2]
+        rank = q * total
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, counts):
+            if count and seen + count >= rank:
+                if bound == math.inf:
+                    return lower
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound if bound != math.inf else lower
+        return lower
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+        samples = []
+        for key, counts, total_sum, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _label_text(self.labelnames + ('le',), key + (_format_value(bound),))
+                samples.append(('_bucket', labels, cumulative))
+            labels = _label_text(self.labelnames, key)
+            samples.append(('_sum', labels, total_sum))
+            samples.append(('_count', labels, count))
+        return samples
+
+
+class MetricsRegistry:
+    """Named metrics that render together in the Prometheus text format"""
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        return self._register(Gauge, name, documentation, labelnames, function=function)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class DownloadMetrics:
+    """The metrics of the download path, on one registry.
+
+    The engine reports stage durations, finished jobs and transferred
+    bytes; YtdlpLogger reports retries and retry sleeps; scheduler and
+    controller state is read when the metrics are scraped.
+    """
+    def __init__(self, registry=None):
+        self.registry = registry or MetricsRegistry()
+        self.stage_seconds = self.registry.histogram(
+            'ytdl_stage_seconds', "Time spent per job stage", ('stage',))
+        self.jobs = self.registry.counter(
+            'ytdl_jobs_total', "Jobs by outcome", ('result',))
+        self.bytes = self.registry.counter(
+            'ytdl_downloaded_bytes_total', "Bytes downloaded")
+        self.retries = self.registry.counter(
+            'ytdl_retries_total', "Retries reported by yt-dlp")
+        self.retry_sleep = self.registry.histogram(
+            'ytdl_retry_sleep_seconds', "Sleeps between retries",
+            buckets=(0.5, 1, 2, 5, 10, 30, 60, 120))
+        self.active = None  # Gauges set by bind_scheduler()
+        self.queued = None
+
+    def bind_scheduler(self, scheduler, controller=None):
+        """Expose scheduler (and controller) state as gauges"""
+        self.active = self.registry.gauge('ytdl_active_downloads', "Jobs holding a download slot",
+                                          function=lambda: scheduler.active)
+        self.queued = self.registry.gauge('ytdl_queued_downloads', "Jobs waiting for a download slot",
+                                          function=lambda: scheduler.queued)
+        self.registry.gauge('ytdl_concurrency_limit', "Download slots",
+                            function=lambda: scheduler.concurrency)
+        if controller is not None:
+            self.registry.gauge('ytdl_fragment_limit', "Concurrent fragments for new jobs",
+                                function=lambda: controller.fragment_limit)
+
+    def observe_stage(self, stage, seconds):
+        self.stage_seconds.observe(seconds, stage=stage)
+
+    def job_finished(self, result):
+        self.jobs.inc(result=result)
+
+    def add_bytes(self, amount):
+        if amount > 0:
+            self.bytes.inc(amount)
+
+    def record_retry(self):
+        self.retries.inc()
+
+    def record_sleep(self, message):
+        """Observe the delay in a yt-dlp 'Sleeping N seconds' message"""
+        match = _SLEEP_PATTERN.search(message)
+        if match:
+            self.retry_sleep.observe(float(match.group(1)))
+
+
+class MetricsServer:
+    """Serves a registry as Prometheus text on http://127.0.0.1:port/metrics"""
+    def __init__(self, registry, port=DEFAULT_METRICS_PORT, host='127.0.0.1'):
+        self.registry = registry
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split('?')[0] not in ('/', '/metrics'):
+                    handler.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                handler.send_header('Content-Length', str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                # Scrapes every few seconds would flood the log
+                pass
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"Serving metrics on http://127.0.0.1:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default worker counts per stage. There is one download worker per slot the
+# scheduler may grant (see download_worker_count); each takes a slot for its
+# download, so the scheduler and its adaptive controller decide how many
+# actually transfer at once.
+DEFAULT_EXTRACT_WORKERS = 4
+DEFAULT_POSTPROCESS_WORKERS = 2
+
+# Items allowed to wait between two stages
+DEFAULT_QUEUE_SIZE = 8
+
+# Tells a stage worker that no more items are coming
+_DONE = object()
+
+
+def download_worker_count(scheduler, controller=None):
+    """Most downloads the scheduler can run at once: the adaptive controller's
+    ceiling, or the fixed concurrency without one"""
+    limit = controller.max_videos if controller else scheduler.concurrency
+    return max(1, min(limit, scheduler.max_workers))
+
+
+class DownloadPipeline:
+    """Staged playlist download: enumerate -> extract -> download -> postprocess.
+
+    Jobs may come from a lazy generator, in which case enumeration itself is
+    a stage and the first downloads start while the listing is still loading.
+
+    Each stage has its own worker count and hands items to the next one
+    through a bounded asyncio queue, so a fast stage can only run a few
+    items ahead of a slow one. Network-bound extraction and downloading
+    overlap with CPU-bound FFmpeg work, and a slow merge no longer holds
+    a download slot.
+
+    The stage work itself lives on the engine (extract_item, download_item,
+    postprocess_item); each returns either the item for the next stage or a
+    finished JobResult. Blocking calls run in the scheduler's executor and
+    the stages are coroutines on the scheduler's loop.
+    """
+    def __init__(self, engine, scheduler,
+                 extract_workers=DEFAULT_EXTRACT_WORKERS,
+                 download_workers=None,
+                 postprocess_workers=DEFAULT_POSTPROCESS_WORKERS,
+                 queue_size=DEFAULT_QUEUE_SIZE):
+        self.engine = engine
+        self.scheduler = scheduler
+        self.extract_workers = max(1, extract_workers)
+        self.download_workers = max(1, download_workers or download_worker_count(scheduler, engine.controller))
+        self.postprocess_workers = max(1, postprocess_workers)
+        self.queue_size = max(1, queue_size)
+        self.results = []
+        self.enumeration_error = None
+        self.listing_complete = False  # Every job was pulled from the listing
+
+    def run(self, jobs):
+        """Run all jobs through the pipeline. Blocks; returns JobResults in job order."""
+        self.results = []
+        self.scheduler.run_coroutine(self._run(jobs)).result()
+        return sorted(self.results, key=lambda result: result.job.index or 0)
+
+    async def _run(self, jobs):
+        to_extract = asyncio.Queue(self.queue_size)
+        to_download = asyncio.Queue(self.queue_size)
+        to_postprocess = asyncio.Queue(self.queue_size)
+
+        extractors = [asyncio.create_task(self._worker(to_extract, to_download, self._extract, False))
+                      for _ in range(self.extract_workers)]
+        downloaders = [asyncio.create_task(self._worker(to_download, to_postprocess, self._download, True))
+                       for _ in range(self.download_workers)]
+        postprocessors = [asyncio.create_task(self._worker(to_postprocess, None, self._postprocess, False))
+                          for _ in range(self.postprocess_workers)]
+
+        # Enumerate stage: feed jobs in order, waiting whenever extraction falls behind
+        await self._enumerate(jobs, to_extract)
+
+        # Shut the stages down in order, once everything upstream has drained
+        for stage, queue in ((extractors, to_extract), (downloaders, to_download),
+                             (postprocessors, to_postprocess)):
+            for _ in stage:
+                await queue.put(_DONE)
+            await asyncio.gather(*stage)
+
+    async def _enumerate(self, jobs, queue):
+        """Pull jobs from a list or a lazy generator into the extract queue.
+
+        next() runs in the executor because a lazy playlist fetches its next
+        listing page inside it. The queue is bounded, so a long listing is
+        only read as fast as extraction keeps up.
+        """
+        jobs = iter(jobs)
+        try:
+            while not self.engine.cancelled:
+                try:
+                    job = await self.scheduler.run_blocking(next, jobs, _DONE, limited=False)
+                except Exception as e:
+                    # Keep what was listed so far; those items still download
+                    logger.error(f"Playlist enumeration stopped early: {str(e)}")
+                    self.enumeration_error = e
+                    return
+                if job is _DONE:
+                    self.listing_complete = True
+                    return
+                await queue.put(job)
+        finally:
+            # Stop a lazy listing that was cut short by cancellation
+            if hasattr(jobs, 'close'):
+                jobs.close()
+
+    async def _worker(self, inbox, outbox, handler, limited):
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            try:
+                result = await self.scheduler.run_blocking(handler, item, limited=limited)
+            except Exception as e:
+                # Stage handlers report their own failures, so this is a bug;
+                # the item still ends up as a failed result instead of vanishing
+                logger.error(f"Pipeline stage {handler.__name__} failed: {str(e)}")
+                result = await self.scheduler.run_blocking(self._fail, item, e, limited=False)
+            if isinstance(result, tuple) and outbox is not None:
+                await outbox.put(result)
+            elif result is not None:
+                self.results.append(result)
+
+    def _extract(self, job):
+        item = self.engine.extract_item(job)
+        return (job,) + item if isinstance(item, tuple) else item
+
+    def _download(self, item):
+        job, ydl, info = item
+        result = self.engine.download_item(job, ydl, info)
+        return (job,) + result if isinstance(result, tuple) else result
+
+    def _postprocess(self, item):
+        job, ydl, info = item
+        return self.engine.postprocess_item(job, ydl, info)
+
+    def _fail(self, item, error):
+        if isinstance(item, tuple):
+            job, ydl, _ = item
+            return self.engine.fail_item(job, error, ydl)
+        return self.engine.fail_item(item, error)
@@ -0,0 +1,148 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# FFmpeg threads given to each concurrent job; the pool runs cores / this many jobs
+DEFAULT_THREADS_PER_JOB = 2
+
+# Params that hold callables or live objects; they stay with the downloading process
+LOCAL_PARAMS = ('logger', 'progress_hooks', 'postprocessor_hooks', 'match_filter', 'format')
+
+
+def cpu_count():
+    try:
+        # Respect CPU affinity (taskset, containers) where the platform reports it
+        return len(os.sched_getaffinity(0)) or 1
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def ffmpeg_threads(concurrent_jobs):
+    """FFmpeg threads per job so that concurrent jobs together fill the cores once"""
+    return max(1, cpu_count() // max(1, concurrent_jobs))
+
+
+class _CollectingLogger:
+    """yt-dlp logger for a worker process; messages are returned to the parent"""
+    def __init__(self):
+        self.messages = []
+
+    def debug(self, msg):
+        # Debug output is too chatty to send back
+        pass
+
+    def info(self, msg):
+        self.messages.append((logging.INFO, msg))
+
+    def warning(self, msg):
+        self.messages.append((logging.WARNING, msg))
+
+    def error(self, msg):
+        self.messages.append((logging.ERROR, msg))
+
+
+def _postprocess(payload):
+    """Runs in a worker process: yt-dlp's post_process for one downloaded file"""
+    import yt_dlp
+    from yt_dlp.postprocessor import get_postprocessor
+    from fused_mux import FusedMuxPP
+
+    params, filename, info, files_to_move = pickle.loads(payload)
+    collector = _CollectingLogger()
+    params = dict(params, logger=collector)
+    try:
+        with yt_dlp.YoutubeDL(params) as ydl:
+            # Merger and fixups were queued by name; rebuild them for this YoutubeDL
+            info['__postprocessors'] = [(FusedMuxPP if key == FusedMuxPP.pp_key() else get_postprocessor(key))(ydl)
+                                        for key in info.get('__postprocessors') or ()]
+            info = ydl.post_process(filename, info, files_to_move)
+        return {'filepath': info.get('filepath', filename), 'messages': collector.messages}
+    except Exception as e:
+        return {'error': str(e), 'messages': collector.messages}
+
+
+class PostprocessPool:
+    """Process pool for merging and FFmpeg post-processing.
+
+    Sized from the CPU count: each job gets threads_per_job FFmpeg threads
+    and workers jobs run at once, so transcodes use every core without
+    oversubscribing small machines. Submitted jobs wait in the pool's own
+    queue, leaving the download workers free to keep the network busy.
+
+    Worker processes are started on first use, with the spawn method so
+    they never inherit the parent's threads or locks.
+    """
+    def __init__(self, workers=None, threads_per_job=None):
+        cpus = cpu_count()
+        if workers:
+            self.workers = max(1, workers)
+            self.threads_per_job = threads_per_job or ffmpeg_threads(self.workers)
+        else:
+            self.threads_per_job = max(1, threads_per_job or min(DEFAULT_THREADS_PER_JOB, cpus))
+            self.workers = max(1, cpus // self.threads_per_job)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def run(self, params, filename, info, files_to_move=None):
+        """Post-process one file in a worker process and wait for it.
+
+        Returns the final file path, or None if the work could not be handed
+        to a worker; the caller should then run it in-process.
+        """
+        params = {key: value for key, value in params.items() if key not in LOCAL_PARAMS}
+        info = dict(info)
+        info['__postprocessors'] = [pp.pp_key() for pp in info.get('__postprocessors') or ()]
+        try:
+            payload = pickle.dumps((params, filename, info, files_to_move))
+        except Exception as e:
+            # Live objects in the info dict can't cross to another process
+            logger.warning(f"Post-processing {filename} in-process: {str(e)}")
+            return None
+
+        executor = self._get_executor()
+        try:
+            result = executor.submit(_postprocess, payload).result()
+        except BrokenProcessPool as e:
+            # A worker died; start a fresh pool for the next job
+            logger.error(f"Post-processing pool failed: {str(e)}")
+            self._reset(executor)
+            return None
+
+        for level, message in result['messages']:
+            logger.log(level, message)
+        if 'error' in result:
+            raise Exception(result['error'])
+        return result['filepath']
+
+    def submit(self, fn, *args):
+        """Run fn(*args) in a worker process; fn must be importable by name. Returns a Future."""
+        executor = self._get_executor()
+        try:
+            return executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._reset(executor)
+            return self._get_executor().submit(fn, *args)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,265 @@
+import collections
+import contextlib
+import cProfile
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Profiling is switched on and off by writing this file; see Profiler
+DEFAULT_PROFILE_CONTROL = Path.home() / ".cache" / "youtube_downloader" / "profile.json"
+
+# Where profiles go when a job has no output directory (metadata fetches)
+DEFAULT_PROFILE_DIR = Path.home() / ".cache" / "youtube_downloader" / "profiles"
+
+MODES = ("cprofile", "sampling")
+STAGES = ("extract", "download", "postprocess", "metadata")
+
+# Seconds between checks of the control file for changes
+CONTROL_CHECK_INTERVAL = 1.0
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Allocation sites listed in a tracemalloc report
+MEMORY_TOP_LINES = 30
+
+ProfileSettings = collections.namedtuple('ProfileSettings', ['mode', 'stages', 'jobs', 'trace_memory'])
+
+_OFF = ProfileSettings(None, frozenset(), frozenset(), False)
+
+_UNSAFE_NAME = re.compile(r'[^\w.-]+')
+
+
+class StackSampler:
+    """Samples one thread's stack at a fixed interval.
+
+    Unlike cProfile it adds no cost to every function call, so it can
+    watch a long download without slowing it down. The result is written
+    in the folded format read by flamegraph.pl and speedscope.
+    """
+    def __init__(self, thread_id, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """Opt-in profiling of single jobs and stages, switchable at runtime.
+
+    Off by default. Settings come from configure() or from a JSON control
+    file that is re-read whenever it changes, so a running app can be
+    profiled without a restart:
+
+        {"mode": "cprofile", "stages": ["extract"], "jobs": ["dQw4w9WgXcQ"],
+         "trace_memory": true}
+
+    mode is "cprofile" or "sampling" (or null for memory tracing only);
+    stages picks from extract, download, postprocess and metadata; jobs
+    matches job IDs, video IDs or URLs. Empty lists match everything.
+    Deleting the file switches profiling off again.
+
+    Each profiled stage writes <job_id>-<stage>.prof (cProfile, for pstats
+    or snakeviz) or .folded (sampling) into the job's output directory.
+    trace_memory adds tracemalloc snapshots around extract_info, written
+    as <job_id>-<stage>-memory.txt.
+    """
+    def __init__(self, control_path=DEFAULT_PROFILE_CONTROL, profile_dir=DEFAULT_PROFILE_DIR,
+                 sample_interval=DEFAULT_SAMPLE_INTERVAL):
+        self.control_path = str(control_path) if control_path else None
+        self.profile_dir = str(profile_dir)
+        self.sample_interval = sample_interval
+        self.settings = _OFF  # Replaced whole, never modified
+        self._from_control = False
+        self._control_mtime = None
+        self._next_check = 0.0
+        self._memory_lock = threading.Lock()
+        self._memory_users = 0
+        self._started_tracing = False  # Leave tracing alone if someone else started it
+
+    def configure(self, mode=None, stages=(), jobs=(), trace_memory=False):
+        """Set what to profile. mode=None with trace_memory=False switches it off."""
+        if mode is not None and mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}; use one of {', '.join(MODES)}")
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+        self.settings = ProfileSettings(mode, frozenset(stages), frozenset(str(job) for job in jobs),
+                                        bool(trace_memory))
+        self._from_control = False
+        if self.enabled:
+            logger.info(f"Profiling on: {self.describe()}")
+
+    def disable(self):
+        self.settings = _OFF
+
+    @property
+    def enabled(self):
+        return self.settings.mode is not None or self.settings.trace_memory
+
+    def describe(self):
+        settings = self.settings
+        return (f"mode={settings.mode or 'off'}, stages={', '.join(sorted(settings.stages)) or 'all'}, "
+                f"jobs={', '.join(sorted(settings.jobs)) or 'all'}, trace_memory={settings.trace_memory}")
+
+    def _check_control(self):
+        """Pick up changes to the control file, at most once per interval"""
+        now = time.monotonic()
+        if self.control_path is None or now < self._next_check:
+            return
+        self._next_check = now + CONTROL_CHECK_INTERVAL
+        try:
+            mtime = os.stat(self.control_path).st_mtime
+        except OSError:
+            if self._from_control:
+                logger.info("Profiling off: control file removed")
+                self.disable()
+                self._from_control = False
+            self._control_mtime = None
+            return
+        if mtime == self._control_mtime:
+            return
+        self._control_mtime = mtime
+        try:
+            with open(self.control_path, encoding='utf-8') as f:
+                options = json.load(f)
+            self.configure(options.get('mode'), options.get('stages') or (), options.get('jobs') or (),
+                           options.get('trace_memory', False))
+            self._from_control = True
+            if not self.enabled:
+                logger.info("Profiling off")
+        except Exception as e:
+            logger.warning(f"Ignoring profiling control file {self.control_path}: {str(e)}")
+
+    def _wants(self, stage, job_id, aliases):
+        self._check_control()
+        settings = self.settings
+        if settings.stages and stage not in settings.stages:
+            return None
+        if settings.jobs and not settings.jobs.intersection(
+                str(key) for key in (job_id,) + tuple(aliases) if key):
+            return None
+        return settings
+
+    def _path(self, directory, job_id, suffix):
+        directory = directory if directory and os.path.isdir(directory) else self.profile_dir
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, _UNSAFE_NAME.sub('_', f"{job_id}-{suffix}"))
+
+    @contextlib.contextmanager
+    def profile(self, stage, job_id, directory=None, aliases=()):
+        """Profile the block if the settings select this job and stage"""
+        settings = self._wants(stage, job_id, aliases)
+        if settings is None or settings.mode is None:
+            yield
+            return
+
+        if settings.mode == "sampling":
+            sampler = StackSampler(threading.get_ident(), self.sample_interval)
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                self._write(lambda path: sampler.dump(path), directory, job_id, f"{stage}.folded")
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler is already active
+            logger.warning(f"Could not profile {stage} of job {job_id}: {str(e)}")
+            profile = None
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._write(profile.dump_stats, directory, job_id, f"{stage}.prof")
+
+    def _write(self, dump, directory, job_id, suffix):
+        try:
+            path = self._path(directory, job_id, suffix)
+            dump(path)
+            logger.info(f"Profile written to {path}")
+        except Exception as e:
+            # The job already finished; only its profile is lost
+            logger.warning(f"Could not write profile for job {job_id}: {str(e)}")
+
+    @contextlib.contextmanager
+    def trace_memory(self, stage, job_id, directory=None, aliases=()):
+        """Record what the block allocated, if memory tracing is on for this job"""
+        settings = self._wants(stage, job_id, aliases)
+        if settings is None or not settings.trace_memory:
+            yield
+            return
+
+        with self._memory_lock:
+            if self._memory_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            self._memory_users += 1
+        before = tracemalloc.take_snapshot()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            elapsed = time.monotonic() - started
+            with self._memory_lock:
+                self._memory_users -= 1
+                if self._memory_users == 0 and self._started_tracing:
+                    tracemalloc.stop()
+                    self._started_tracing = False
+            self._write(lambda path: self._dump_memory(path, job_id, stage, before, after,
+                                                       current, peak, elapsed),
+                        directory, job_id, f"{stage}-memory.txt")
+
+    @staticmethod
+    def _dump_memory(path, job_id, stage, before, after, current, peak, elapsed):
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+        grown = sum(stat.size_diff for stat in stats)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Job {job_id}, stage {stage}, {elapsed:.2f}s\n")
+            f.write(f"Net allocated: {grown / 1048576:.2f} MiB; traced now {current / 1048576:.2f} MiB, "
+                    f"peak {peak / 1048576:.2f} MiB\n")
+            f.write("Includes allocations by other threads running at the same time.\n\n")
+            for stat in stats[:MEMORY_TOP_LINES]:
+                f.write(f"{stat}\n")
@@ -0,0 +1,91 @@
+import collections
+import itertools
+
+# One row of the progress table; rows are immutable and replaced whole
+ProgressState = collections.namedtuple('ProgressState', [
+    'version', 'index', 'status', 'percent', 'downloaded', 'total', 'speed', 'eta', 'message',
+])
+
+# Statuses after which a job's row is dropped once the UI has shown it
+FINAL_STATUSES = ("completed", "error")
+
+
+class ProgressStore:
+    """Latest progress of every job, written by hooks and sampled by the UI.
+
+    yt-dlp calls progress hooks once per chunk on its worker threads. Each
+    call only replaces the job's row in a dict, which is atomic under the
+    GIL, so hooks never take a lock or touch Tk. The UI calls changed() at
+    a fixed frame rate and redraws only rows that changed since its last
+    sample; however many chunks arrive in between, a job costs at most one
+    redraw per frame.
+
+    changed() and forget() must only be called from the sampling thread.
+    """
+    def __init__(self):
+        self._jobs = {}  # job_id -> ProgressState
+        self._versions = itertools.count(1)  # next() is atomic in CPython
+        self._sampled = {}  # job_id -> version last returned by changed()
+        self._overall = None  # (version, completed, failed, total)
+        self._overall_sampled = 0
+        self.writes = 0  # Approximate; only for comparing with samples
+        self.samples = 0
+
+    def update_from_hook(self, job, d):
+        """Record a yt-dlp progress dict for a job"""
+        total = d.get('total_bytes') or d.get('total_bytes_estimate')
+        downloaded = d.get('downloaded_bytes')
+        if d.get('status') == 'finished':
+            percent = 100.0
+        elif total and downloaded is not None:
+            percent = min(100.0, downloaded * 100.0 / total)
+        else:
+            percent = job.progress
+        self._jobs[job.job_id] = ProgressState(
+            next(self._versions), job.index, "downloading", percent, d.get('_downloaded_str'),
+            d.get('_total_bytes_str'), d.get('_speed_str'), d.get('_eta_str'), None)
+        self.writes += 1
+
+    def update_state(self, job, message=None):
+        """Record a status change (pending, downloading, processing...)"""
+        percent = 100.0 if job.status in ("processing", "completed") else 0.0
+        self._jobs[job.job_id] = ProgressState(
+            next(self._versions), job.index, job.status, percent, None, None, None, None, message)
+        self.writes += 1
+
+    def update_overall(self, completed, failed, total):
+        """Record the playlist counters"""
+        self._overall = (next(self._versions), completed, failed, total)
+        self.writes += 1
+
+    def changed(self):
+        """(job_id, ProgressState) for every row that changed since the last call"""
+        self.samples += 1
+        rows = []
+        # list() copies the items in one step, so writers can keep going
+        for job_id, state in list(self._jobs.items()):
+            if self._sampled.get(job_id) != state.version:
+                self._sampled[job_id] = state.version
+                rows.append((job_id, state))
+                if state.status in FINAL_STATUSES:
+                    self.forget(job_id, state)
+        return rows
+
+    def overall(self):
+        """(completed, failed, total) if the playlist counters changed, else None"""
+        overall = self._overall
+        if overall is None or overall[0] == self._overall_sampled:
+            return None
+        self._overall_sampled = overall[0]
+        return overall[1:]
+
+    def forget(self, job_id, state):
+        """Drop a row, unless a writer replaced it in the meantime"""
+        if self._jobs.get(job_id) is state:
+            self._jobs.pop(job_id, None)
+            self._sampled.pop(job_id, None)
+
+    def clear(self):
+        self._jobs.clear()
+        self._sampled.clear()
+        self._overall = None
@@ -0,0 +1,154 @@
+import logging
+import os
+import re
+import subprocess
+
+from format_planner import AUDIO_CODEC_PREFIXES
+
+logger = logging.getLogger(__name__)
+
+# Requestable audio codec -> (extension, FFmpeg encoder arguments)
+AUDIO_ENCODERS = {
+    'mp3': ('mp3', ['-c:a', 'libmp3lame', '-b:a', '192k']),
+    'm4a': ('m4a', ['-c:a', 'aac', '-b:a', '192k']),
+    'opus': ('opus', ['-c:a', 'libopus', '-b:a', '160k']),
+    'vorbis': ('ogg', ['-c:a', 'libvorbis', '-q:a', '5']),
+    'flac': ('flac', ['-c:a', 'flac']),
+    'wav': ('wav', ['-c:a', 'pcm_s16le']),
+}
+
+# Source audio codec prefix -> extension it can be stream copied into
+NATIVE_AUDIO_CONTAINERS = (('mp4a', 'm4a'), ('aac', 'm4a'), ('opus', 'opus'), ('mp3', 'mp3'),
+                           ('vorbis', 'ogg'), ('flac', 'flac'))
+
+# Scaled-down video copies are H.264/AAC MP4, which plays everywhere
+VIDEO_ENCODER = ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23']
+VIDEO_AUDIO_ENCODER = ['-c:a', 'aac', '-b:a', '160k']
+
+# Lines of FFmpeg's error output kept in an error message
+ERROR_LINES = 5
+
+_QUALITY = re.compile(r'^(\d+)p?$')
+
+
+class Rendition:
+    """One output of a multi-output job: a video height, or audio in a codec"""
+    def __init__(self, format_type="video", quality=None, audio_codec=None):
+        self.format_type = format_type
+        self.quality = quality  # "480p" for video, None for audio
+        self.audio_codec = audio_codec  # None keeps the source audio codec
+
+    @property
+    def height(self):
+        return int(self.quality.rstrip('p')) if self.quality else 0
+
+    @property
+    def label(self):
+        if self.format_type == "video":
+            return self.quality
+        return self.audio_codec or "audio"
+
+    @classmethod
+    def parse(cls, text):
+        """Rendition from a label: "480p", "audio", or an audio codec such as "mp3" """
+        text = text.strip().lower()
+        match = _QUALITY.match(text)
+        if match:
+            return cls("video", f"{match.group(1)}p")
+        if text == "audio":
+            return cls("audio")
+        if text in AUDIO_ENCODERS:
+            return cls("audio", audio_codec=text)
+        raise ValueError(f"Unknown rendition {text!r}; use a height like 480p, 'audio' "
+                         f"or one of {', '.join(AUDIO_ENCODERS)}")
+
+    def __repr__(self):
+        return f"<Rendition {self.label}>"
+
+
+def parse_renditions(text):
+    """Renditions from a comma-separated list such as "1080p, mp3, 480p" """
+    renditions = []
+    for part in text.split(','):
+        if part.strip():
+            rendition = Rendition.parse(part)
+            if all(rendition.label != other.label for other in renditions):
+                renditions.append(rendition)
+    return renditions
+
+
+def source_settings(renditions):
+    """(format_type, quality) of the one download every rendition is made from"""
+    heights = [rendition.height for rendition in renditions if rendition.format_type == "video"]
+    if heights:
+        return "video", f"{max(heights)}p"
+    return "audio", None
+
+
+def _native_audio_ext(acodec):
+    acodec = (acodec or '').lower()
+    for prefix, ext in NATIVE_AUDIO_CONTAINERS:
+        if acodec.startswith(prefix):
+            return ext
+    return None
+
+
+def rendition_commands(renditions, source, info, threads):
+    """FFmpeg commands that produce each rendition from the downloaded source.
+
+    Returns a list of (rendition, command, output), and whether the source
+    file is one of the outputs. The command is None when the source already
+    is that rendition: the best video rendition keeps the download as it
+    is, and so does audio that is already in its target format. Audio is
+    stream copied whenever its codec allows.
+    """
+    stem, source_ext = os.path.splitext(source)
+    source_ext = source_ext[1:]
+    source_height = info.get('height') or 0
+    acodec = info.get('acodec')
+    source_kept = False
+    commands = []
+    for rendition in renditions:
+        if rendition.format_type == "video":
+            if not source_height or rendition.height >= source_height:
+                # Not scaled up; every such rendition is the source itself
+                source_kept = True
+                commands.append((rendition, None, source))
+                continue
+            output = f"{stem} [{rendition.label}].mp4"
+            audio = ['-c:a', 'copy'] if _native_audio_ext(acodec) == 'm4a' else VIDEO_AUDIO_ENCODER
+            command = ['-map', '0:v:0', '-map', '0:a:0?', '-vf', f'scale=-2:{rendition.height}',
+                       *VIDEO_ENCODER, *audio, '-movflags', '+faststart']
+        else:
+            codec = rendition.audio_codec
+            native_ext = _native_audio_ext(acodec)
+            if codec is None:
+                ext, audio = (native_ext, ['-c:a', 'copy']) if native_ext else AUDIO_ENCODERS['m4a']
+            elif (acodec or '').lower().startswith(AUDIO_CODEC_PREFIXES.get(codec, (codec,))):
+                ext, audio = AUDIO_ENCODERS[codec][0], ['-c:a', 'copy']
+            else:
+                ext, audio = AUDIO_ENCODERS[codec]
+            if info.get('vcodec') == 'none' and ext == source_ext and audio[-1] == 'copy':
+                source_kept = True
+                commands.append((rendition, None, source))
+                continue
+            output = f"{stem} [{rendition.label}].{ext}"
+            command = ['-vn', '-map', '0:a:0', *audio]
+        commands.append((rendition, ['ffmpeg', '-y', '-v', 'error', '-i', source, *command,
+                                     '-threads', str(threads), output], output))
+    return commands, source_kept
+
+
+def render(command):
+    """Run one FFmpeg command. Runs in a post-processing worker process."""
+    output = command[-1]
+    process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                             errors='replace')
+    if process.returncode != 0:
+        try:
+            os.remove(output)
+        except OSError:
+            pass
+        lines = process.stderr.strip().splitlines()[-ERROR_LINES:]
+        raise Exception(f"FFmpeg exited with code {process.returncode}: {' '.join(lines)}")
+    return output
@@ -0,0 +1,163 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Limit to max 3 concurrent downloads to avoid rate limiting
+DEFAULT_CONCURRENCY = 3
+
+# Upper bound on executor threads; concurrency can be raised up to this at runtime
+MAX_WORKER_THREADS = 32
+
+
+class ConcurrencyLimiter:
+    """An asyncio semaphore whose limit can be changed while jobs are waiting"""
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self.active = 0
+        self.waiting = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            self.waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self.active < self.limit)
+            finally:
+                self.waiting -= 1
+            self.active += 1
+
+    async def release(self):
+        async with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    async def set_limit(self, limit):
+        async with self._condition:
+            self.limit = max(1, limit)
+            # Wake everyone; only as many as fit under the new limit proceed
+            self._condition.notify_all()
+
+
+class DownloadScheduler:
+    """Runs blocking download calls with bounded concurrency on an asyncio loop.
+
+    The loop lives in its own daemon thread. Jobs are submitted from any
+    thread and come back as concurrent.futures.Future objects, so callers
+    wait on completion events rather than polling. Queued jobs are just
+    coroutines parked on the limiter, so hundreds of them (across several
+    playlists) cost next to nothing while idle.
+    """
+    def __init__(self, max_concurrency=DEFAULT_CONCURRENCY, max_workers=MAX_WORKER_THREADS):
+        self.loop = asyncio.new_event_loop()
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="download")
+        self.max_workers = max_workers
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+
+        self._thread = threading.Thread(target=self._run_loop, name="download-scheduler", daemon=True)
+        self._thread.start()
+
+        # The limiter must be created on the loop it will be used from
+        self.limiter = self._call(self._create_limiter(min(max_concurrency, max_workers)))
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def _call(self, coro):
+        """Run a coroutine on the scheduler loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def _create_limiter(self, limit):
+        return ConcurrencyLimiter(limit)
+
+    @property
+    def concurrency(self):
+        return self.limiter.limit
+
+    @property
+    def active(self):
+        return self.limiter.active
+
+    @property
+    def queued(self):
+        return self.limiter.waiting
+
+    def set_concurrency(self, limit):
+        """Change how many jobs may run at once. Safe to call from any thread."""
+        limit = max(1, min(limit, self.max_workers))
+        asyncio.run_coroutine_threadsafe(self.limiter.set_limit(limit), self.loop)
+
+    async def run_blocking(self, fn, *args, limited=True, started=None):
+        """Coroutine: run fn(*args) in the executor, on the scheduler loop.
+
+        With limited=True the call takes one of the concurrency slots first.
+        """
+        if limited:
+            await self.limiter.acquire()
+        if started is not None:
+            started.set()
+        try:
+            work = self.loop.run_in_executor(self.executor, fn, *args)
+            try:
+                return await asyncio.shield(work)
+            except asyncio.CancelledError:
+                # A worker thread can't be interrupted; hold its slot until it ends
+                await asyncio.wait([work])
+                raise
+        finally:
+            if limited:
+                await self.limiter.release()
+
+    def run_coroutine(self, coro):
+        """Start a coroutine on the scheduler loop. Returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def submit(self, fn, *args):
+        """Queue fn(*args) to run in the executor. Returns a Future."""
+        started = threading.Event()
+        future = self.run_coroutine(self.run_blocking(fn, *args, started=started))
+        future.started = started
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._pending_lock:
+            self._pending.discard(future)
+
+    def cancel_pending(self, futures=None):
+        """Cancel jobs that have not started yet (all jobs if futures is None)"""
+        with self._pending_lock:
+            targets = list(self._pending if futures is None else futures)
+        cancelled = 0
+        for future in targets:
+            # Running jobs are left alone; they stop through their own cancel checks
+            if not future.started.is_set() and future.cancel():
+                cancelled += 1
+        return cancelled
+
+    async def _drain(self):
+        """Wait for every job task on the loop to settle"""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        if tasks:
+            await asyncio.wait(tasks)
+
+    def shutdown(self, wait=True):
+        """Cancel queued jobs and stop the loop and executor.
+
+        With wait=True, jobs that are already running are allowed to finish.
+        """
+        self.cancel_pending()
+        if wait:
+            self._call(self._drain())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if wait:
+            self._thread.join()
+            self.loop.close()
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,38 @@
+from download_archive import DownloadArchive
+from download_engine import DownloadEngine, DownloadJob, JobResult
+from renditions import parse_renditions
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+INFO = {'id': 'dQw4w9WgXcQ', 'extractor_key': 'Youtube', 'title': 'Video'}
+
+
+def make_engine():
+    return DownloadEngine(archive=DownloadArchive(':memory:'))
+
+
+def finish(engine, job, filepath=None):
+    engine._archive_result(JobResult(job, True, filepath=filepath, info=INFO))
+
+
+def test_native_audio_does_not_archive_mp3():
+    engine = make_engine()
+    finish(engine, DownloadJob(URL, None, "audio", info=INFO), "/tmp/video.m4a")
+
+    assert engine.is_archived(DownloadJob(URL, None, "audio", info=INFO))
+    assert not engine.is_archived(DownloadJob(URL, None, "audio", info=INFO, audio_codec="mp3"))
+
+
+def test_audio_renditions_are_archived_per_codec():
+    engine = make_engine()
+    job = DownloadJob(URL, info=INFO, renditions=parse_renditions("mp3, opus"))
+    job.outputs = {'mp3': "/tmp/video [mp3].mp3"}
+    engine.archive.add(('Youtube', 'dQw4w9WgXcQ'), "audio", audio_codec="mp3")
+
+    # Only the MP3 is done; the Opus rendition still has to be made
+    assert not engine.is_archived(job)
+    assert engine.is_archived(DownloadJob(URL, info=INFO, renditions=parse_renditions("mp3")))
+
+    job.outputs['opus'] = "/tmp/video [opus].opus"
+    finish(engine, job)
+    assert engine.is_archived(job)
+    assert not engine.is_archived(DownloadJob(URL, info=INFO, renditions=parse_renditions("vorbis")))
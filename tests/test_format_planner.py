@@ -0,0 +1,43 @@
+from format_planner import FormatPlanner
+
+
+def audio(format_id, language_preference, abr=129.5, filesize=3_400_000, **fields):
+    return dict({'format_id': format_id, 'ext': 'm4a', 'protocol': 'https', 'vcodec': 'none', 'acodec': 'mp4a.40.2',
+                 'abr': abr, 'tbr': abr, 'filesize': filesize, 'language_preference': language_preference},
+                **fields)
+
+
+def youtube_formats():
+    """A dubbed video's formats, in yt-dlp's order: worst first"""
+    return [
+        audio('140-0', -1, language='es', format_note='Spanish'),
+        audio('140-0-drc', 10, filesize=3_300_000, format_note='English original (default), medium, DRC',
+              quality=2.5),
+        audio('140-2', 10, filesize=3_600_000, format_note='English original (default), damaged',
+              preference=-10),
+        audio('140-3', 10, filesize=3_000_000, format_note='English original (default)', __needs_testing=True),
+        audio('140-1', 10, filesize=3_500_000, language='en', format_note='English original (default)'),
+        {'format_id': '247', 'ext': 'webm', 'protocol': 'https', 'vcodec': 'vp9', 'acodec': 'none', 'height': 720,
+         'tbr': 1500, 'filesize': 40_000_000},
+    ]
+
+
+def select(planner, formats):
+    ctx = {'formats': formats, 'has_merged_format': False, 'incomplete_formats': False}
+    return [fmt['format_id'] for fmt in planner(ctx)]
+
+
+def test_video_plan_uses_original_audio_track():
+    planner = FormatPlanner("720p")
+    select(planner, youtube_formats())
+    assert planner.chosen.spec == '247+140-1'
+
+
+def test_audio_plan_skips_dubbed_drc_damaged_and_untested_tracks():
+    planner = FormatPlanner(format_type="audio")
+    assert select(planner, youtube_formats()) == ['140-1']
+
+
+def test_falls_back_when_every_format_is_deprioritized():
+    planner = FormatPlanner(format_type="audio")
+    assert select(planner, [audio('140-drc', None, format_note='DRC')]) == ['140-drc']
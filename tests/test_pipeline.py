@@ -0,0 +1,25 @@
+from download_engine import DownloadEngine, DownloadJob
+from pipeline import DownloadPipeline
+from scheduler import DownloadScheduler
+
+
+class BrokenEngine(DownloadEngine):
+    """Extracts every job, then hits a bug in the download stage"""
+    def extract_item(self, job):
+        return (None, {'id': job.url, 'title': job.url})
+
+    def download_item(self, job, ydl, info):
+        raise KeyError('filepath')
+
+
+def test_stage_bug_reports_failed_result():
+    scheduler = DownloadScheduler()
+    try:
+        jobs = [DownloadJob(f"https://example.com/{i}", index=i) for i in range(3)]
+        results = DownloadPipeline(BrokenEngine(), scheduler).run(jobs)
+    finally:
+        scheduler.shutdown()
+
+    assert [result.job.index for result in results] == [0, 1, 2]
+    assert not any(result.success for result in results)
+    assert all('filepath' in result.error for result in results)
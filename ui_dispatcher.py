@@ -0,0 +1,118 @@
+import collections
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# How often the queue is drained and how much of each tick it may use
+DEFAULT_TICK_MS = 16
+DEFAULT_BUDGET_MS = 8
+
+# While the queue stays empty the tick interval doubles up to this
+IDLE_TICK_MS = 250
+
+# Warn when a queued update waited longer than this before running
+SLOW_DRAIN_MS = 500
+STATS_LOG_INTERVAL = 10.0
+
+
+class UIDispatcher:
+    """Runs widget updates on the Tk main thread, a budgeted batch per tick.
+
+    Tk is not thread-safe, so worker threads never touch widgets; they call
+    call(fn, *args) and the update is queued. Every tick the main thread
+    runs queued updates in order until `budget_ms` is used up and leaves
+    the rest for the next tick, so a burst from a large playlist is spread
+    over several frames instead of freezing the window. Ticks are only
+    ever scheduled by the main thread; while the queue stays empty they
+    back off to one every `idle_ms`, and return to `tick_ms` as soon as
+    a tick finds work. Queue depth and how long updates waited (drain
+    latency) are tracked in stats().
+    """
+    def __init__(self, root, tick_ms=DEFAULT_TICK_MS, budget_ms=DEFAULT_BUDGET_MS, idle_ms=IDLE_TICK_MS):
+        self.root = root
+        self.tick_ms = tick_ms
+        self.idle_ms = max(tick_ms, idle_ms)
+        self._interval = tick_ms
+        self.budget = budget_ms / 1000
+        self.main_thread = threading.get_ident()
+        self._queue = collections.deque()  # append and popleft are thread-safe
+
+        self.processed = 0
+        self.peak_depth = 0
+        self.last_latency = 0.0  # Seconds the last update waited in the queue
+        self.peak_latency = 0.0
+        self.over_budget_ticks = 0  # Ticks that left work for the next one
+        self._last_report = time.monotonic()
+        self._stopped = False
+
+        self.root.after(self.tick_ms, self._tick)
+
+    def call(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) to run on the main thread. Safe from any thread."""
+        self._queue.append((time.monotonic(), fn, args, kwargs))
+
+    def in_main_thread(self):
+        return threading.get_ident() == self.main_thread
+
+    @property
+    def depth(self):
+        return len(self._queue)
+
+    def _tick(self):
+        if self._stopped:
+            return
+        start = time.monotonic()
+        depth = len(self._queue)
+        self.peak_depth = max(self.peak_depth, depth)
+
+        while self._queue:
+            queued_at, fn, args, kwargs = self._queue.popleft()
+            now = time.monotonic()
+            self.last_latency = now - queued_at
+            self.peak_latency = max(self.peak_latency, self.last_latency)
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"UI update {getattr(fn, '__name__', fn)} failed: {str(e)}")
+            self.processed += 1
+            if time.monotonic() - start >= self.budget:
+                if self._queue:
+                    self.over_budget_ticks += 1
+                break
+
+        self._report(start)
+        # Back off while idle; the first update after a quiet spell waits at most idle_ms
+        self._interval = self.tick_ms if depth else min(self.idle_ms, self._interval * 2)
+        self.root.after(self._interval, self._tick)
+
+    def _report(self, now):
+        """Log queue health now and then, louder when updates lag"""
+        if now - self._last_report < STATS_LOG_INTERVAL:
+            return
+        self._last_report = now
+        stats = self.stats()
+        message = (f"UI queue: depth {stats['depth']} (peak {stats['peak_depth']}), "
+                   f"drain latency {stats['last_latency_ms']:.0f} ms (peak {stats['peak_latency_ms']:.0f} ms), "
+                   f"{stats['over_budget_ticks']} ticks over budget")
+        if stats['peak_latency_ms'] > SLOW_DRAIN_MS:
+            logger.warning(message)
+        else:
+            logger.debug(message)
+        self.peak_depth = len(self._queue)
+        self.peak_latency = 0.0
+
+    def stats(self):
+        """Queue depth and drain latency figures"""
+        return {
+            'depth': len(self._queue),
+            'peak_depth': self.peak_depth,
+            'processed': self.processed,
+            'last_latency_ms': self.last_latency * 1000,
+            'peak_latency_ms': self.peak_latency * 1000,
+            'over_budget_ticks': self.over_budget_ticks,
+        }
+
+    def stop(self):
+        self._stopped = True
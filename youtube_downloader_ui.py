@@ -1,78 +1,152 @@
-import yt_dlp
+import time
+
+# Start of the import; time to first paint is measured from here
+STARTUP_STARTED = time.perf_counter()
+
 import os
-import concurrent.futures
+import re
+import collections
 import logging
+import multiprocessing
 import sys
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
 import threading
-import time
 import datetime
 
 # Add this import to handle file timestamps
 import shutil
 import stat
 
-# Set up logging
+from download_engine import AUDIO_CODECS, DownloadEngine, DownloadJob, EngineListener
+from concurrency import AdaptiveConcurrencyController
+from download_archive import DownloadArchive
+from event_log import EventLog
+from job_journal import JobJournal
+from metadata_cache import MetadataCache
+from progress_store import ProgressStore, FINAL_STATUSES
+from scheduler import DownloadScheduler
+from ui_dispatcher import UIDispatcher
+from log_pipeline import sanitize, start_logging
+from metrics import DEFAULT_METRICS_PORT, DownloadMetrics, MetricsServer
+from profiling import Profiler
+from renditions import Rendition, parse_renditions
+from postprocess_pool import PostprocessPool
+
+# Lines kept in the log view; older ones scroll out
+LOG_VIEW_LINES = 2000
+
+# Status noise that is stripped before display
+_URL_HINT = re.compile(r'(?:Also see|See)\s+https?://[^\s]+')
+
+class LogView:
+    """Ring-buffered log lines in a Text widget.
+
+    Any thread may append. Lines are collected and drawn on the main
+    thread in one insert per batch, and the widget never holds more than
+    max_lines lines, so a chatty download can't grow it without bound.
+    """
+    def __init__(self, text_widget, dispatcher, max_lines=LOG_VIEW_LINES):
+        self.text_widget = text_widget
+        self.dispatcher = dispatcher
+        self.max_lines = max_lines
+        self.pending = collections.deque(maxlen=max_lines)
+        self.lines = 0  # Lines currently in the widget
+        self.placeholder = True  # The widget shows placeholder text
+        self._scheduled = False
+
+    def append(self, line):
+        self.pending.append(line)
+        if not self._scheduled:
+            self._scheduled = True
+            self.dispatcher.call(self._flush)
+
+    def _flush(self):
+        # Clear the flag first so lines appended while drawing get their own flush
+        self._scheduled = False
+        lines = []
+        while self.pending:
+            lines.append(self.pending.popleft())
+        if not lines:
+            return
+
+        self.text_widget.config(state=tk.NORMAL)
+        # Clear placeholder text if present
+        if self.placeholder:
+            self.text_widget.delete("1.0", tk.END)
+            self.lines = 0
+            self.placeholder = False
+        self.text_widget.insert(tk.END, "\n".join(lines) + "\n")
+        self.lines += len(lines)
+
+        # Drop the oldest lines beyond the limit
+        excess = self.lines - self.max_lines
+        if excess > 0:
+            self.text_widget.delete("1.0", f"{excess + 1}.0")
+            self.lines = self.max_lines
+        self.text_widget.see(tk.END)  # Scroll to show latest message
+        self.text_widget.config(state=tk.DISABLED)
+
+    def show_placeholder(self, text):
+        """Replace everything with placeholder text. Main thread only."""
+        self.pending.clear()
+        self.text_widget.config(state=tk.NORMAL)
+        self.text_widget.delete("1.0", tk.END)
+        self.text_widget.insert(tk.END, text)
+        self.text_widget.config(state=tk.DISABLED)
+        self.lines = 0
+        self.placeholder = True
+
 class TextHandler(logging.Handler):
-    def __init__(self, text_widget):
+    """Feeds log records into a LogView. Runs on the log listener thread."""
+    def __init__(self, log_view):
         logging.Handler.__init__(self)
-        self.text_widget = text_widget
+        self.log_view = log_view
         
     def emit(self, record):
         try:
-            msg = self.format(record)
-            
-            # Clean up ANSI color codes and other terminal escape sequences from the message
-            import re
-            cleaned_msg = re.sub(r'\x1b\[[0-9;]*m', '', msg)
-            
-            # Replace emoji characters that might cause display issues
-            cleaned_msg = cleaned_msg.replace("🔍", "[Search] ")
-            cleaned_msg = cleaned_msg.replace("⬇️", "[Download] ")
-            cleaned_msg = cleaned_msg.replace("✅", "[Success] ")
-            cleaned_msg = cleaned_msg.replace("❌", "[Error] ")
-            cleaned_msg = cleaned_msg.replace("⏱️", "[Time] ")
-            cleaned_msg = cleaned_msg.replace("📊", "[Stats] ")
-            cleaned_msg = cleaned_msg.replace("📁", "[File] ")
-            cleaned_msg = cleaned_msg.replace("📂", "[Folder] ")
-            cleaned_msg = cleaned_msg.replace("⚡", "[Speed] ")
-            
-            def append():
-                self.text_widget.config(state=tk.NORMAL)
-                # Clear placeholder text if present
-                if "Download logs will appear here..." in self.text_widget.get("1.0", tk.END).strip():
-                    self.text_widget.delete("1.0", tk.END)
-                # Add the log message
-                self.text_widget.insert(tk.END, cleaned_msg + '\n')
-                self.text_widget.see(tk.END)  # Scroll to show latest message
-                self.text_widget.config(state=tk.DISABLED)
-            
-            # Schedule to be run in the main thread
-            self.text_widget.after(0, append)
+            self.log_view.append(sanitize(self.format(record)))
         except Exception:
             # Catch any exceptions to prevent handler failures
             pass
 
 # Create logger
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 
 # Create formatter with shorter format
 formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
 
-# Create file handler with utf-8 encoding
-try:
-    file_handler = logging.FileHandler('youtube_downloader.log', encoding='utf-8')
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-except Exception:
-    # If file handler fails, continue without it
-    pass
+# Started by the first DownloaderApp rather than at import: spawned
+# post-processing workers import this module again and must not open a
+# second listener on the log file
+log_listener = None
+
+def start_app_logging():
+    """Start the log listener once per process and return it"""
+    global log_listener
+    if log_listener is None:
+        # Records are written to the file in batches by a background thread
+        log_listener = start_logging(formatter, 'youtube_downloader.log')
+    return log_listener
 
 # The console handler will be added after the UI is created
 
+# How often job progress is sampled and drawn (10 frames per second)
+PROGRESS_FRAME_MS = 100
+
+# Audio codec choice that keeps the source audio (stream copy)
+ORIGINAL_AUDIO = "original"
+
+# How often the metrics panel is redrawn
+STATS_REFRESH_MS = 1000
+
+# Local port of the Prometheus metrics endpoint
+METRICS_PORT = DEFAULT_METRICS_PORT
+
+# How often closing checks whether the background shutdown has finished
+CLOSE_POLL_MS = 100
+
 def check_ffmpeg():
     """Check if FFmpeg is installed and accessible"""
     try:
@@ -155,6 +229,49 @@ class RoundedButton(tk.Canvas):
     def on_release(self, event):
         self.draw_button(self.hover_bg)
 
+class AnimationClock:
+    """One ~60fps timer shared by every progress bar of a window.
+
+    Bars that are still moving register themselves; each tick advances only
+    those, and the timer stops as soon as none are left.
+    """
+    FRAME_MS = 16
+
+    def __init__(self, root):
+        self.root = root
+        self.active = set()
+        self.after_id = None
+
+    @classmethod
+    def for_widget(cls, widget):
+        """The clock of the widget's main window, created on first use"""
+        root = widget._root()
+        clock = getattr(root, '_animation_clock', None)
+        if clock is None:
+            clock = root._animation_clock = cls(root)
+        return clock
+
+    def animate(self, bar):
+        self.active.add(bar)
+        if self.after_id is None:
+            self.after_id = self.root.after(self.FRAME_MS, self._tick)
+
+    def stop(self, bar):
+        self.active.discard(bar)
+
+    def _tick(self):
+        self.after_id = None
+        for bar in list(self.active):
+            try:
+                moving = bar.step()
+            except tk.TclError:
+                # The bar was destroyed mid-animation
+                moving = False
+            if not moving:
+                self.active.discard(bar)
+        if self.active:
+            self.after_id = self.root.after(self.FRAME_MS, self._tick)
+
 class RoundedProgressBar(tk.Canvas):
     def __init__(self, parent, width=400, height=24, **kwargs):
         self.width = width
@@ -169,37 +286,40 @@ class RoundedProgressBar(tk.Canvas):
         
         super().__init__(parent, width=width, height=height, 
                          highlightthickness=0, **kwargs)
+        
+        # Both shapes are created once and only moved afterwards
+        self.bg_item = self.create_roundrect(0, 0, self.width, self.height, self.radius,
+                                             fill=self.bg_color, outline=self.border_color)
+        self.fg_item = self.create_roundrect(0, 0, 0, self.height, self.radius,
+                                             fill=self.fg_color, outline="", state="hidden")
+        self.bind("<Configure>", self._on_configure)
         self.draw_progress()
         
         # For smooth animation
-        self.after_id = None
+        self.clock = AnimationClock.for_widget(self)
+    
+    def _on_configure(self, event):
+        # Bars packed with fill=X are wider than requested
+        if event.width != self.width:
+            self.width = event.width
+            self.coords(self.bg_item, *self.roundrect_points(0, 0, self.width, self.height, self.radius))
+            self.draw_progress()
     
     def draw_progress(self):
-        self.delete("all")
-        # Draw background rounded rectangle
-        self.create_roundrect(0, 0, self.width, self.height, self.radius, 
-                             fill=self.bg_color, outline=self.border_color)
+        """Move the progress shape to the current progress"""
+        if self.progress <= 0:
+            self.itemconfig(self.fg_item, state="hidden")
+            return
         
-        if self.progress > 0:
-            # Calculate progress width
-            progress_width = (self.width * self.progress) / 100
-            
-            # Don't let progress exceed the width
-            progress_width = min(progress_width, self.width)
-            
-            # Draw progress rounded rectangle
-            if progress_width <= self.radius * 2:
-                # Special case for very small progress (draw partial circle)
-                self.create_roundrect(0, 0, progress_width, self.height, 
-                                     self.radius, fill=self.fg_color, outline="")
-            else:
-                # Draw normal rounded rectangle for progress
-                self.create_roundrect(0, 0, progress_width, self.height, 
-                                     self.radius, fill=self.fg_color, outline="")
+        # Calculate progress width, not exceeding the bar
+        progress_width = min((self.width * self.progress) / 100, self.width)
+        self.coords(self.fg_item, *self.roundrect_points(0, 0, progress_width, self.height, self.radius))
+        self.itemconfig(self.fg_item, state="normal")
     
-    def create_roundrect(self, x1, y1, x2, y2, radius, **kwargs):
-        # Draw rounded rectangle
-        points = [
+    @staticmethod
+    def roundrect_points(x1, y1, x2, y2, radius):
+        # Control points of a rounded rectangle drawn as a smoothed polygon
+        return [
             x1+radius, y1,
             x2-radius, y1,
             x2, y1,
@@ -213,28 +333,32 @@ class RoundedProgressBar(tk.Canvas):
             x1, y1+radius,
             x1, y1
         ]
+    
+    def create_roundrect(self, x1, y1, x2, y2, radius, **kwargs):
+        # Draw rounded rectangle
+        points = self.roundrect_points(x1, y1, x2, y2, radius)
         return self.create_polygon(points, smooth=True, **kwargs)
     
-    def set_progress(self, progress):
-        """Set target progress and start animation if not already animating"""
+    def set_progress(self, progress, animate=True):
+        """Set target progress and let the shared clock animate towards it"""
         self.target_progress = progress
         
-        # Cancel any existing animation
-        if self.after_id:
-            self.after_cancel(self.after_id)
-            self.after_id = None
+        if not animate:
+            self.clock.stop(self)
+            self.progress = progress
+            self.draw_progress()
+            return
         
-        # Start animation
-        self._animate_progress()
+        if self.progress != progress:
+            self.clock.animate(self)
     
-    def _animate_progress(self):
-        """Animate progress bar smoothly"""
+    def step(self):
+        """Advance one animation frame. Returns False once the target is reached."""
         if abs(self.progress - self.target_progress) < 0.5:
             # If close enough, just set to target
             self.progress = self.target_progress
             self.draw_progress()
-            self.after_id = None
-            return
+            return False
         
         # Move towards target
         diff = self.target_progress - self.progress
@@ -246,36 +370,35 @@ class RoundedProgressBar(tk.Canvas):
             
         self.progress += step
         self.draw_progress()
-        
-        # Continue animation
-        self.after_id = self.after(16, self._animate_progress)  # ~60fps
+        return True
 
-class VideoCard(ttk.Frame):
-    """A card representing a video in a playlist"""
-    def __init__(self, parent, video_info, index, **kwargs):
-        # Create a frame with custom styling for a card-like appearance
-        super().__init__(parent, **kwargs)
-        
-        self.video_info = video_info
+class VideoRow:
+    """Display data for one playlist entry.
+
+    Holds only the formatted strings a card shows and the entry's live
+    status, never the info dict, so thousands of rows stay cheap.
+    """
+    __slots__ = ('index', 'title', 'channel', 'upload_date', 'duration', 'filesize',
+                 'views', 'status', 'percent', 'message')
+
+    def __init__(self, video_info, index):
         self.index = index
-        self.download_status = "pending"  # pending, downloading, completed, error
-        
-        # Configure grid
-        self.columnconfigure(0, weight=1)  # Title and info
-        self.columnconfigure(1, weight=0)  # Status indicators
-        
+        self.status = "pending"  # pending, downloading, processing, completed, error
+        self.percent = 0.0
+        self.message = None  # Overrides the status text when set
+
         # Get video info
         self.title = video_info.get('title', f"Video {index+1}")
         self.duration = video_info.get('duration_string', '--')
         self.filesize = video_info.get('filesize_approx_str', '--')
-        
+
         # Get more detailed info if available
         self.channel = video_info.get('channel', video_info.get('uploader', '--'))
         self.upload_date = video_info.get('upload_date', '--')
         if self.upload_date and len(self.upload_date) == 8:
             year, month, day = self.upload_date[0:4], self.upload_date[4:6], self.upload_date[6:8]
             self.upload_date = f"{year}-{month}-{day}"
-        
+
         self.views = video_info.get('view_count', '--')
         if isinstance(self.views, int) and self.views > 1000:
             if self.views > 1000000:
@@ -284,6 +407,23 @@ class VideoCard(ttk.Frame):
                 self.views = f"{self.views/1000:.1f}K views"
         elif self.views != '--':
             self.views = f"{self.views} views"
+
+
+class VideoCard(ttk.Frame):
+    """A card showing one playlist entry.
+
+    Cards are recycled by PlaylistView: the widgets are built once and
+    bind_row() points them at whichever VideoRow scrolled into view.
+    """
+    def __init__(self, parent, **kwargs):
+        # Create a frame with custom styling for a card-like appearance
+        super().__init__(parent, **kwargs)
+        
+        self.row = None
+        
+        # Configure grid
+        self.columnconfigure(0, weight=1)  # Title and info
+        self.columnconfigure(1, weight=0)  # Status indicators
         
         # Create a custom card container with rounded corners and shadow effect
         # First, create a canvas for the shadow effect
@@ -299,21 +439,16 @@ class VideoCard(ttk.Frame):
         title_frame.pack(fill=tk.X, pady=(0, 5))
         
         # Index number in a circular badge
-        index_badge = tk.Canvas(title_frame, width=24, height=24, bg="white", highlightthickness=0)
-        index_badge.create_oval(2, 2, 22, 22, fill="#FF0000", outline="")
-        index_badge.create_text(12, 12, text=f"{index+1}", fill="white", font=("Inter", 10, "bold"))
-        index_badge.pack(side=tk.LEFT, padx=(0, 8))
-        
-        # Title (truncated if too long)
-        display_title = self.title
-        if len(display_title) > 50:
-            display_title = display_title[:47] + "..."
+        self.index_badge = tk.Canvas(title_frame, width=24, height=24, bg="white", highlightthickness=0)
+        self.index_badge.create_oval(2, 2, 22, 22, fill="#FF0000", outline="")
+        self.index_text = self.index_badge.create_text(12, 12, text="", fill="white", font=("Inter", 10, "bold"))
+        self.index_badge.pack(side=tk.LEFT, padx=(0, 8))
         
-        self.title_label = tk.Label(title_frame, text=display_title, 
+        # Title is truncated and never wraps, so every card has the same height
+        self.title_label = tk.Label(title_frame, text="", 
                                   font=("Inter", 11, "bold"), 
                                   anchor="w", justify="left",
-                                  bg="white", fg="#333333",
-                                  wraplength=350)
+                                  bg="white", fg="#333333")
         self.title_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
         # Info panel with cleaner layout
@@ -324,31 +459,27 @@ class VideoCard(ttk.Frame):
         channel_frame = tk.Frame(info_panel, bg="white")
         channel_frame.pack(fill=tk.X, pady=(0, 5))
         
-        channel_label = tk.Label(channel_frame, text=f"👤 {self.channel}", 
+        self.channel_label = tk.Label(channel_frame, text="", 
                                font=("Inter", 9), bg="white")
-        channel_label.pack(side=tk.LEFT, padx=(5, 10))
+        self.channel_label.pack(side=tk.LEFT, padx=(5, 10))
         
-        if self.upload_date != '--':
-            date_label = tk.Label(channel_frame, text=f"📅 {self.upload_date}", 
-                                font=("Inter", 9), bg="white")
-            date_label.pack(side=tk.LEFT)
+        self.date_label = tk.Label(channel_frame, text="", 
+                            font=("Inter", 9), bg="white")
         
         # Second row with duration, size, views
         stats_frame = tk.Frame(info_panel, bg="white")
         stats_frame.pack(fill=tk.X)
         
-        duration_label = tk.Label(stats_frame, text=f"⏱️ {self.duration}", 
+        self.duration_label = tk.Label(stats_frame, text="", 
                                 font=("Inter", 9), bg="white")
-        duration_label.pack(side=tk.LEFT, padx=(5, 10))
+        self.duration_label.pack(side=tk.LEFT, padx=(5, 10))
         
-        size_label = tk.Label(stats_frame, text=f"📊 {self.filesize}", 
+        self.size_label = tk.Label(stats_frame, text="", 
                            font=("Inter", 9), bg="white")
-        size_label.pack(side=tk.LEFT, padx=(0, 10))
+        self.size_label.pack(side=tk.LEFT, padx=(0, 10))
         
-        if self.views != '--':
-            views_label = tk.Label(stats_frame, text=f"👁️ {self.views}", 
-                                font=("Inter", 9), bg="white")
-            views_label.pack(side=tk.LEFT)
+        self.views_label = tk.Label(stats_frame, text="", 
+                            font=("Inter", 9), bg="white")
         
         # Status section on the right
         status_frame = tk.Frame(card_content, bg="white")
@@ -372,29 +503,78 @@ class VideoCard(ttk.Frame):
             border_color="#e1e1e1"
         )
         self.progress_bar.pack(fill=tk.X, expand=True)
+
+    def bind_row(self, row):
+        """Show a different row in this card"""
+        self.row = row
+        self.index_badge.itemconfig(self.index_text, text=f"{row.index+1}")
+        
+        # Title (truncated if too long)
+        display_title = row.title
+        if len(display_title) > 50:
+            display_title = display_title[:47] + "..."
+        self.title_label.config(text=display_title)
+        
+        self.channel_label.config(text=f"👤 {row.channel}")
+        if row.upload_date != '--':
+            self.date_label.config(text=f"📅 {row.upload_date}")
+            self.date_label.pack(side=tk.LEFT)
+        else:
+            self.date_label.pack_forget()
+        
+        self.duration_label.config(text=f"⏱️ {row.duration}")
+        self.size_label.config(text=f"📊 {row.filesize}")
+        if row.views != '--':
+            self.views_label.config(text=f"👁️ {row.views}")
+            self.views_label.pack(side=tk.LEFT)
+        else:
+            self.views_label.pack_forget()
+        
+        # A recycled card jumps straight to the row's progress
+        self.progress_bar.set_progress(row.percent, animate=False)
+        self.show_status()
     
-    def update_progress(self, percent, status=None):
-        """Update the progress bar and status"""
+    def update_progress(self, percent):
+        """Update the progress bar and the bound row's status"""
         self.progress_bar.set_progress(percent)
+        self.show_status()
+
+    def show_status(self):
+        """Show the bound row's status, or its message if it has one"""
+        row = self.row
+        status = row.status
+        
+        if status == "downloading":
+            self.status_var.set(f"⬇️ {int(row.percent)}%")
+            self.status_label.config(fg="#4CAF50")  # Green for active download
+        elif status == "processing":
+            self.status_var.set("⚙️ Processing")
+            self.status_label.config(fg="#2196F3")  # Blue while FFmpeg works
+        elif status == "completed":
+            self.status_var.set("✅ Completed")
+            self.status_label.config(fg="#4CAF50")  # Green for success
+        elif status == "error":
+            self.status_var.set("❌ Failed")
+            self.status_label.config(fg="#FF0000")  # Red for error
+        else:
+            self.status_var.set("⏳ Pending")
+            self.status_label.config(fg="#FF9800")  # Orange for pending
         
-        if status:
-            self.download_status = status
-            
-            if status == "downloading":
-                self.status_var.set(f"⬇️ {int(percent)}%")
-                self.status_label.config(fg="#4CAF50")  # Green for active download
-            elif status == "completed":
-                self.status_var.set("✅ Completed")
-                self.status_label.config(fg="#4CAF50")  # Green for success
-            elif status == "error":
-                self.status_var.set("❌ Failed")
-                self.status_label.config(fg="#FF0000")  # Red for error
-            else:
-                self.status_var.set("⏳ Pending")
-                self.status_label.config(fg="#FF9800")  # Orange for pending
+        if row.message:
+            self.status_var.set(row.message)
 
 class PlaylistView(ttk.Frame):
-    """A scrollable frame that displays all videos in a playlist"""
+    """A scrollable list of all videos in a playlist.
+
+    The list is virtualized: every entry is a lightweight VideoRow, and only
+    enough VideoCards to fill the visible area (plus a few above and below)
+    exist. Scrolling rebinds those cards to the rows that came into view, so
+    a 5,000 video playlist builds as fast and uses as many widgets as a
+    short one.
+    """
+    # Extra cards kept above and below the visible area for smooth scrolling
+    OVERSCAN = 2
+
     def __init__(self, parent, **kwargs):
         super().__init__(parent, **kwargs)
         
@@ -407,65 +587,133 @@ class PlaylistView(ttk.Frame):
         self.canvas.grid(row=0, column=0, sticky="nsew")
         
         # Add scrollbar
-        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._yview)
         self.scrollbar.grid(row=0, column=1, sticky="ns")
         self.canvas.configure(yscrollcommand=self.scrollbar.set)
         
-        # Create frame inside canvas for video cards
-        self.video_frame = ttk.Frame(self.canvas)
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.video_frame, anchor="nw")
-        
-        # Configure video frame
-        self.video_frame.columnconfigure(0, weight=1)
-        
         # Bind events for scrolling
-        self.video_frame.bind("<Configure>", self._on_frame_configure)
         self.canvas.bind("<Configure>", self._on_canvas_configure)
         
-        # Store video cards
-        self.video_cards = []
+        self.rows = []  # One VideoRow per playlist entry
+        self.cards = []  # Recycled card pool; row i is shown by cards[i % len(cards)]
+        self.card_windows = []
+        self.row_height = None  # Measured from the first card
+        self._refresh_pending = False
         
         # Empty state label
-        self.empty_label = ttk.Label(self.video_frame, text="No videos in playlist", font=("Inter", 12))
-        self.empty_label.grid(row=0, column=0, padx=20, pady=20)
-    
-    def _on_frame_configure(self, event):
-        """Update the canvas scroll region when the frame changes size"""
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-    
+        self.empty_label = ttk.Label(self.canvas, text="No videos in playlist", font=("Inter", 12))
+        self.empty_window = self.canvas.create_window(20, 20, window=self.empty_label, anchor="nw")
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._refresh()
+
     def _on_canvas_configure(self, event):
-        """Update the width of the frame inside the canvas when canvas changes size"""
-        self.canvas.itemconfig(self.canvas_window, width=event.width)
+        """Resize the cards with the canvas and fill any newly visible space"""
+        for window in self.card_windows:
+            self.canvas.itemconfig(window, width=event.width)
+        self._refresh()
+
+    def _schedule_refresh(self):
+        # Many rows are added in a burst; lay them out once
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._refresh)
+
+    def _new_card(self):
+        card = VideoCard(self.canvas, style="Card.TFrame")
+        window = self.canvas.create_window(0, 0, window=card, anchor="nw",
+                                           width=self.canvas.winfo_width(), state="hidden")
+        self.cards.append(card)
+        self.card_windows.append(window)
+        if self.row_height is None:
+            card.bind_row(self.rows[0])
+            card.update_idletasks()
+            self.row_height = max(1, card.winfo_reqheight())
+        return card
+
+    def _refresh(self):
+        """Bind the card pool to the rows in and around the visible area"""
+        self._refresh_pending = False
+        if not self.rows:
+            for window in self.card_windows:
+                self.canvas.itemconfig(window, state="hidden")
+            self.canvas.itemconfig(self.empty_window, state="normal")
+            self.canvas.configure(scrollregion=(0, 0, 0, 0))
+            return
+        self.canvas.itemconfig(self.empty_window, state="hidden")
+        
+        if not self.cards:
+            self._new_card()
+        height = self.row_height
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), len(self.rows) * height))
+        
+        # Enough cards to cover the viewport, plus the overscan on both sides
+        viewport = max(self.canvas.winfo_height(), height)
+        needed = min(len(self.rows), viewport // height + 2 + 2 * self.OVERSCAN)
+        if needed > len(self.cards):
+            for _ in range(needed - len(self.cards)):
+                self._new_card()
+            # The pool size changed, so every slot moves
+            for card in self.cards:
+                card.row = None
+        
+        top = int(self.canvas.canvasy(0)) // height
+        first = max(0, top - self.OVERSCAN)
+        last = min(len(self.rows), first + len(self.cards))
+        shown = set()
+        for index in range(first, last):
+            slot = index % len(self.cards)
+            shown.add(slot)
+            card = self.cards[slot]
+            if card.row is not self.rows[index]:
+                card.bind_row(self.rows[index])
+                self.canvas.coords(self.card_windows[slot], 0, index * height)
+            self.canvas.itemconfig(self.card_windows[slot], state="normal")
+        for slot, window in enumerate(self.card_windows):
+            if slot not in shown:
+                self.canvas.itemconfig(window, state="hidden")
     
     def clear(self):
-        """Clear all video cards"""
-        for widget in self.video_frame.winfo_children():
-            widget.destroy()
-        
-        self.video_cards = []
-        
-        # Show empty state
-        self.empty_label = ttk.Label(self.video_frame, text="No videos in playlist", font=("Inter", 12))
-        self.empty_label.grid(row=0, column=0, padx=20, pady=20)
+        """Clear all video rows"""
+        self.rows = []
+        for card in self.cards:
+            card.row = None
+        self.canvas.yview_moveto(0)
+        self._refresh()
     
     def add_video(self, video_info, index):
-        """Add a video card to the playlist view"""
-        # Remove empty label if this is the first video
+        """Add a video row to the playlist view"""
         if index == 0:
-            for widget in self.video_frame.winfo_children():
-                widget.destroy()
-        
-        # Create video card
-        card = VideoCard(self.video_frame, video_info, index, style="Card.TFrame")
-        card.grid(row=index, column=0, sticky="ew", padx=5, pady=5)
-        
-        self.video_cards.append(card)
-        return card
+            # A new listing starts over
+            self.rows = []
+            for card in self.cards:
+                card.row = None
+        self.rows.append(VideoRow(video_info, index))
+        self._schedule_refresh()
+
+    def _visible_card(self, index):
+        """The card showing row index, or None if it is scrolled out of view"""
+        if not self.cards:
+            return None
+        card = self.cards[index % len(self.cards)]
+        return card if card.row is self.rows[index] else None
     
-    def update_video_progress(self, index, percent, status=None):
+    def update_video_progress(self, index, percent, status=None, message=None):
         """Update the progress of a specific video"""
-        if 0 <= index < len(self.video_cards):
-            self.video_cards[index].update_progress(percent, status)
+        if not 0 <= index < len(self.rows):
+            return
+        row = self.rows[index]
+        row.percent = percent
+        if status:
+            row.status = status
+        row.message = message
+        card = self._visible_card(index)
+        if card:
+            card.update_progress(percent)
 
 class DescriptionPanel(ttk.Frame):
     """A panel to display video metadata details"""
@@ -583,13 +831,132 @@ class DescriptionPanel(ttk.Frame):
                 description = description[:297] + "..."
             self.description_text.insert(tk.END, f"\nDescription: {description}\n")
 
+def format_seconds(seconds):
+    """Short latency text: 850ms, 12.3s"""
+    if seconds is None:
+        return "--"
+    if seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    return f"{seconds:.1f}s"
+
+class StatsPanel(ttk.Frame):
+    """Live download metrics: throughput, slots and per-stage latency.
+
+    Reads a DownloadMetrics on the main thread every STATS_REFRESH_MS;
+    throughput is the byte counter's growth since the previous refresh.
+    """
+    # (label, stage histogram) pairs shown as p50/p95
+    STAGES = (("Extract", "extract"), ("TTFB", "ttfb"), ("Transfer", "transfer"),
+              ("Post-process", "postprocess"))
+
+    def __init__(self, parent, metrics=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.metrics = metrics
+        self._last_bytes = None
+        self._last_time = None
+
+        self.throughput_var = tk.StringVar(value="Throughput: --")
+        self.slots_var = tk.StringVar(value="Active: -- | Queued: --")
+        self.jobs_var = tk.StringVar(value="Done: -- | Failed: --")
+        self.latency_var = tk.StringVar(value="")
+
+        self.columnconfigure(0, weight=1)
+        self.columnconfigure(1, weight=1)
+        self.columnconfigure(2, weight=1)
+        ttk.Label(self, textvariable=self.throughput_var, anchor="w").grid(row=0, column=0, sticky="w")
+        ttk.Label(self, textvariable=self.slots_var, anchor="center").grid(row=0, column=1, sticky="ew", padx=10)
+        ttk.Label(self, textvariable=self.jobs_var, anchor="e").grid(row=0, column=2, sticky="e")
+        ttk.Label(self, textvariable=self.latency_var, anchor="w",
+                  font=("Segoe UI", 8)).grid(row=1, column=0, columnspan=3, sticky="w", pady=(4, 0))
+
+    def refresh(self):
+        metrics = self.metrics
+        if metrics is None:
+            return
+        now = time.monotonic()
+        downloaded = metrics.bytes.total()
+        if self._last_time is not None and now > self._last_time:
+            rate = (downloaded - self._last_bytes) / (now - self._last_time)
+            self.throughput_var.set(f"Throughput: {rate / 1048576:.2f} MiB/s")
+        self._last_bytes, self._last_time = downloaded, now
+
+        if metrics.active is not None:
+            self.slots_var.set(f"Active: {metrics.active.value()} | Queued: {metrics.queued.value()}")
+        self.jobs_var.set(f"Done: {metrics.jobs.value(result='success')} | "
+                          f"Failed: {metrics.jobs.value(result='failed')}")
+
+        parts = []
+        for label, stage in self.STAGES:
+            p50 = metrics.stage_seconds.quantile(0.5, stage=stage)
+            p95 = metrics.stage_seconds.quantile(0.95, stage=stage)
+            parts.append(f"{label} {format_seconds(p50)}/{format_seconds(p95)}")
+        retries = metrics.retries.total()
+        parts.append(f"Retries {retries}")
+        self.latency_var.set("p50/p95  " + "  •  ".join(parts))
+
+    def reset(self):
+        """Forget the throughput baseline; totals stay, they are cumulative"""
+        self.throughput_var.set("Throughput: --")
+        self._last_bytes = self._last_time = None
+
+class AppEngineListener(EngineListener):
+    """Forwards download engine events to the DownloaderApp widgets"""
+    def __init__(self, app):
+        self.app = app
+
+    def status(self, message):
+        self.app.update_status(message)
+
+    # Everything below touching widgets is queued onto the main thread
+
+    def job_progress(self, job, d):
+        # Called per chunk; only record it, the UI samples the store per frame
+        if d['status'] == 'downloading':
+            self.app.progress_store.update_from_hook(job, d)
+        elif d['status'] == 'finished' and job.index is None:
+            self.app.on_single_finished(d)
+
+    def job_state(self, job, message=None):
+        if job.index is None and job.status not in FINAL_STATUSES:
+            return
+        self.app.progress_store.update_state(job, message)
+
+    def job_finished(self, result):
+        # Archived videos were skipped and are already in the history
+        if result.success and not result.skipped:
+            self.app.ui.call(self.app.add_to_history, result)
+
+    def playlist_progress(self, completed, failed, total):
+        self.app.progress_store.update_overall(completed, failed, total)
+
+    def playlist_found(self, playlist_info, entries):
+        self.app.ui.call(self._show_playlist, playlist_info, entries)
+
+    def _show_playlist(self, playlist_info, entries):
+        # Update playlist info text and clear existing video cards
+        playlist_title = playlist_info.get('title', 'Unknown Playlist')
+        # A streamed listing may not know its size until the last page arrives
+        count = len(entries) if entries is not None else playlist_info.get('playlist_count')
+        if count is not None:
+            self.app.playlist_info_var.set(f"{count} videos • {playlist_title}")
+        else:
+            self.app.playlist_info_var.set(f"Loading videos • {playlist_title}")
+        self.app.playlist_view.clear()
+
+    def playlist_video(self, info, index):
+        self.app.ui.call(self.app.add_playlist_video, info, index)
+
 class DownloaderApp:
     def __init__(self, root):
         self.root = root
+        start_app_logging()
         self.root.title("YouTube Downloader")
         self.root.geometry("700x1000")  # Increased height for better playlist display
         self.root.resizable(True, True)
         self.root.configure(bg="white")
+
+        # Every widget update from a worker thread goes through this queue
+        self.ui = UIDispatcher(root)
         
         # Enable font antialiasing
         try:
@@ -700,6 +1067,7 @@ class DownloaderApp:
         # Content frame
         content_frame = ttk.Frame(self.card_frame, style="Card.TFrame")
         content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        self.content_frame = content_frame  # Parent of the panels built on first use
         
         # URL input with search button
         url_label = ttk.Label(content_frame, text="YouTube URL", font=("Inter", 11))
@@ -832,6 +1200,12 @@ class DownloaderApp:
         audio_radio = ttk.Radiobutton(radio_frame, text="Audio Only", variable=self.format_var, value="audio")
         audio_radio.pack(side=tk.LEFT, padx=(0, 5), pady=10)
 
+        # Audio is kept in the codec the site serves unless a codec is picked here
+        self.audio_codec_var = tk.StringVar(value=ORIGINAL_AUDIO)
+        audio_codec_box = ttk.Combobox(radio_frame, textvariable=self.audio_codec_var, width=9,
+                                       state="readonly", values=(ORIGINAL_AUDIO,) + AUDIO_CODECS)
+        audio_codec_box.pack(side=tk.LEFT, padx=(0, 5), pady=10)
+
         # Store format buttons for reference
         self.format_buttons = {"video": video_radio, "audio": audio_radio}
         
@@ -845,6 +1219,24 @@ class DownloaderApp:
         self.subtitle_var = tk.BooleanVar(value=False)
         subtitle_check = ttk.Checkbutton(subtitle_frame, variable=self.subtitle_var)
         subtitle_check.pack(side=tk.RIGHT)
+
+        # Extra renditions, made from the same download: e.g. "mp3, 480p"
+        renditions_frame = ttk.Frame(content_frame, style="Card.TFrame")
+        renditions_frame.pack(fill=tk.X, pady=(0, 15))
+
+        renditions_label = ttk.Label(renditions_frame, text="Also Save As")
+        renditions_label.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.renditions_entry = tk.Entry(renditions_frame,
+                                         font=self.normal_font,
+                                         bg="white",
+                                         fg=self.text_color,
+                                         relief=tk.FLAT,
+                                         bd=1,
+                                         highlightthickness=1,
+                                         highlightbackground=self.border_color,
+                                         highlightcolor=self.accent_color)
+        self.renditions_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
         # Playlist option
         playlist_frame = ttk.Frame(content_frame, style="Card.TFrame")
@@ -877,25 +1269,17 @@ class DownloaderApp:
         stats_frame = ttk.Frame(content_frame, style="Card.TFrame")
         stats_frame.pack(fill=tk.X, pady=(0, 15))
         
-        # Create a structured grid for stats to ensure proper spacing
-        stats_frame.columnconfigure(0, weight=1)  # ETA
-        stats_frame.columnconfigure(1, weight=1)  # Speed
-        stats_frame.columnconfigure(2, weight=1)  # Percentage
-
-        # Left side - ETA
-        self.eta_var = tk.StringVar(value="ETA: --")
-        eta_label = ttk.Label(stats_frame, textvariable=self.eta_var, anchor="w")
-        eta_label.grid(row=0, column=0, sticky="w", padx=(0, 10))
+        # Live metrics on the left, the current download's percentage on the right
+        stats_frame.columnconfigure(0, weight=1)  # Metrics
+        stats_frame.columnconfigure(1, weight=0)  # Percentage
 
-        # Center - Speed
-        self.speed_var = tk.StringVar(value="Speed: --")
-        speed_label = ttk.Label(stats_frame, textvariable=self.speed_var, anchor="center")
-        speed_label.grid(row=0, column=1, sticky="ew", padx=10)
+        self.stats_panel = StatsPanel(stats_frame, style="Card.TFrame")
+        self.stats_panel.grid(row=0, column=0, sticky="ew")
 
-        # Right side - Percentage
         self.percent_var = tk.StringVar(value="0%")
-        percent_label = ttk.Label(stats_frame, textvariable=self.percent_var, anchor="e")
-        percent_label.grid(row=0, column=2, sticky="e", padx=(10, 0))
+        percent_label = ttk.Label(stats_frame, textvariable=self.percent_var, anchor="e",
+                                  font=("Segoe UI", 12, "bold"))
+        percent_label.grid(row=0, column=1, sticky="e", padx=(10, 0))
 
         # Configure row weight to center vertically
         stats_frame.rowconfigure(0, weight=1)
@@ -952,6 +1336,7 @@ class DownloaderApp:
         # Create a frame for the log area with proper styling
         log_frame = ttk.Frame(content_frame, style="Card.TFrame", relief="solid", borderwidth=1)
         log_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        self.log_frame = log_frame
         
         # Create text widget for logs with improved styling - increase height for better visibility
         self.log_text = tk.Text(log_frame,
@@ -989,29 +1374,21 @@ class DownloaderApp:
         self.download_count = 0
         
         # Create console handler after UI is initialized
-        console_handler = TextHandler(self.log_text)
+        self.log_view = LogView(self.log_text, self.ui)
+        console_handler = TextHandler(self.log_view)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-        
-        # After the log and before the buttons frame
-        # Playlist view (hidden by default)
-        self.playlist_view_frame = ttk.Frame(content_frame, style="Card.TFrame")
-        self.playlist_view_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 10))
-        self.playlist_view_frame.pack_forget()  # Hide initially
-        
-        playlist_title_frame = ttk.Frame(self.playlist_view_frame)
-        playlist_title_frame.pack(fill=tk.X, padx=5, pady=5)
-        
-        playlist_label = ttk.Label(playlist_title_frame, text="Playlist Videos", font=("Inter", 12, "bold"))
-        playlist_label.pack(side=tk.LEFT)
+        start_app_logging().add_handler(console_handler)
         
+        # Playlist view, history and description panels are rarely needed
+        # right away; they are built on first use (see playlist_view,
+        # history_frame and description_panel) so the window shows sooner
         self.playlist_info_var = tk.StringVar(value="")
-        playlist_info = ttk.Label(playlist_title_frame, textvariable=self.playlist_info_var, font=("Inter", 10))
-        playlist_info.pack(side=tk.RIGHT)
-        
-        self.playlist_view = PlaylistView(self.playlist_view_frame)
-        self.playlist_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
+        self._playlist_view = None
+        self.playlist_view_frame = None
+        self._history_frame = None
+        self._description_panel = None
+        self.download_history = []
+
         # Store playlist info
         self.current_playlist_info = None
         self.current_playlist_videos = []
@@ -1020,23 +1397,196 @@ class DownloaderApp:
         # Update playlist switch to toggle view
         self.playlist_var.trace_add("write", lambda *args: self.playlist_toggle())
         
-        # Add this near other initialization variables
-        self.progress_lock = threading.Lock()  # Lock for updating progress safely
-        self.download_pool = None  # Thread pool for parallel downloads
-        
-        # Add download history section
-        history_label = ttk.Label(content_frame, text="Recent Downloads")
-        history_label.pack(anchor=tk.W, pady=(15, 5))
-        
-        self.download_history_frame = ttk.Frame(content_frame, style="Card.TFrame", relief="solid", borderwidth=1)
-        self.download_history_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        # Initialize download history list
-        self.download_history = []
-        
-        # Show initial empty state
-        empty_label = ttk.Label(self.download_history_frame, text="No recent downloads", font=self.normal_font)
-        empty_label.pack(pady=10)
+        # Headless engine that does the actual downloading; every engine
+        # shares one scheduler so overlapping downloads stay bounded
+        self.engine = None
+        self.progress_store = ProgressStore()
+        self.scheduler = DownloadScheduler()
+        self.concurrency = AdaptiveConcurrencyController(self.scheduler)
+        try:
+            self.metadata_cache = MetadataCache()
+        except Exception as e:
+            # If the cache can't be opened, continue without it
+            logger.warning(f"Metadata cache disabled: {str(e)}")
+            self.metadata_cache = None
+        try:
+            self.journal = JobJournal()
+        except Exception as e:
+            # Without the journal, playlists simply can't be resumed
+            logger.warning(f"Job journal disabled: {str(e)}")
+            self.journal = None
+        try:
+            self.archive = DownloadArchive()
+        except Exception as e:
+            # Without the archive, videos are downloaded again every time
+            logger.warning(f"Download archive disabled: {str(e)}")
+            self.archive = None
+        try:
+            self.event_log = EventLog()
+        except Exception as e:
+            logger.warning(f"Event log disabled: {str(e)}")
+            self.event_log = None
+        self.metrics = DownloadMetrics()
+        self.metrics.bind_scheduler(self.scheduler, self.concurrency)
+        self.stats_panel.metrics = self.metrics
+        try:
+            self.metrics_server = MetricsServer(self.metrics.registry, METRICS_PORT).start()
+        except Exception as e:
+            # Most likely another instance already serves the port
+            logger.warning(f"Metrics endpoint disabled: {str(e)}")
+            self.metrics_server = None
+        # Off until ~/.cache/youtube_downloader/profile.json asks for a profile
+        self.profiler = Profiler()
+        try:
+            # Merging and FFmpeg work run in worker processes, sized to the CPU count
+            self.postprocess_pool = PostprocessPool()
+        except Exception as e:
+            logger.warning(f"Post-processing pool disabled: {str(e)}")
+            self.postprocess_pool = None
+
+        # Closing stops downloads and the worker processes before the window goes
+        self._closing = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Offer to finish playlist runs interrupted by a crash or close
+        self.root.after(500, self.offer_resume)
+
+        # yt_dlp and FFmpeg are loaded once the window is on screen
+        self.ffmpeg_available = None  # Unknown until the warm-up probed it
+        self.first_paint_ms = None
+        self.warmed_up = threading.Event()
+        self._map_binding = self.root.bind("<Map>", self.on_map, add="+")
+
+        # Progress is drawn at a fixed frame rate, however fast hooks fire
+        self.root.after(PROGRESS_FRAME_MS, self.sample_progress)
+        self.root.after(STATS_REFRESH_MS, self.refresh_stats)
+
+    def on_close(self):
+        """Cancel downloads, shut everything down, then destroy the window. Main thread only."""
+        if self._closing is not None:
+            return
+        if self.engine is not None:
+            self.engine.cancel()
+        # Hide the window now; queued UI updates keep draining until shutdown is done
+        self.root.withdraw()
+        self._closing = threading.Thread(target=self.shutdown, name="shutdown")
+        self._closing.start()
+        self.root.after(CLOSE_POLL_MS, self.finish_close)
+
+    def finish_close(self):
+        if self._closing.is_alive():
+            self.root.after(CLOSE_POLL_MS, self.finish_close)
+            return
+        self.ui.stop()
+        self.root.destroy()
+
+    def shutdown(self):
+        """Drain downloads and stop worker processes. Runs in a worker thread."""
+        try:
+            # Queued jobs are dropped; running ones stop at their next progress
+            # callback, and a post-processing job already in FFmpeg finishes
+            self.scheduler.shutdown(wait=True)
+            if self.download_thread is not None:
+                self.download_thread.join()
+            if self.postprocess_pool is not None:
+                self.postprocess_pool.shutdown(wait=True)
+        except Exception as e:
+            logger.error(f"Error while shutting down: {str(e)}")
+        if self.metrics_server is not None:
+            # Frees the metrics port for the next start
+            self.metrics_server.stop()
+        self.close_stores()
+
+    def close_stores(self):
+        """Flush the event log and close the SQLite stores, once nothing writes to them"""
+        for name in ('event_log', 'metadata_cache', 'journal', 'archive'):
+            store = getattr(self, name)
+            if store is None:
+                continue
+            try:
+                store.close()
+            except Exception as e:
+                logger.warning(f"Could not close {name}: {str(e)}")
+
+    def on_map(self, event):
+        """Start the deferred startup work once the window is mapped"""
+        if event.widget is not self.root:
+            return
+        self.root.unbind("<Map>", self._map_binding)
+        # Idle callbacks queued after the map run once the window is drawn
+        self.root.after_idle(self.after_first_paint)
+
+    def after_first_paint(self):
+        """Record time to first paint and load what startup skipped"""
+        if self.first_paint_ms is not None:
+            return
+        self.first_paint_ms = (time.perf_counter() - STARTUP_STARTED) * 1000
+        logger.info(f"Window shown {self.first_paint_ms:.0f} ms after start")
+        threading.Thread(target=self.warm_up, name="warm-up", daemon=True).start()
+
+        # Continue the history from earlier sessions
+        self.load_archived_history()
+
+    def warm_up(self):
+        """Import yt_dlp and probe FFmpeg in the background. Runs in a worker thread."""
+        started = time.perf_counter()
+        try:
+            import deferred_ydl  # Imports yt_dlp and its extractors
+        except Exception as e:
+            logger.error(f"Could not load yt-dlp: {str(e)}")
+        self.ffmpeg_available = check_ffmpeg()
+        logger.info(f"Loaded yt-dlp and probed FFmpeg in {(time.perf_counter() - started) * 1000:.0f} ms")
+        self.warmed_up.set()
+
+    @property
+    def playlist_view(self):
+        """The playlist view, built on first use. Main thread only."""
+        if self._playlist_view is None:
+            self._build_playlist_view()
+        return self._playlist_view
+
+    def _build_playlist_view(self):
+        """Create the (hidden) playlist panel"""
+        self.playlist_view_frame = ttk.Frame(self.content_frame, style="Card.TFrame")
+
+        playlist_title_frame = ttk.Frame(self.playlist_view_frame)
+        playlist_title_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        playlist_label = ttk.Label(playlist_title_frame, text="Playlist Videos", font=("Inter", 12, "bold"))
+        playlist_label.pack(side=tk.LEFT)
+
+        playlist_info = ttk.Label(playlist_title_frame, textvariable=self.playlist_info_var, font=("Inter", 10))
+        playlist_info.pack(side=tk.RIGHT)
+
+        self._playlist_view = PlaylistView(self.playlist_view_frame)
+        self._playlist_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def show_playlist_panel(self):
+        if self._playlist_view is None:
+            self._build_playlist_view()
+        self.playlist_view_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 10))
+
+    def add_playlist_video(self, info, index):
+        self.playlist_view.add_video(info, index)
+
+    @property
+    def history_frame(self):
+        """The Recent Downloads panel below the log, built on first use. Main thread only."""
+        if self._history_frame is None:
+            history_label = ttk.Label(self.content_frame, text="Recent Downloads")
+            history_label.pack(anchor=tk.W, pady=(15, 5), after=self.log_frame)
+
+            self._history_frame = ttk.Frame(self.content_frame, style="Card.TFrame", relief="solid", borderwidth=1)
+            self._history_frame.pack(fill=tk.X, pady=(0, 15), after=history_label)
+        return self._history_frame
+
+    @property
+    def description_panel(self):
+        """The video description panel, built on the first search. Main thread only."""
+        if self._description_panel is None:
+            self._description_panel = DescriptionPanel(self.content_frame)
+            self._description_panel.pack(fill=tk.X, pady=(0, 10))
+        return self._description_panel
     
     def create_roundrect(self, canvas, x1, y1, x2, y2, radius, **kwargs):
         points = [x1+radius, y1,
@@ -1053,6 +1603,24 @@ class DownloaderApp:
                  x1, y1]
         return canvas.create_polygon(points, smooth=True, **kwargs)
     
+    def selected_audio_codec(self):
+        """The codec to re-encode audio to, or None to keep the source audio"""
+        codec = self.audio_codec_var.get()
+        return None if codec == ORIGINAL_AUDIO else codec
+
+    def selected_renditions(self, quality, format_type, audio_codec):
+        """The selected format plus the "Also Save As" list, or None for a single output.
+        Raises ValueError for an entry it does not understand."""
+        extra = self.renditions_entry.get().strip()
+        if not extra:
+            return None
+        main = Rendition("video", quality) if format_type == "video" else Rendition("audio", audio_codec=audio_codec)
+        renditions = [main]
+        for rendition in parse_renditions(extra):
+            if all(rendition.label != other.label for other in renditions):
+                renditions.append(rendition)
+        return renditions if len(renditions) > 1 else None
+
     def set_format(self, format_type):
         """Update the format selection"""
         self.format_var.set(format_type)
@@ -1075,48 +1643,27 @@ class DownloaderApp:
         self.quality_var.set("720p")
         self.format_var.set("video")
         self.set_format("video")
+        self.audio_codec_var.set(ORIGINAL_AUDIO)
+        self.renditions_entry.delete(0, tk.END)
         self.subtitle_var.set(False)
         self.playlist_var.set(False)
         self.progress_var.set(0)
         self.percent_var.set("0%")
-        self.eta_var.set("ETA: --")
-        self.speed_var.set("Speed: --")
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.insert(tk.END, "Download actions will appear here...")
-        self.log_text.config(state=tk.DISABLED)
-    
-    def log_message(self, message):
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)  # Clear placeholder
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
+        self.stats_panel.reset()
+        self.log_view.show_placeholder("Download actions will appear here...")
     
     def update_status(self, status):
         """Update status in log area with improved formatting and visibility"""
         # Clean any terminal escape sequences from the status message
         if isinstance(status, str):
-            # Remove ANSI color codes and other terminal escape sequences
-            import re
-            status = re.sub(r'\x1b\[[0-9;]*m', '', status)
             # Remove URLs from error messages for cleaner display
-            status = re.sub(r'See\s+https?://[^\s]+', '', status)
-            status = re.sub(r'Also see\s+https?://[^\s]+', '', status)
+            status = _URL_HINT.sub('', status)
             # Clean up YouTube error messages
             status = status.replace("ERROR:", "Error:").replace("youtube:", "YouTube:")
             status = status.replace("Use --cookies-from-browser or --cookies for the authentication.", "")
             
-            # Replace emoji characters that might cause display issues with plain text alternatives
-            status = status.replace("🔍", "[Search] ")
-            status = status.replace("⬇️", "[Download] ")
-            status = status.replace("✅", "[Success] ")
-            status = status.replace("❌", "[Error] ")
-            status = status.replace("⏱️", "[Time] ")
-            status = status.replace("📊", "[Stats] ")
-            status = status.replace("📁", "[File] ")
-            status = status.replace("📂", "[Folder] ")
-            status = status.replace("⚡", "[Speed] ")
+            # Remove escape sequences and replace emoji that might cause display issues
+            status = sanitize(status)
         
         try:
             # Log message to file (if possible)
@@ -1124,32 +1671,19 @@ class DownloaderApp:
         except Exception:
             # If logging fails (e.g., due to encoding issues), continue without logging to file
             pass
-        
-        # Always update the UI text widget
-        self.log_text.config(state=tk.NORMAL)
-        
-        # First time message - clear placeholder
-        if self.log_text.get("1.0", tk.END).strip() == "Download logs will appear here...":
-            self.log_text.delete("1.0", tk.END)
-            
-        # Add timestamp to new messages
+
+        # Add timestamp when the message is produced, not when it is drawn
         from datetime import datetime
         timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # Add message with timestamp
-        self.log_text.insert(tk.END, f"[{timestamp}] {status}\n")
-        self.log_text.see(tk.END)  # Scroll to show latest message
-        self.log_text.config(state=tk.DISABLED)
-        
-        # Force update the UI
-        self.root.update_idletasks()
+        self.log_view.append(f"[{timestamp}] {status}")
     
     def update_progress(self, progress):
-        """Update progress bar and percentage text"""
-        progress = float(progress)
+        """Update progress bar and percentage text. Safe from any thread."""
+        self.ui.call(self._set_progress, float(progress))
+
+    def _set_progress(self, progress):
         self.progress_bar.set_progress(progress)
         self.percent_var.set(f"{int(progress)}%")
-        self.root.update_idletasks()
     
     def update_download_count(self):
         """Increment download counter"""
@@ -1178,7 +1712,13 @@ class DownloaderApp:
         # Get selected options
         quality = self.quality_var.get()
         format_type = self.format_var.get()
+        audio_codec = self.selected_audio_codec()
         include_subs = self.subtitle_var.get()
+        try:
+            renditions = self.selected_renditions(quality, format_type, audio_codec)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
         download_type = "playlist" if self.playlist_var.get() else "single"
         
         # Get save location
@@ -1198,8 +1738,10 @@ class DownloaderApp:
             messagebox.showerror("Error", "Save location is not writable")
             return
         
-        # Check FFmpeg
-        if not check_ffmpeg():
+        # Check FFmpeg, unless the warm-up already found it
+        if not self.ffmpeg_available:
+            self.ffmpeg_available = check_ffmpeg()
+        if not self.ffmpeg_available:
             messagebox.showerror("Error", "FFmpeg is required but not found. Please install FFmpeg and try again.")
             return
         
@@ -1209,15 +1751,14 @@ class DownloaderApp:
         self.download_button.bg = "#6c757d"
         self.download_button.draw_button("#6c757d")
         
-        # Check if it's a playlist and fetch info first if needed
-        if self.playlist_var.get() and not self.current_playlist_info:
-            threading.Thread(target=self.fetch_playlist_info, args=(url,), daemon=True).start()
-            return
-        
+        # Without a searched listing, the engine streams the playlist and adds rows as entries arrive
+        if download_type == "playlist" and not self.current_playlist_info:
+            self.show_playlist_panel()
+
         # Start download in a separate thread
         self.download_thread = threading.Thread(
             target=self.download_task,
-            args=(url, download_type, quality, format_type, include_subs, output_dir)
+            args=(url, download_type, quality, format_type, include_subs, output_dir, audio_codec, renditions)
         )
         self.download_thread.daemon = True
         self.download_thread.start()
@@ -1236,720 +1777,204 @@ class DownloaderApp:
                 self.update_download_count()
             
             self.is_downloading = False
-            self.download_button.config(state=tk.NORMAL)
-            self.download_button.bg = self.button_bg
-            self.download_button.draw_button(self.button_bg)
+            self.enable_download_button()
+
+    def enable_download_button(self):
+        """Re-enable the download button. Main thread only."""
+        self.download_button.config(state=tk.NORMAL)
+        self.download_button.bg = self.button_bg
+        self.download_button.draw_button(self.button_bg)
     
-    def download_task(self, url, download_type, quality, format_type, include_subs, output_path):
+    def create_engine(self):
+        """Create a download engine that reports back to this window"""
+        self.engine = DownloadEngine(AppEngineListener(self), scheduler=self.scheduler,
+                                     controller=self.concurrency,
+                                     metadata_cache=self.metadata_cache,
+                                     journal=self.journal, archive=self.archive,
+                                     event_log=self.event_log, metrics=self.metrics,
+                                     profiler=self.profiler,
+                                     postprocess_pool=self.postprocess_pool)
+        return self.engine
+
+    def offer_resume(self):
+        """Ask whether to resume the most recent interrupted playlist run"""
+        if self.journal is None or self.is_downloading:
+            return
+        try:
+            runs = self.journal.unfinished_runs()
+        except Exception as e:
+            logger.warning(f"Could not read job journal: {str(e)}")
+            return
+        if not runs:
+            return
+
+        run = runs[0]
+        title = run['title'] or run['url']
+        progress = f"{run['completed']} of {run['total']} videos done"
+        if messagebox.askyesno("Resume download",
+                               f"The playlist download \"{title}\" did not finish ({progress}).\n\nResume it now?"):
+            self.is_downloading = True
+            self.download_button.config(state=tk.DISABLED)
+            self.playlist_var.set(True)
+            self.download_thread = threading.Thread(target=self.resume_task, args=(run['run_id'],), daemon=True)
+            self.download_thread.start()
+            self.root.after(100, self.check_download_progress)
+        else:
+            # Don't ask again; older runs are offered on the next start
+            self.journal.set_run_status(run['run_id'], 'abandoned')
+
+    def resume_task(self, run_id):
+        """Resume a journaled playlist run in a worker thread"""
+        try:
+            self.create_engine().resume_playlist(run_id)
+        except Exception as e:
+            logger.error(f"Error resuming playlist: {str(e)}")
+            self.update_status(f"❌ Error resuming playlist: {str(e)}")
+
+    def download_task(self, url, download_type, quality, format_type, include_subs, output_path,
+                      audio_codec=None, renditions=None):
         try:
             output_path = Path(output_path)
             if not output_path.exists():
                 output_path.mkdir(parents=True)
                 logger.info(f"Created output directory: {output_path}")
-            
-            # Configure format based on quality and format type
-            video_format = self.get_format_for_quality(quality, format_type)
-            
-            # Configure yt-dlp options with optimized settings
-            ydl_opts = {
-                'format': video_format,
-                'outtmpl': str(output_path / '%(title)s.%(ext)s'),
-                'progress_hooks': [self.progress_hook],
-                'writesubtitles': include_subs,
-                'writeautomaticsub': include_subs,
-                'subtitleslangs': ['en'],
-                'fragment_retries': 5,  # Increase retries
-                'retries': 5,  # Increase retries
-                'file_access_retries': 5,  # Increase retries
-                'extractor_retries': 5,  # Increase retries
-                'socket_timeout': 20,  # Increase timeout
-                'buffersize': 1024 * 1024 * 4,  # Larger buffer size
-                'http_chunk_size': 1048576 * 4,  # Larger chunk size
-                'concurrent_fragment_downloads': 8,  # More concurrent downloads
-                'verbose': True,
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                },
-                'postprocessor_args': {
-                    'ffmpeg': ['-threads', '8']  # Use more threads for processing
-                }
-            }
-            
-            # Add audio-only options if needed
-            if format_type == "audio":
-                ydl_opts['postprocessors'] = [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }]
-            
+
+            job = DownloadJob(url, quality, format_type, include_subs, output_path, audio_codec=audio_codec,
+                              renditions=renditions)
+            engine = self.create_engine()
+
             if download_type == "single":
-                self.download_single_video(url, ydl_opts)
+                engine.download_video(job)
             else:
-                self.download_playlist(url, ydl_opts)
-                
+                self.download_playlist(engine, url, job)
+
         except Exception as e:
             error_msg = f"❌ Error: {str(e)}"
             logger.error(error_msg)
             self.update_status(error_msg)
-    
-    def get_format_for_quality(self, quality, format_type):
-        """Determine the yt-dlp format string based on selected quality and type"""
-        if format_type == "audio":
-            # Get best audio, preferably mp3 if available, or best overall audio
-            # Use a fallback to 'bestaudio' if mp3 is not directly available
-            return 'bestaudio[ext=mp3]/bestaudio'
-            
-        # For video formats, prioritize mp4 if available at the specified height
-        preferred_format = 'bestvideo[height<={quality}][ext=mp4]+bestaudio[ext=m4a]'.format(quality=quality.replace('p', ''))
-        
-        # Fallback to best overall video+audio stream if preferred formats are not available
-        fallback_format = 'best'
-        
-        # Combine preferred and fallback formats
-        return f'{preferred_format}/{fallback_format}'
-    
-    def progress_hook(self, d):
-        if not self.is_downloading:
-            raise Exception("Download cancelled by user")
-            
-        if d['status'] == 'downloading':
-            try:
-                # Get progress information
-                percent = d.get('_percent_str', '0%').strip()
-                speed = d.get('_speed_str', '--').replace(' ', '')
-                eta = d.get('_eta_str', '--').replace(' ', '')
-                downloaded = d.get('_downloaded_str', '--')
-                total = d.get('_total_bytes_str', '--')
-                
-                # Update progress bar
-                if percent.endswith('%'):
-                    progress = float(percent[:-1])
-                    self.progress_bar.set_progress(progress)
-                    self.percent_var.set(f"{int(progress)}%")
-                
-                # Update speed and ETA
-                self.speed_var.set(f"Speed: {speed}")
-                self.eta_var.set(f"ETA: {eta}")
-                
-                # Create a detailed progress message
-                progress_msg = f"⬇️ Downloading... {percent}\n"
-                progress_msg += f"📊 Progress: {downloaded} of {total}\n"
-                progress_msg += f"⚡ Speed: {speed}\n"
-                progress_msg += f"⏱️ ETA: {eta}\n"
-                
-                # Update log with formatted message
-                self.log_text.config(state=tk.NORMAL)
-                self.log_text.delete(1.0, tk.END)
-                self.log_text.insert(tk.END, progress_msg)
-                self.log_text.see(tk.END)
-                self.log_text.config(state=tk.DISABLED)
-                
-            except Exception as e:
-                logger.error(f"Error updating progress: {str(e)}")
-                
-        elif d['status'] == 'finished':
-            filename = d.get('filename', '').split('/')[-1]
-            # Use Windows-style path separator if on Windows
-            if os.name == 'nt':
-                filename = d.get('filename', '').split('\\')[-1]
-            
-            complete_msg = f"✅ Download complete!\n"
-            complete_msg += f"📁 Saved as: {filename}\n"
-            complete_msg += f"📍 Location: {os.path.dirname(d.get('filename', ''))}"
-            
-            self.update_status(complete_msg)
-            self.update_progress(100)
-            
-            # Add to download history
-            self.download_history.append({
-                'title': self.current_video_info.get('title', 'Unknown') if hasattr(self, 'current_video_info') else 'Unknown',
-                'filename': filename,
-                'filepath': d.get('filename', ''),
-                'format': self.format_var.get(),
-                'type': self.format_var.get(),  # Changed from self.type_var.get() to self.format_var.get()
-                'time': datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-            })
-            
-            # Update download history display
-            self.update_download_history()
-            
-            logger.info(f"Download complete: {filename}")
-        
-        elif d['status'] == 'error':
-            error_msg = d.get('error', 'Unknown error occurred')
-            
-            # Clean up error message
-            import re
-            error_msg = re.sub(r'\x1b\[[0-9;]*m', '', error_msg)
-            error_msg = re.sub(r'See\s+https?://[^\s]+', '', error_msg)
-            error_msg = re.sub(r'Also see\s+https?://[^\s]+', '', error_msg)
-            error_msg = error_msg.replace("ERROR:", "").strip()
-            
-            # Provide user-friendly error message for private videos
-            if "Private video" in error_msg:
-                if self.cookies_var.get():
-                    error_msg = "This is a private video. The provided authentication cookies don't have access to this video."
-                else:
-                    error_msg = "This is a private video that requires authentication. Enable the 'Use Authentication Cookies' option to download private videos."
-            
-            self.log_text.config(state=tk.NORMAL)
-            self.log_text.delete(1.0, tk.END)
-            self.log_text.insert(tk.END, f"❌ Error: {error_msg}")
-            self.log_text.see(tk.END)
-            self.log_text.config(state=tk.DISABLED)
-    
-    def download_single_video(self, url, ydl_opts):
-        try:
-            self.update_status("🔍 Fetching video information...")
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                self.current_video_info = info  # Store for history
-                title = info.get('title', 'Unknown Video')
-                
-                # Show video info in log
-                video_info = f"📽️ Video: {title}\n"
-                video_info += f"Duration: {info.get('duration_string', '--')}\n"
-                video_info += f"Quality: {info.get('format_note', '--')}\n"
-                video_info += "Starting download..."
-                
-                self.log_text.config(state=tk.NORMAL)
-                self.log_text.delete(1.0, tk.END)
-                self.log_text.insert(tk.END, video_info)
-                self.log_text.see(tk.END)
-                self.log_text.config(state=tk.DISABLED)
-                
-                logger.info(f"Downloading: {title}")
-                
-                # Download the video
-                ydl.download([url])
-                
-                # Get the downloaded file path
-                outfile = None
-                for key in ['requested_downloads', '_download_retcode']:
-                    if hasattr(ydl, key) and key == 'requested_downloads' and ydl.requested_downloads:
-                        outfile = ydl.requested_downloads[0].get('filepath')
-                        break
-                
-                # Set file's timestamp to match the video upload date
-                if outfile and os.path.exists(outfile):
-                    try:
-                        # Try to get the upload date from the video info
-                        if info.get('upload_date'):
-                            # Parse the upload date (YYYYMMDD format)
-                            upload_date = info.get('upload_date')
-                            if upload_date and len(upload_date) == 8:
-                                year = int(upload_date[0:4])
-                                month = int(upload_date[4:6])
-                                day = int(upload_date[6:8])
-                                
-                                # Create a timestamp
-                                date_time = datetime.datetime(year, month, day, 12, 0, 0)
-                                timestamp = date_time.timestamp()
-                                
-                                # Set the file's access and modification times
-                                os.utime(outfile, (timestamp, timestamp))
-                                logger.info(f"Set file timestamp to video upload date: {year}-{month}-{day}")
-                                
-                                # Add this info to the completion message
-                                self.update_status(f"✅ Download complete! Set file date to original upload date: {year}-{month}-{day}")
-                    except Exception as e:
-                        logger.error(f"Failed to set file timestamp: {str(e)}")
-        except Exception as e:
-            error_msg = str(e)
-            # Check for private video error and provide a more user-friendly message
-            if "Private video" in error_msg:
-                if self.cookies_var.get():
-                    error_msg = "❌ Error: This is a private video. The provided authentication cookies don't have access to this video."
-                else:
-                    error_msg = "❌ Error: This is a private video that requires authentication. Enable the 'Use Authentication Cookies' option to download private videos."
-            else:
-                error_msg = f"❌ Error downloading video:\n{error_msg}"
-            
-            self.log_text.config(state=tk.NORMAL)
-            self.log_text.delete(1.0, tk.END)
-            self.log_text.insert(tk.END, error_msg)
-            self.log_text.see(tk.END)
-            self.log_text.config(state=tk.DISABLED)
-            logger.error(f"Error downloading video: {str(e)}")
-            raise
-    
-    def download_playlist(self, url, ydl_opts):
+
+    def download_playlist(self, engine, url, job_template):
+        """Download all videos of the current playlist through the engine"""
         try:
-            # If we already have playlist info, use it
+            # If we already have playlist info, use our filtered videos list
+            videos = None
             if self.current_playlist_info and 'entries' in self.current_playlist_info:
-                playlist_info = self.current_playlist_info
-                videos = self.current_playlist_videos  # Use our filtered videos list
-            else:
-                # First get playlist info
-                extract_info_opts = ydl_opts.copy()
-                extract_info_opts['extract_flat'] = True
-                
-                self.update_status("Fetching playlist information...")
-                with yt_dlp.YoutubeDL(extract_info_opts) as ydl:
-                    playlist_info = ydl.extract_info(url, download=False)
-                    
-                    # Create video cards if not already done
-                    if 'entries' in playlist_info and not self.current_playlist_info:
-                        # Filter entries to remove private videos
-                        filtered_entries = []
-                        for entry in playlist_info['entries']:
-                            if entry is not None:
-                                filtered_entries.append(entry)
-                        
-                        videos = filtered_entries
-                        self.current_playlist_info = playlist_info
-                        self.current_playlist_videos = filtered_entries
-                        
-                        # Update playlist info text
-                        playlist_title = playlist_info.get('title', 'Unknown Playlist')
-                        video_count = len(filtered_entries)
-                        self.playlist_info_var.set(f"{video_count} videos • {playlist_title}")
-                        
-                        # Clear and add video cards
-                        self.playlist_view.clear()
-                        for i, entry in enumerate(filtered_entries):
-                            self.playlist_view.add_video(entry, i)
-            
-            if self.current_playlist_videos:
                 videos = self.current_playlist_videos
-                total_videos = len(videos)
-                playlist_title = playlist_info.get('title', 'Unknown Playlist')
-                
-                logger.info(f"Found {total_videos} videos in playlist: {playlist_title}")
-                self.update_status(f"Starting parallel download of {total_videos} videos...")
-                
-                # Create a thread pool - limit to max 3 concurrent downloads to avoid rate limiting
-                max_workers = min(3, total_videos)
-                self.download_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
-                futures = []
-                
-                # Track completed downloads to update progress
-                self.completed_videos = 0
-                self.total_videos = total_videos
-                self.failed_videos = 0
-                
-                # Submit each video to the thread pool
-                for i, video in enumerate(videos):
-                    if video is None:
-                        continue
-                        
-                    # Get proper video URL - this is critical for playlist items
-                    video_url = None
-                    
-                    # Try different ways to get the video URL
-                    if 'url' in video:
-                        video_url = video['url']
-                    elif 'id' in video:
-                        # Construct URL from ID
-                        video_url = f"https://www.youtube.com/watch?v={video['id']}"
-                    elif 'webpage_url' in video:
-                        video_url = video['webpage_url']
-                    
-                    if not video_url:
-                        logger.warning(f"Could not find URL for video {i+1} in playlist")
-                        continue
-                    
-                    # Log the URL we're using
-                    logger.info(f"Using URL for video {i+1}: {video_url}")
-                    
-                    # Update card status to queued
-                    self.playlist_view.update_video_progress(i, 0, "pending")
-                    
-                    # Configure download options for this video
-                    video_opts = ydl_opts.copy()
-                    video_opts['extract_flat'] = False
-                    
-                    # Create a progress hook for this specific video
-                    def create_progress_hook(video_index):
-                        def video_progress_hook(d):
-                            if not self.is_downloading:
-                                raise Exception("Download cancelled by user")
-                                
-                            if d['status'] == 'downloading':
-                                try:
-                                    percent = d.get('_percent_str', '0%').strip()
-                                    if percent.endswith('%'):
-                                        percent = float(percent[:-1])
-                                        self.playlist_view.update_video_progress(video_index, percent, "downloading")
-                                except Exception:
-                                    pass
-                            elif d['status'] == 'finished':
-                                self.playlist_view.update_video_progress(video_index, 100, "completed")
-                                with self.progress_lock:
-                                    self.completed_videos += 1
-                                    # Update overall progress based on completed video count
-                                    overall_progress = int((self.completed_videos / self.total_videos) * 100)
-                                    self.update_progress(overall_progress)
-                            elif d['status'] == 'error':
-                                with self.progress_lock:
-                                    self.failed_videos += 1
-                                    self.completed_videos += 1
-                                    # Update overall progress
-                                    overall_progress = int((self.completed_videos / self.total_videos) * 100)
-                                    self.update_progress(overall_progress)
-                        return video_progress_hook
-                    
-                    # Add video-specific progress hook
-                    video_opts['progress_hooks'] = [create_progress_hook(i)]
-                    
-                    # Make sure we include cookies for private videos if available
-                    if self.cookies_var.get() and self.has_cookies:
-                        video_opts['cookiefile'] = str(self.cookies_file)
-                    
-                    # Submit this video download to the thread pool
-                    future = self.download_pool.submit(self.download_single_video_task, video_url, video_opts, i)
-                    futures.append(future)
-                
-                # Create a cancellation check thread
-                def monitor_downloads():
-                    """Monitor the progress of all downloads in the playlist"""
-                    try:
-                        while self.is_downloading and any(not f.done() for f in futures):
-                            time.sleep(0.5)  # Check every half second
-                            
-                            # Check for any failed downloads
-                            failed_count = sum(1 for f in futures if f.done() and not f.result())
-                            if failed_count > 0:
-                                self.update_status(f"⚠️ {failed_count} videos failed to download. Continuing with remaining videos...")
-                        
-                        # If we've reached here, either downloads are done or user cancelled
-                        if not self.is_downloading:
-                            # Cancel any pending futures
-                            for f in futures:
-                                if not f.done():
-                                    f.cancel()
-                            
-                            self.download_pool.shutdown(wait=False)
-                            self.update_status("Downloads cancelled")
-                        else:
-                            # All downloads completed
-                            successful = self.completed_videos - self.failed_videos
-                            total = self.total_videos
-                            
-                            # Calculate success rate
-                            success_rate = (successful / total) * 100 if total > 0 else 0
-                            
-                            # Update final status
-                            if self.failed_videos > 0:
-                                self.update_status(f"Playlist download complete: {successful}/{total} videos downloaded successfully ({success_rate:.1f}% success rate)")
-                                self.update_status(f"Failed downloads: {self.failed_videos} videos")
-                            else:
-                                self.update_status(f"✅ Playlist download complete: All {total} videos downloaded successfully")
-                            
-                            # Log final statistics
-                            logger.info(f"Playlist download completed. Success rate: {success_rate:.1f}%")
-                            logger.info(f"Successful downloads: {successful}")
-                            logger.info(f"Failed downloads: {self.failed_videos}")
-                        
-                        # Ensure progress is at 100%
-                        self.update_progress(100)
-                        
-                        # Shutdown the thread pool
-                        self.download_pool.shutdown(wait=True)
-                        
-                        # Re-enable the download button
-                        self.download_button.config(state=tk.NORMAL)
-                        self.download_button.bg = self.button_bg
-                        self.download_button.draw_button(self.button_bg)
-                        
-                    except Exception as e:
-                        logger.error(f"Error in download monitoring: {str(e)}")
-                        self.update_status(f"❌ Error monitoring downloads: {str(e)}")
-                        # Still try to clean up
-                        try:
-                            self.download_pool.shutdown(wait=False)
-                            self.download_button.config(state=tk.NORMAL)
-                        except:
-                            pass
-                
-                # Start the monitoring thread
-                monitor_thread = threading.Thread(target=monitor_downloads, daemon=True)
-                monitor_thread.start()
-            else:
-                raise Exception("No available videos found in playlist")
+
+            engine.download_playlist(url, job_template, videos=videos,
+                                     playlist_info=self.current_playlist_info)
         except Exception as e:
             logger.error(f"Error downloading playlist: {str(e)}")
             self.update_status(f"Error: {str(e)}")
-            # Re-enable the download button
-            self.download_button.config(state=tk.NORMAL)
-            self.download_button.bg = self.button_bg
-            self.download_button.draw_button(self.button_bg)
             raise
-    
-    def download_single_video_task(self, url, ydl_opts, index):
-        """Individual download task for a single video in a playlist (runs in a thread)"""
-        max_retries = 3
-        retry_delay = 5  # seconds
-        
-        for attempt in range(max_retries):
-            try:
-                # Ensure we have a valid URL
-                if not url:
-                    logger.error(f"No valid URL for video {index+1}")
-                    self.playlist_view.update_video_progress(index, 0, "error")
-                    self.playlist_view.video_cards[index].status_var.set("❌ Missing URL")
-                    with self.progress_lock:
-                        self.failed_videos += 1
-                        self.completed_videos += 1
-                        overall_progress = int((self.completed_videos / self.total_videos) * 100)
-                        self.update_progress(overall_progress)
-                    return False
-                    
-                # Update status in UI
-                self.playlist_view.update_video_progress(index, 0, "downloading")
-                
-                # Log what we're downloading
-                logger.info(f"Starting download for video {index+1}: {url}")
-                
-                # Perform the download
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    try:
-                        # Check if the video information can be accessed first
-                        info = ydl.extract_info(url, download=False)
-                        
-                        # If we got here, we can access the video, so download it
-                        if info:
-                            logger.info(f"Downloading video: {info.get('title', 'Unknown')}")
-                            self.playlist_view.video_cards[index].status_var.set(f"⬇️ Downloading...")
-                            
-                            # Now actually download the video
-                            ydl.download([url])
-                            
-                            # Update UI for completion
-                            logger.info(f"Video {index+1} download completed")
-                            self.playlist_view.update_video_progress(index, 100, "completed")
-                            
-                            with self.progress_lock:
-                                self.completed_videos += 1
-                                overall_progress = int((self.completed_videos / self.total_videos) * 100)
-                                self.update_progress(overall_progress)
-                            return True
-                        else:
-                            # Could not get video info
-                            raise Exception("Could not extract video information")
-                            
-                    except Exception as e:
-                        error_msg = str(e)
-                        # Clean up error message and handle private videos gracefully
-                        if "Private video" in error_msg:
-                            clean_msg = "Private video"
-                            if self.cookies_var.get():
-                                clean_msg = "Private video (no access with current cookies)"
-                            self.playlist_view.video_cards[index].status_var.set(f"⛔ {clean_msg}")
-                        else:
-                            # Format other errors
-                            import re
-                            clean_error = re.sub(r'\x1b\[[0-9;]*m', '', error_msg)
-                            clean_error = re.sub(r'ERROR:', '', clean_error).strip()
-                            if len(clean_error) > 50:
-                                clean_error = clean_error[:47] + "..."
-                            self.playlist_view.video_cards[index].status_var.set(f"❌ {clean_error}")
-                        
-                        logger.error(f"Error downloading video {index+1}: {error_msg}")
-                        self.playlist_view.update_video_progress(index, 0, "error")
-                        
-                        # Don't raise the exception - this allows other downloads to continue
-                        with self.progress_lock:
-                            self.failed_videos += 1
-                            self.completed_videos += 1
-                            overall_progress = int((self.completed_videos / self.total_videos) * 100)
-                            self.update_progress(overall_progress)
-                        return False
-                        
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"Attempt {attempt + 1} failed for video {index+1}. Retrying in {retry_delay} seconds...")
-                    self.playlist_view.video_cards[index].status_var.set(f"⚠️ Retrying ({attempt + 1}/{max_retries})...")
-                    time.sleep(retry_delay)
-                    continue
-                else:
-                    logger.error(f"Error downloading video {index+1} after {max_retries} attempts: {str(e)}")
-                    self.playlist_view.update_video_progress(index, 0, "error")
-                    
-                    # Always update progress counters even if the download failed
-                    with self.progress_lock:
-                        self.failed_videos += 1
-                        self.completed_videos += 1
-                        overall_progress = int((self.completed_videos / self.total_videos) * 100)
-                        self.update_progress(overall_progress)
-                    return False
-    
-    def fetch_playlist_info(self, url):
-        """Fetch playlist information without downloading"""
+        finally:
+            # Re-enable the download button
+            self.ui.call(self.enable_download_button)
+
+    def sample_progress(self):
+        """Apply job progress recorded since the last frame, then reschedule"""
         try:
-            self.update_status("🔍 Fetching playlist information...")
-            self.download_button.config(state=tk.DISABLED)
-            
-            # Configure options just for extracting playlist info
-            extract_opts = {
-                'extract_flat': True,
-                'quiet': True,
-                'no_warnings': True,
-                'skip_download': True,
-                'forcejson': True,
-            }
-            
-            # Add cookies for private playlists if available
-            # if self.cookies_var.get() and self.has_cookies:
-            #     extract_opts['cookiefile'] = str(self.cookies_file)
-            #     self.update_status("Using cookies for authentication...")
-            
-            with yt_dlp.YoutubeDL(extract_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                if 'entries' in info and info['entries']:
-                    # Filter out private videos if option is enabled
-                    filtered_entries = []
-                    skipped_count = 0
-                    
-                    for entry in info['entries']:
-                        if entry is None:
-                            continue
-                            
-                        # Skip private videos (we'll check this when we get detailed info)
-                        filtered_entries.append(entry)
-                    
-                    # Update with filtered entries
-                    info['entries'] = filtered_entries
-                    self.current_playlist_info = info
-                    self.current_playlist_videos = filtered_entries
-                    
-                    # Update playlist info text
-                    playlist_title = info.get('title', 'Unknown Playlist')
-                    video_count = len(filtered_entries)
-                    self.playlist_info_var.set(f"{video_count} videos • {playlist_title}")
-                    
-                    # Clear existing video cards
-                    self.playlist_view.clear()
-                    
-                    # Fetch detailed info for each video
-                    self.update_status(f"🔍 Found {video_count} videos in playlist: {playlist_title}")
-                    
-                    # Add video cards for each entry
-                    available_videos = []
-                    for i, entry in enumerate(filtered_entries):
-                        # Try to get more info about the video
-                        try:
-                            # Get proper video URL - this is critical for playlist items
-                            video_url = None
-                            
-                            # Try different ways to get the video URL
-                            if 'url' in entry:
-                                video_url = entry['url']
-                            elif 'id' in entry:
-                                # Construct URL from ID
-                                video_url = f"https://www.youtube.com/watch?v={entry['id']}"
-                            elif 'webpage_url' in entry:
-                                video_url = entry['webpage_url']
-                                
-                            if not video_url:
-                                logger.warning(f"Could not find URL for video {i+1} in playlist")
-                                continue
-                                
-                            logger.info(f"Fetching info for video {i+1}: {video_url}")
-                            
-                            # Only extract some basic info to avoid too many API calls
-                            with yt_dlp.YoutubeDL({'skip_download': True, 'quiet': True}) as video_ydl:
-                                try:
-                                    video_info = video_ydl.extract_info(video_url, download=False, process=False)
-                                    
-                                    # Ensure the video has a URL
-                                    if not video_info.get('url') and not video_info.get('webpage_url') and video_url:
-                                        # Add the URL to the video info
-                                        video_info['url'] = video_url
-                                    
-                                    # Check if this is a private video
-                                    if video_info:
-                                        available_videos.append(video_info)
-                                        self.playlist_view.add_video(video_info, len(available_videos)-1)
-                                    else:
-                                        skipped_count += 1
-                                except Exception as e:
-                                    error_str = str(e)
-                                    if "Private video" in error_str:
-                                        skipped_count += 1
-                                        logger.info(f"Skipped private video: {video_url}")
-                                    else:
-                                        # For other errors, still add the video with basic info
-                                        # Add the URL to ensure we can download it
-                                        entry['url'] = video_url
-                                        available_videos.append(entry)
-                                        self.playlist_view.add_video(entry, len(available_videos)-1)
-                        except Exception as e:
-                            # Use basic info if detailed extraction fails
-                            if "Private video" not in str(e):
-                                # Make sure we have a valid URL
-                                if 'url' not in entry and 'id' in entry:
-                                    entry['url'] = f"https://www.youtube.com/watch?v={entry['id']}"
-                                    
-                                available_videos.append(entry)
-                                self.playlist_view.add_video(entry, len(available_videos)-1)
-                                logger.warning(f"Could not get detailed info for video {i+1}: {str(e)}")
-                            else:
-                                skipped_count += 1
-                                logger.info(f"Skipped private video at position {i+1}")
-                    
-                    # Update current playlist info with available videos
-                    self.current_playlist_videos = available_videos
-                    
-                    # Update status with skip info
-                    if skipped_count > 0:
-                        self.update_status(f"✅ Playlist information loaded: {playlist_title} ({skipped_count} private videos skipped)")
-                    else:
-                        self.update_status(f"✅ Playlist information loaded: {playlist_title}")
-                        
-                    # Start download automatically only if we have videos to download
-                    if available_videos:
-                        # Get selected options
-                        quality = self.quality_var.get()
-                        format_type = self.format_var.get()
-                        include_subs = self.subtitle_var.get()
-                        output_dir = self.save_location
-                        
-                        # Update UI state
-                        self.is_downloading = True
-                        
-                        # Start download in a separate thread
-                        self.download_thread = threading.Thread(
-                            target=self.download_task,
-                            args=(url, "playlist", quality, format_type, include_subs, output_dir)
-                        )
-                        self.download_thread.daemon = True
-                        self.download_thread.start()
-                        
-                        # Start progress monitoring
-                        self.root.after(100, self.check_download_progress)
-                    else:
-                        self.update_status("No videos available to download in this playlist")
-                        self.download_button.config(state=tk.NORMAL)
+            for job_id, state in self.progress_store.changed():
+                if state.index is None:
+                    # A single video's final row only clears it from the store
+                    if state.status == "downloading":
+                        self.show_single_progress(state)
                 else:
-                    self.update_status("❌ No videos found in playlist")
-                    messagebox.showerror("Error", "No videos found in playlist")
-                    self.download_button.config(state=tk.NORMAL)
-            
+                    self.playlist_view.update_video_progress(state.index, state.percent, state.status,
+                                                             state.message)
+
+            overall = self.progress_store.overall()
+            if overall:
+                completed, failed, total = overall
+                self.update_progress(int((completed / total) * 100) if total else 100)
         except Exception as e:
-            logger.error(f"Error fetching playlist info: {str(e)}")
-            self.update_status(f"❌ Error fetching playlist info: {str(e)}")
-            messagebox.showerror("Error", f"Could not fetch playlist information:\n{str(e)}")
-            self.download_button.config(state=tk.NORMAL)
-    
+            logger.error(f"Error updating progress: {str(e)}")
+        self.root.after(PROGRESS_FRAME_MS, self.sample_progress)
+
+    def refresh_stats(self):
+        """Redraw the metrics panel, then reschedule"""
+        try:
+            self.stats_panel.refresh()
+        except Exception as e:
+            logger.error(f"Error updating stats: {str(e)}")
+        self.root.after(STATS_REFRESH_MS, self.refresh_stats)
+
+    def show_single_progress(self, state):
+        """Show the sampled progress of a single video download"""
+        self.progress_bar.set_progress(state.percent)
+        self.percent_var.set(f"{int(state.percent)}%")
+
+    def on_single_finished(self, d):
+        """Report a finished file of a single video download"""
+        filepath = d.get('filename', '')
+        filename = os.path.basename(filepath)
+
+        complete_msg = f"✅ Download complete!\n"
+        complete_msg += f"📁 Saved as: {filename}\n"
+        complete_msg += f"📍 Location: {os.path.dirname(filepath)}"
+
+        self.update_status(complete_msg)
+        self.update_progress(100)
+        logger.info(f"Download complete: {filename}")
+
+    def add_to_history(self, result):
+        """Record a finished download in the history list"""
+        filepath = result.filepath or ''
+        self.download_history.append({
+            'title': result.title,
+            'filename': os.path.basename(filepath),
+            'filepath': filepath,
+            'format': result.job.format_type,
+            'type': result.job.format_type,
+            'time': datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        })
+
+        # Update download history display
+        self.update_download_history()
+
+    def load_archived_history(self):
+        """Fill the history list with the latest downloads from the archive"""
+        if self.archive is None:
+            return
+        try:
+            recent = self.archive.recent(5)
+        except Exception as e:
+            logger.warning(f"Could not read download archive: {str(e)}")
+            return
+        for entry in recent:
+            filepath = entry['filepath'] or ''
+            self.download_history.append({
+                'title': entry['title'] or 'Unknown Video',
+                'filename': os.path.basename(filepath),
+                'filepath': filepath,
+                'format': entry['format_type'],
+                'type': entry['format_type'],
+                'time': datetime.datetime.fromtimestamp(entry['downloaded_at']).strftime("%Y-%m-%d %H:%M")
+            })
+        if self.download_history:
+            self.update_download_history()
+
+    def show_fetch_error(self, title, error):
+        """Report a failed lookup and re-enable the buttons. Main thread only."""
+        messagebox.showerror("Error", f"{title}:\n{str(error)}")
+        self.download_button.config(state=tk.NORMAL)
+        self.search_button.config(state=tk.NORMAL)
+
     def playlist_toggle(self, event=None):
         """Show or hide the playlist view based on the playlist switch"""
         if self.playlist_var.get():
             # Show playlist view and update UI
-            self.playlist_view_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 10))
+            self.show_playlist_panel()
         else:
-            # Hide playlist view
-            self.playlist_view_frame.pack_forget()
-            
             # Clear playlist info
             self.current_playlist_info = None
             self.current_playlist_videos = []
             self.current_video_index = -1
-            self.playlist_view.clear()
+
+            # Hide playlist view, if it was ever shown
+            if self._playlist_view is not None:
+                self.playlist_view_frame.pack_forget()
+                self.playlist_view.clear()
 
     def search_videos(self):
         """Search for videos without downloading"""
@@ -1959,101 +1984,127 @@ class DownloaderApp:
             return
         
         # Show the playlist view section regardless of playlist checkbox
-        self.playlist_view_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 10))
+        self.show_playlist_panel()
         
-        # Start search in a thread
-        threading.Thread(target=self.fetch_video_info, args=(url,), daemon=True).start()
+        # Start search in a thread; playlists are listed with per-video details, in parallel
+        target = self.fetch_playlist_listing if self.playlist_var.get() else self.fetch_video_info
+        threading.Thread(target=target, args=(url,), daemon=True).start()
+
+    def fetch_playlist_listing(self, url):
+        """Fill the playlist view through the engine's parallel metadata fetch. Runs in a worker thread."""
+        try:
+            self.ui.call(self.search_button.config, state=tk.DISABLED)
+            self.update_status("🔍 Fetching playlist information...")
+
+            # Rows are added by the engine listener as each video's details arrive
+            info, available_videos, skipped_count = self.create_engine().fetch_playlist_info(url)
+        except Exception as e:
+            logger.error(f"Error fetching playlist info: {str(e)}")
+            self.update_status(f"❌ Error fetching playlist info: {str(e)}")
+            self.ui.call(self.show_fetch_error, "Could not fetch playlist information", e)
+            return
+
+        self.ui.call(self.show_playlist_listing, info, available_videos, skipped_count)
+
+    def show_playlist_listing(self, info, available_videos, skipped_count):
+        """Keep a fetched listing for the next download. Main thread only."""
+        playlist_title = info.get('title', 'Unknown Playlist')
+
+        # The download uses these, so private videos are skipped before it starts
+        self.current_playlist_info = info
+        self.current_playlist_videos = available_videos
+
+        self.playlist_info_var.set(f"{len(available_videos)} videos • {playlist_title}")
+        if skipped_count > 0:
+            self.update_status(f"✅ Found playlist: {playlist_title} with {len(available_videos)} videos "
+                               f"({skipped_count} private videos skipped)")
+        else:
+            self.update_status(f"✅ Found playlist: {playlist_title} with {len(available_videos)} videos")
+        self.search_button.config(state=tk.NORMAL)
 
     def fetch_video_info(self, url):
-        """Fetch video information for display without downloading"""
+        """Fetch video information for display without downloading. Runs in a worker thread."""
         try:
-            self.search_button.config(state=tk.DISABLED)
+            self.ui.call(self.search_button.config, state=tk.DISABLED)
             self.update_status("🔍 Searching for videos...")
             
-            # Configure options for video info extraction
-            extract_opts = {
-                'extract_flat': False,  # Get detailed info for single videos
-                'skip_download': True,
-                'quiet': True,
-                'no_warnings': True,
-                'forcejson': True,
-            }
-            
-            # If authentication cookies are enabled, use them
-            # if self.cookies_var.get() and self.has_cookies:
-            #     extract_opts['cookiefile'] = str(self.cookies_file)
-            #     logger.info(f"Using cookies file for search: {self.cookies_file}")
+            info = self.create_engine().fetch_video_info(url)
+        except Exception as e:
+            logger.error(f"Error searching for videos: {str(e)}")
+            self.update_status(f"❌ Error searching for videos: {str(e)}")
+            self.ui.call(self.show_fetch_error, "Could not fetch video information", e)
+            return
+
+        self.ui.call(self.show_video_info, info)
+
+    def show_video_info(self, info):
+        """Show the result of a search. Main thread only."""
+        try:
+            # Clear the playlist view
+            self.playlist_view.clear()
             
-            with yt_dlp.YoutubeDL(extract_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+            if info.get('_type') == 'playlist':
+                # It's a playlist
+                playlist_title = info.get('title', 'Unknown Playlist')
+                entries = info.get('entries', [])
                 
-                # Clear the playlist view
-                self.playlist_view.clear()
+                # Filter out None entries
+                entries = [e for e in entries if e is not None]
                 
-                if info.get('_type') == 'playlist':
-                    # It's a playlist
-                    playlist_title = info.get('title', 'Unknown Playlist')
-                    entries = info.get('entries', [])
-                    
-                    # Filter out None entries
-                    entries = [e for e in entries if e is not None]
-                    
-                    # Update playlist info
-                    self.current_playlist_info = info
-                    self.current_playlist_videos = entries
-                    
-                    # Enable playlist mode automatically
-                    self.playlist_var.set(True)
-                    
-                    # Update playlist info text
-                    video_count = len(entries)
-                    self.playlist_info_var.set(f"{video_count} videos • {playlist_title}")
-                    
-                    # Add video cards for each entry
-                    for i, entry in enumerate(entries):
-                        self.playlist_view.add_video(entry, i)
-                    
-                    self.update_status(f"✅ Found playlist: {playlist_title} with {video_count} videos")
-                    
-                    # Update description panel with all videos metadata
-                    # self.description_panel.update_description(entries)
-                else:
-                    # It's a single video
-                    self.current_playlist_info = None
-                    
-                    # Create a special playlist view with just this video
-                    self.playlist_info_var.set("Single Video")
-                    self.playlist_view.add_video(info, 0)
-                    
-                    # Store as a single item list
-                    self.current_playlist_videos = [info]
-                    
-                    self.update_status(f"✅ Found video: {info.get('title', 'Unknown Video')}")
-                    
-                    # Update description panel with single video metadata
-                    self.description_panel.update_description(info)
+                # Update playlist info
+                self.current_playlist_info = info
+                self.current_playlist_videos = entries
+                
+                # Enable playlist mode automatically
+                self.playlist_var.set(True)
+                
+                # Update playlist info text
+                video_count = len(entries)
+                self.playlist_info_var.set(f"{video_count} videos • {playlist_title}")
+                
+                # Add video cards for each entry
+                for i, entry in enumerate(entries):
+                    self.playlist_view.add_video(entry, i)
+                
+                self.update_status(f"✅ Found playlist: {playlist_title} with {video_count} videos")
+                
+                # Update description panel with all videos metadata
+                # self.description_panel.update_description(entries)
+            else:
+                # It's a single video
+                self.current_playlist_info = None
+                
+                # Create a special playlist view with just this video
+                self.playlist_info_var.set("Single Video")
+                self.playlist_view.add_video(info, 0)
+                
+                # Store as a single item list
+                self.current_playlist_videos = [info]
+                
+                self.update_status(f"✅ Found video: {info.get('title', 'Unknown Video')}")
+                
+                # Update description panel with single video metadata
+                self.description_panel.update_description(info)
             
             self.search_button.config(state=tk.NORMAL)
         except Exception as e:
             logger.error(f"Error searching for videos: {str(e)}")
             self.update_status(f"❌ Error searching for videos: {str(e)}")
-            messagebox.showerror("Error", f"Could not fetch video information:\n{str(e)}")
-            self.search_button.config(state=tk.NORMAL)
+            self.show_fetch_error("Could not fetch video information", e)
 
     def update_download_history(self):
         """Update the download history display"""
-        if not hasattr(self, 'download_history_frame'):
-            return
-            
+        history_frame = self.history_frame
+
         # Clear current history display
-        for widget in self.download_history_frame.winfo_children():
+        for widget in history_frame.winfo_children():
             widget.destroy()
             
         # Show recent downloads (last 5)
         recent = self.download_history[-5:] if self.download_history else []
         
         if not recent:
-            no_history = ttk.Label(self.download_history_frame, 
+            no_history = ttk.Label(history_frame, 
                                 text="No recent downloads", 
                                 font=self.normal_font)
             no_history.pack(pady=10)
@@ -2061,7 +2112,7 @@ class DownloaderApp:
             
         # Add each download as a compact entry
         for i, download in enumerate(reversed(recent)):
-            entry_frame = ttk.Frame(self.download_history_frame, style="Card.TFrame")
+            entry_frame = ttk.Frame(history_frame, style="Card.TFrame")
             entry_frame.pack(fill=tk.X, pady=(0, 5), padx=5)
             
             # Title with emoji indicating type
@@ -2101,7 +2152,7 @@ class DownloaderApp:
             
             # Add separator except for last item
             if i < len(recent) - 1:
-                separator = ttk.Separator(self.download_history_frame, orient="horizontal")
+                separator = ttk.Separator(history_frame, orient="horizontal")
                 separator.pack(fill=tk.X, pady=5, padx=5)
     
     def open_folder(self, path):
@@ -2126,16 +2177,15 @@ class DownloaderApp:
 
     def clear_logs(self):
         """Clear the log display"""
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.insert(tk.END, "Download logs will appear here...\n")
-        self.log_text.config(state=tk.DISABLED)
+        self.log_view.show_placeholder("Download logs will appear here...\n")
         try:
             logger.info("Logs cleared")
         except Exception:
             pass  # Ignore any logging errors
 
 if __name__ == "__main__":
+    # Post-processing workers are started as fresh processes, also in frozen builds
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = DownloaderApp(root)
     root.mainloop() 
\ No newline at end of file